@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.rng import SeededRNG, stable_digest
+from engine.state import State
+from web.app import create_app
+from web.routes import render_reading_to_html
+
+READINGS = 200
+DURATION = 1.0
+
+
+def legacy_render(reading_data, entropy_high=False):
+    correspondencias = reading_data.get('correspondencias', {})
+    container_class = 'reading-container'
+    if entropy_high:
+        container_class += ' entropy-high'
+    html = f'<div class="{container_class}">'
+    if correspondencias:
+        html += '<div class="correspondences-table">'
+        html += '<table><thead><tr><th>Posição</th><th>Símbolo</th><th>Elemento</th><th>Planeta</th><th>Qualidade</th></tr></thead><tbody>'
+        for pos, key in [("Passado", "passado"), ("Presente", "presente"), ("Tendência", "tendencia")]:
+            if key in correspondencias:
+                sym = correspondencias[key]
+                html += f'<tr><td>{pos}</td><td>{sym.get("glifo", "")} {sym.get("nome", "")}</td><td>{sym.get("elemento", "")}</td><td>{sym.get("planeta", "")}</td><td>{sym.get("qualidade", "")}</td></tr>'
+        html += '</tbody></table></div>'
+    seal = reading_data.get('seal', '').replace('\n', '<br>')
+    liturgy = reading_data.get('liturgy', '').replace('\n', '<br>')
+    reading = reading_data.get('reading', '').replace('\n', '<br>')
+    coda = reading_data.get('coda', '').replace('\n', '<br>')
+    interference_line = reading_data.get('interference_line', '')
+    glitch_class = 'glitch' if entropy_high else ''
+    html += f'<div class="seal {glitch_class}">{seal}</div>'
+    html += f'<div class="liturgy {glitch_class}">{liturgy}</div>'
+    if interference_line:
+        html += f'<div class="interference-line">{interference_line}</div>'
+    html += f'<div class="reading-text {glitch_class}">{reading}</div>'
+    html += f'<div class="coda {glitch_class}">{coda}</div>'
+    ato = reading_data.get('ato', '')
+    preco = reading_data.get('preco', '')
+    html += f'<div class="summary"><div class="ato">ATO: {ato}</div><div class="preco">PREÇO: {preco}</div></div>'
+    html += '</div>'
+    return html
+
+
+def rate(render, readings) -> float:
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < DURATION:
+        for reading, fingerprint in readings:
+            render(reading, fingerprint)
+        done += len(readings)
+    return done / (time.perf_counter() - started)
+
+
+def main():
+    app = create_app(open_stores=False)
+    deck = app.config['DECK']
+    interpreter = app.config['INTERPRETER']
+    lore = app.config['LORE']
+    readings = []
+    for number in range(READINGS):
+        state = State(f"bench-{number}", deck.vocabulary)
+        symbols = tuple(deck.symbols[(number + offset) % len(deck.symbols)] for offset in (0, 7, 19))
+        reading = interpreter.interpret(state, symbols, None, lore, SeededRNG(number), question="Devo mudar?")
+        readings.append((reading, stable_digest(reading)))
+
+    with app.test_request_context():
+        fragments = app.config['FRAGMENT_CACHE']
+        app.config['FRAGMENT_CACHE'] = None
+        results = {
+            "f-string (anterior)": rate(lambda reading, fingerprint: legacy_render(reading), readings),
+            "macro Jinja": rate(lambda reading, fingerprint: render_reading_to_html(reading), readings)
+        }
+        app.config['FRAGMENT_CACHE'] = fragments
+        results["macro + cache"] = rate(lambda reading, fingerprint: render_reading_to_html(reading, False, fingerprint),
+                                        readings)
+    for name, per_second in results.items():
+        print(f"{name:<22}{per_second:>12,.0f} renderizações/s")
+
+
+if __name__ == "__main__":
+    main()
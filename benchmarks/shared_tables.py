@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import gc
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.snapshot import compile_engine, read_snapshot, write_snapshot
+from engine.tables import COLD_FIELDS, HOT_FIELDS
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+COPIES = (1, 20, 80)
+WORKERS = 4
+
+
+def build_data(target: Path, copies: int):
+    shutil.copytree(DATA_PATH, target)
+    deck = json.loads((DATA_PATH / "deck.json").read_text(encoding='utf-8'))
+    symbols = []
+    for copy in range(copies):
+        for symbol in deck["symbols"]:
+            symbols.append(dict(symbol, id=f"{symbol['id']}-{copy}"))
+    deck["symbols"] = symbols
+    (target / "deck.json").write_text(json.dumps(deck, ensure_ascii=False), encoding='utf-8')
+    (target / "certification.json").unlink(missing_ok=True)
+
+
+def private_kib() -> int:
+    total = 0
+    with open("/proc/self/smaps_rollup", 'r') as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def touch(engine):
+    for symbol in engine.deck.symbols:
+        for name in HOT_FIELDS + COLD_FIELDS:
+            getattr(symbol, name)
+    sum(engine.deck.static_weights)
+
+
+def worker(load, pipe):
+    gc.collect()
+    before = private_kib()
+    started = time.perf_counter()
+    engine = load()
+    attach_ms = (time.perf_counter() - started) * 1000
+    touch(engine)
+    os.write(pipe, f"{private_kib() - before} {attach_ms}\n".encode())
+    os._exit(0)
+
+
+def fork_workers(load, inherited: bool):
+    engine = None
+    if inherited:
+        engine = load()
+        gc.collect()
+        gc.freeze()
+    read_fd, write_fd = os.pipe()
+    for _ in range(WORKERS):
+        if os.fork() == 0:
+            os.close(read_fd)
+            worker((lambda: engine) if inherited else load, write_fd)
+    if inherited:
+        gc.unfreeze()
+    os.close(write_fd)
+    for _ in range(WORKERS):
+        os.wait()
+    with os.fdopen(read_fd) as f:
+        rows = [line.split() for line in f.read().splitlines()]
+    return max(int(kib) for kib, _ in rows), max(float(ms) for _, ms in rows)
+
+
+def main() -> int:
+    if not os.path.exists("/proc/self/smaps_rollup") or not hasattr(os, "fork"):
+        print("Requer Linux (/proc/self/smaps_rollup) e fork().")
+        return 0
+    print("Memória privada por processo após percorrer todos os símbolos (KiB) e tempo de carga")
+    print(f"{'símbolos':>9} {'modo':>10} {'objetos':>10} {'tabelas':>10} {'carga obj':>10} {'carga tab':>10}")
+    for copies in COPIES:
+        with tempfile.TemporaryDirectory() as tmp:
+            data = Path(tmp) / "data"
+            build_data(data, copies)
+            engine = compile_engine(data)
+            plain = pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL)
+            path = write_snapshot(Path(tmp) / "engine", engine)
+            for mode, inherited in (("fork", True), ("carga", False)):
+                objects_kib, objects_ms = fork_workers(lambda: pickle.loads(plain), inherited)
+                tables_kib, tables_ms = fork_workers(lambda: read_snapshot(path), inherited)
+                print(f"{len(engine.deck.symbols):>9} {mode:>10} {objects_kib:>10} {tables_kib:>10} "
+                      f"{objects_ms:>8.1f}ms {tables_ms:>8.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
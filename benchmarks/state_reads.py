@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.state import State, Vocabulary
+
+SIZES = (50, 2000, 20000)
+MAX_GROWTH = 3.0
+NUMBER = 50000
+
+
+def build_state(size: int) -> State:
+    symbols = [f"S{index:05d}" for index in range(size)]
+    state = State("bench", Vocabulary(symbols, [f"D{index}" for index in range(size // 10 + 1)]))
+    for index in range(0, size, 2):
+        state.update_memory([symbols[index]] * (1 + index % 3), [f"D{index // 10}"])
+    for index in range(5):
+        state.remember_question(f"pergunta {index}")
+    return state
+
+
+def measure(state: State):
+    symbol_id = state.vocabulary.symbols[len(state.vocabulary.symbols) // 2]
+    reads = {
+        "get_echo_symbol": state.get_echo_symbol,
+        "motif_count": lambda: state.motif_count(symbol_id),
+        "check_repeat_question": lambda: state.check_repeat_question("pergunta 3")
+    }
+    return {name: timeit.timeit(read, number=NUMBER) / NUMBER * 1e9 for name, read in reads.items()}
+
+
+def main() -> int:
+    results = {size: measure(build_state(size)) for size in SIZES}
+    print(f"{'leitura':<24}" + "".join(f"{size:>12}" for size in SIZES))
+    failed = False
+    for name in results[SIZES[0]]:
+        row = [results[size][name] for size in SIZES]
+        growth = row[-1] / row[0]
+        failed |= growth > MAX_GROWTH
+        print(f"{name:<24}" + "".join(f"{ns:>10.0f}ns" for ns in row) + f"   x{growth:.2f}")
+    if failed:
+        print(f"Leitura de estado cresce com o baralho (limite x{MAX_GROWTH})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import math
+from typing import Dict, List, Optional, Sequence, Union
+from .matcher import MatchSet
+from .state import State
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+# Com NumPy, um ndarray (N, k) de índices int64; sem NumPy, uma lista de listas.
+Draws = Union["np.ndarray", List[List[int]]]
+CHUNK_ROWS = 65536
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+_MASK = (1 << 64) - 1
+
+
+def _uniform(seed: int, column: int) -> float:
+    z = (seed + (column + 1) * _GOLDEN) & _MASK
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK
+    z ^= z >> 31
+    return ((z >> 11) + 0.5) / 9007199254740992.0
+
+
+def _uniform_matrix(seeds, columns):
+    with np.errstate(over='ignore'):
+        z = seeds[:, None] + (columns[None, :] + np.uint64(1)) * np.uint64(_GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        z ^= z >> np.uint64(31)
+    return ((z >> np.uint64(11)).astype(np.float64) + 0.5) / 9007199254740992.0
+
+
+class _Request:
+    __slots__ = ("factors", "forced")
+
+    def __init__(self, factors: Dict[int, float], forced: Optional[int]):
+        self.factors = factors
+        self.forced = forced
+
+
+def _prepare(deck, states: Sequence[State], questions: Sequence[str]) -> List[_Request]:
+    scans: Dict[str, MatchSet] = {}
+    requests = []
+    for state, question in zip(states, questions):
+        matches = scans.get(question)
+        if matches is None:
+            matches = scans[question] = deck.scan(question)
+
+        factors: Dict[int, float] = {}
+        for symbol_id, count in state.iter_motifs():
+            index = deck.index_by_id.get(symbol_id)
+            if index is not None and count > 0:
+                factors[index] = 1.0 + count * 0.2
+        echo_index = deck.index_by_id.get(state.get_echo_symbol())
+        if echo_index is not None:
+            factors[echo_index] = factors.get(echo_index, 1.0) * 1.5
+        for index, (contra_hits, gatilho_hits) in matches.symbol_hits.items():
+            factors[index] = factors.get(index, 1.0) * (0.3 ** contra_hits) * (1.3 ** gatilho_hits)
+
+        forced = None
+        if state.last_draw and state.check_repeat_question(question):
+            forced = deck.index_by_id.get(state.last_draw[0])
+        requests.append(_Request(factors, forced))
+    return requests
+
+
+def _draw_numpy(deck, requests: List[_Request], seeds: Sequence[int], k: int) -> "np.ndarray":
+    size = len(deck.symbols)
+    static = np.asarray(deck.static_weights, dtype=np.float64)
+    columns = np.arange(size, dtype=np.uint64)
+    result = np.empty((len(requests), k), dtype=np.int64)
+
+    for start in range(0, len(requests), CHUNK_ROWS):
+        chunk = requests[start:start + CHUNK_ROWS]
+        rows = len(chunk)
+
+        factor_rows, factor_cols, factor_vals = [], [], []
+        forced_rows, forced_cols = [], []
+        for row, request in enumerate(chunk):
+            for index, factor in request.factors.items():
+                factor_rows.append(row)
+                factor_cols.append(index)
+                factor_vals.append(factor)
+            if request.forced is not None:
+                forced_rows.append(row)
+                forced_cols.append(request.forced)
+
+        weights = np.broadcast_to(static, (rows, size)).copy()
+        factor_rows = np.asarray(factor_rows, dtype=np.intp)
+        factor_cols = np.asarray(factor_cols, dtype=np.intp)
+        weights[factor_rows, factor_cols] *= np.asarray(factor_vals, dtype=np.float64)
+        np.maximum(weights, 0.1, out=weights)
+
+        chunk_seeds = np.asarray([int(s) & _MASK for s in seeds[start:start + rows]], dtype=np.uint64)
+        keys = np.log(weights) - np.log(-np.log(_uniform_matrix(chunk_seeds, columns)))
+        keys[np.asarray(forced_rows, dtype=np.intp), np.asarray(forced_cols, dtype=np.intp)] = np.inf
+
+        top = np.argpartition(-keys, k - 1, axis=1)[:, :k] if k < size else np.tile(np.arange(size), (rows, 1))
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1, kind='stable')
+        result[start:start + rows] = np.take_along_axis(top, order, axis=1)
+    return result
+
+
+def _draw_python(deck, requests: List[_Request], seeds: Sequence[int], k: int) -> List[List[int]]:
+    result = []
+    for request, seed in zip(requests, seeds):
+        seed = int(seed) & _MASK
+        keys = []
+        for index, base in enumerate(deck.static_weights):
+            if index == request.forced:
+                key = math.inf
+            else:
+                weight = max(0.1, base * request.factors.get(index, 1.0))
+                key = math.log(weight) - math.log(-math.log(_uniform(seed, index)))
+            keys.append((-key, index))
+        keys.sort()
+        result.append([index for _, index in keys[:k]])
+    return result
+
+
+def draw_many(deck, states: Sequence[State], seeds: Sequence[int], questions: Sequence[str],
+              use_numpy: Optional[bool] = None) -> Draws:
+    if not (len(states) == len(seeds) == len(questions)):
+        raise ValueError("states, seeds e questions precisam ter o mesmo tamanho")
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if use_numpy and not HAS_NUMPY:
+        raise RuntimeError("NumPy não está disponível")
+
+    k = min(3, len(deck.symbols))
+    requests = _prepare(deck, states, questions)
+    if use_numpy:
+        return _draw_numpy(deck, requests, seeds, k)
+    draws = _draw_python(deck, requests, seeds, k)
+    if HAS_NUMPY:
+        return np.asarray(draws, dtype=np.int64).reshape(len(draws), k)
+    return draws
@@ -0,0 +1,91 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+from .rng import SeededRNG, stable_digest
+from .state import State
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def reading_key(state: State, symbol_ids: Sequence[str], rng: SeededRNG,
+                question: Optional[str], namespace: str = "") -> str:
+    return stable_digest(rng.state_bytes(), [
+        namespace,
+        list(symbol_ids),
+        question,
+        state.session_seed_base,
+        state.consult_count,
+        state.entropy,
+        state.debt,
+        state.get_echo_symbol()
+    ])
+
+
+class ReadingCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        payload = self._lookup(key)
+        return json.loads(payload) if payload is not None else None
+
+    def put(self, key: str, reading: Dict):
+        payload = json.dumps(reading, ensure_ascii=False).encode("utf-8")
+        self._store(key, payload, len(payload))
+
+    def _lookup(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0]
+
+    def _store(self, key: str, value, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class FragmentCache(ReadingCache):
+    def get(self, key: str) -> Optional[str]:
+        return self._lookup(key)
+
+    def put(self, key: str, fragment: str):
+        self._store(key, fragment, len(fragment.encode("utf-8")))
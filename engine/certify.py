@@ -0,0 +1,195 @@
+import copy
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import List, Optional, Sequence
+from .deck import Symbol
+from .nlg import ObjectiveLinter
+from .rng import stable_digest
+from .templating import CompiledTemplates, Template, compile_templates, render_intervention
+
+CERTIFICATION_VERSION = 1
+
+KEYED_SLOTS = ("thesis", "warrant", "trend")
+LIST_SLOTS = ("evidence_past", "evidence_present", "qualifier", "limit", "ato_generic",
+              "passos_observaveis", "preco", "time_references")
+
+_linter = ObjectiveLinter()
+_UNKNOWN = "\x00"
+
+
+def _skeleton(template: Template, **known) -> str:
+    context = defaultdict(lambda: _UNKNOWN, known)
+    return template.render(context)
+
+
+def _reading_check(text: str, check: str):
+    return _linter.report(text, "", "").checks[check]
+
+
+def _ato_check(text: str, check: str) -> bool:
+    return _linter.report("", text, "").checks[check]
+
+
+def _preco_check(text: str, check: str) -> bool:
+    return _linter.report("", "", text).checks[check]
+
+
+def _preco_is_concrete(template: Template, symbols: Sequence[Symbol]) -> bool:
+    if not _preco_check(_skeleton(template), "preco_is_concrete"):
+        return False
+    for symbol in symbols:
+        text = _skeleton(template,
+                         sombra=symbol.correspondencias.get("sombra", "algo"),
+                         qualidade=symbol.correspondencias.get("qualidade", "algo"))
+        if not _preco_check(text, "preco_is_concrete"):
+            return False
+    return True
+
+
+DUTIES = {
+    "thesis": lambda t, symbols: _reading_check(_skeleton(t), "has_thesis"),
+    "warrant": lambda t, symbols: _reading_check(_skeleton(t), "has_warrant"),
+    "trend": lambda t, symbols: _reading_check(_skeleton(t), "has_condition"),
+    "evidence_past": lambda t, symbols: _reading_check(_skeleton(t), "evidence_count") == 1,
+    "evidence_present": lambda t, symbols: _reading_check(_skeleton(t), "evidence_count") == 1,
+    "qualifier": lambda t, symbols: _reading_check(f"Condição ({_skeleton(t)}): ", "has_qualifier"),
+    "limit": lambda t, symbols: _reading_check(_skeleton(t), "has_limit"),
+    "ato_generic": lambda t, symbols: _ato_check(_skeleton(t), "ato_has_deadline"),
+    "passos_observaveis": lambda passo, symbols: _ato_check(passo, "ato_has_criterion"),
+    "preco": _preco_is_concrete,
+    "time_references": lambda prazo, symbols: _preco_check(prazo, "preco_has_deadline"),
+}
+
+
+def fingerprint(templates: dict, symbols: Optional[Sequence[Symbol]]) -> str:
+    payload = {
+        "version": CERTIFICATION_VERSION,
+        "templates": templates,
+        "symbols": [
+            {"id": s.id, "correspondencias": s.correspondencias, "intervencoes_minimas": s.intervencoes_minimas}
+            for s in symbols or []
+        ]
+    }
+    return stable_digest(payload)
+
+
+def _certified(options: list, duty, symbols: Sequence[Symbol]) -> List[int]:
+    return [index for index, option in enumerate(options) if duty(option, symbols)]
+
+
+def _certified_interventions(compiled: CompiledTemplates, symbol: Symbol) -> List[int]:
+    templates = compiled.ato_with_acao if compiled.ato[0].uses("acao") else [None]
+    certified = []
+    for index, intervention in enumerate(symbol.intervencoes_minimas):
+        texts = [render_intervention(template, intervention, _UNKNOWN) for template in templates]
+        report_checks = [_linter.report("", text, "").checks for text in texts]
+        if all(c["ato_has_deadline"] and c["ato_has_criterion"] for c in report_checks):
+            certified.append(index)
+    return certified
+
+
+def certify(templates: dict, compiled: CompiledTemplates, symbols: Optional[Sequence[Symbol]] = None) -> dict:
+    symbols = list(symbols or [])
+    table = {"keyed": {}, "lists": {}, "interventions": {}}
+    gaps = []
+
+    for slot in KEYED_SLOTS:
+        table["keyed"][slot] = {}
+        for key, options in getattr(compiled, slot).items():
+            certified = _certified(options, DUTIES[slot], symbols)
+            table["keyed"][slot][key] = certified
+            if not certified:
+                gaps.append(f"{slot}.{key}")
+
+    for slot in LIST_SLOTS:
+        certified = _certified(getattr(compiled, slot), DUTIES[slot], symbols)
+        table["lists"][slot] = certified
+        if not certified:
+            gaps.append(slot)
+
+    for symbol in symbols:
+        if symbol.intervencoes_minimas:
+            certified = _certified_interventions(compiled, symbol)
+            table["interventions"][symbol.id] = certified
+            if not certified:
+                gaps.append(f"intervencoes_minimas.{symbol.id}")
+
+    elementos = sorted({s.correspondencias.get("elemento") or "fogo" for s in symbols})
+    for elemento in elementos:
+        if elemento not in compiled.trend:
+            gaps.append(f"trend.{elemento} (sem templates)")
+
+    return {
+        "version": CERTIFICATION_VERSION,
+        "fingerprint": fingerprint(templates, symbols),
+        "table": table,
+        "gaps": gaps
+    }
+
+
+class Certification:
+    def __init__(self, data: dict):
+        self.data = data
+        self.fingerprint = data["fingerprint"]
+        self.gaps = data.get("gaps", [])
+        self._table = data["table"]
+
+    def apply(self, compiled: CompiledTemplates) -> CompiledTemplates:
+        view = copy.copy(compiled)
+        for slot in KEYED_SLOTS:
+            certified = self._table["keyed"].get(slot, {})
+            setattr(view, slot, {
+                key: self._select(options, certified.get(key))
+                for key, options in getattr(compiled, slot).items()
+            })
+        for slot in LIST_SLOTS:
+            setattr(view, slot, self._select(getattr(compiled, slot), self._table["lists"].get(slot)))
+        return view
+
+    def interventions(self, symbol: Symbol) -> List[dict]:
+        return self._select(symbol.intervencoes_minimas, self._table["interventions"].get(symbol.id))
+
+    @staticmethod
+    def _select(options: list, certified: Optional[List[int]]) -> list:
+        if not certified:
+            return options
+        return [options[index] for index in certified if index < len(options)]
+
+
+def load_certification(path: str, templates: dict, compiled: CompiledTemplates,
+                       symbols: Optional[Sequence[Symbol]] = None) -> Certification:
+    expected = fingerprint(templates, symbols)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("fingerprint") == expected:
+                return Certification(data)
+        except (OSError, ValueError, KeyError):
+            pass
+    return Certification(certify(templates, compiled, symbols))
+
+
+def write_certification(path: str, data: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    templates_path = sys.argv[1] if len(sys.argv) > 1 else "data/templates.json"
+    deck_path = sys.argv[2] if len(sys.argv) > 2 else "data/deck.json"
+    output_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(os.path.dirname(templates_path), "certification.json")
+
+    with open(templates_path, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    with open(deck_path, 'r', encoding='utf-8') as f:
+        symbols = [Symbol.from_dict(s) for s in json.load(f)["symbols"]]
+
+    data = certify(templates, compile_templates(templates), symbols)
+    write_certification(output_path, data)
+    print(f"Certificação gravada em {output_path}")
+    for gap in data["gaps"]:
+        print(f"  sem opção certificada: {gap}")
@@ -1,8 +1,11 @@
 import json
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from .rng import SeededRNG
-from .state import State
+from .state import State, Vocabulary
+from .matcher import MatchSet, TriggerMatcher
+from .batch import Draws, draw_many
+from .sampler import FenwickSampler, SAMPLER_V1, SAMPLER_V2, SAMPLER_VERSIONS
 
 
 @dataclass
@@ -46,50 +49,90 @@ class Symbol:
         )
 
 
+def rarity_factor(raridade: int) -> float:
+    weight = 1.0
+    if raridade == 5:
+        weight *= 0.3
+    elif raridade == 4:
+        weight *= 0.6
+    elif raridade == 3:
+        weight *= 0.8
+    return weight
+
+
 class Deck:
-    def __init__(self, symbols: List[Symbol]):
+    def __init__(self, symbols: List[Symbol], taboos: Optional[list] = None,
+                 sampler: str = SAMPLER_V1):
+        if sampler not in SAMPLER_VERSIONS:
+            raise ValueError(f"Sampler desconhecido: {sampler}")
         self.symbols = symbols
+        self.sampler_version = sampler
+        self.matcher = TriggerMatcher(symbols, taboos)
+        self.index_by_id = {symbol.id: index for index, symbol in enumerate(symbols)}
+        self.vocabulary = Vocabulary.from_symbols(symbols)
+        self.static_weights = [rarity_factor(symbol.raridade) for symbol in symbols]
+        self.sampler = FenwickSampler(self.static_weights)
     
     @classmethod
-    def load_from_json(cls, path: str):
+    def load_from_json(cls, path: str, taboos: Optional[list] = None,
+                       sampler: str = SAMPLER_V1):
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         symbols = [Symbol.from_dict(s) for s in data["symbols"]]
-        return cls(symbols)
+        return cls(symbols, taboos, sampler)
     
-    def draw_three(self, state: State, rng: SeededRNG, question: str) -> Tuple[Symbol, Symbol, Symbol]:
-        question_lower = question.lower()
-        weights = []
+    def scan(self, question: str) -> MatchSet:
+        return self.matcher.scan(question)
+    
+    def draw_many(self, states: Sequence[State], seeds: Sequence[int], questions: Sequence[str],
+                  use_numpy: Optional[bool] = None) -> Draws:
+        return draw_many(self, states, seeds, questions, use_numpy=use_numpy)
+    
+    def _weight(self, index: int, motif_count: int, is_echo: bool, matches: MatchSet) -> float:
+        weight = self.static_weights[index]
+        
+        if motif_count > 0:
+            weight *= (1.0 + motif_count * 0.2)
+        
+        if is_echo:
+            weight *= 1.5
+        
+        if index in matches.symbol_hits:
+            contra_hits, gatilho_hits = matches.symbol_hits[index]
+            for _ in range(contra_hits):
+                weight *= 0.3
+            for _ in range(gatilho_hits):
+                weight *= 1.3
+        
+        return max(0.1, weight)
+    
+    def draw_three(self, state: State, rng: SeededRNG, question: str,
+                   matches: Optional[MatchSet] = None) -> Tuple[Symbol, Symbol, Symbol]:
+        if matches is None:
+            matches = self.scan(question)
         
         echo_symbol_id = state.get_echo_symbol()
         force_echo = state.check_repeat_question(question) and state.last_draw
         
-        for symbol in self.symbols:
-            weight = 1.0
-            
-            if symbol.raridade == 5:
-                weight *= 0.3
-            elif symbol.raridade == 4:
-                weight *= 0.6
-            elif symbol.raridade == 3:
-                weight *= 0.8
-            
-            motif_count = state.motif_counts.get(symbol.id, 0)
-            if motif_count > 0:
-                weight *= (1.0 + motif_count * 0.2)
-            
-            if echo_symbol_id == symbol.id:
-                weight *= 1.5
-            
-            for contra in symbol.contraindicacoes:
-                if contra.lower() in question_lower:
-                    weight *= 0.3
-            
-            for gatilho in symbol.gatilhos:
-                if gatilho.lower() in question_lower:
-                    weight *= 1.3
-            
-            weights.append(max(0.1, weight))
+        if self.sampler_version == SAMPLER_V2:
+            selected = self._draw_v2(state, rng, matches, echo_symbol_id, force_echo)
+        else:
+            selected = self._draw_v1(state, rng, matches, echo_symbol_id, force_echo)
+        
+        if len(selected) < 3:
+            while len(selected) < 3:
+                symbol = rng.choice(self.symbols)
+                if symbol not in selected:
+                    selected.append(symbol)
+        
+        return tuple(selected[:3])
+    
+    def _draw_v1(self, state: State, rng: SeededRNG, matches: MatchSet,
+                 echo_symbol_id: Optional[str], force_echo) -> List[Symbol]:
+        weights = []
+        for index, symbol in enumerate(self.symbols):
+            motif_count = state.motif_count(symbol.id)
+            weights.append(self._weight(index, motif_count, echo_symbol_id == symbol.id, matches))
         
         selected = []
         available = list(self.symbols)
@@ -113,10 +156,30 @@ class Deck:
             available.pop(idx)
             available_weights.pop(idx)
         
-        if len(selected) < 3:
-            while len(selected) < 3:
-                symbol = rng.choice(self.symbols)
-                if symbol not in selected:
-                    selected.append(symbol)
+        return selected
+    
+    def _draw_v2(self, state: State, rng: SeededRNG, matches: MatchSet,
+                 echo_symbol_id: Optional[str], force_echo) -> List[Symbol]:
+        touched = set(matches.symbol_hits)
+        for symbol_id, count in state.iter_motifs():
+            if count > 0 and symbol_id in self.index_by_id:
+                touched.add(self.index_by_id[symbol_id])
+        echo_index = self.index_by_id.get(echo_symbol_id)
+        if echo_index is not None:
+            touched.add(echo_index)
         
-        return tuple(selected[:3])
+        session = self.sampler.session()
+        for index in sorted(touched):
+            motif_count = state.motif_count(self.symbols[index].id)
+            session.set_weight(index, self._weight(index, motif_count, index == echo_index, matches))
+        
+        selected = []
+        if force_echo and state.last_draw:
+            forced_index = self.index_by_id.get(state.last_draw[0])
+            if forced_index is not None:
+                selected.append(self.symbols[forced_index])
+                session.remove(forced_index)
+        
+        for index in session.take(rng, 3 - len(selected)):
+            selected.append(self.symbols[index])
+        return selected
@@ -0,0 +1,56 @@
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_LOCKS: "weakref.WeakSet[FileLock]" = weakref.WeakSet()
+
+
+class FileLock:
+    def __init__(self, path):
+        self.path = str(path)
+        self._reset()
+        _LOCKS.add(self)
+
+    def _reset(self):
+        self._fd = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def hold(self, exclusive: bool = True):
+        with self._lock:
+            if self._depth == 0 and fcntl is not None:
+                if self._fd is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def _after_fork():
+    for lock in list(_LOCKS):
+        if lock._fd is not None:
+            os.close(lock._fd)
+        lock._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -1,17 +1,67 @@
 import json
-from typing import Dict, Tuple, Optional
+import os
+from typing import Dict, Generator, Tuple, Optional
 from .state import State
 from .deck import Symbol
 from .taboos import Taboo
-from .rng import SeededRNG
+from .matcher import MatchSet
+from .rng import SeededRNG, stable_digest, stable_hash
 from .nlg import DiscoursePlanner, DiscourseRelation, ContentPlanner, SentencePlanner, CoherenceChecker, ObjectiveLinter
 from .topic_extractor import TopicExtractor
+from .templating import compile_templates, render_intervention
+from .certify import load_certification
+from .cache import ReadingCache, reading_key
+
+READING_SECTIONS = (
+    "thesis", "finding_past", "evidence_past", "finding_present", "evidence_present",
+    "warrant", "condition", "evidence_future", "tension", "limit"
+)
+
+EVIDENCE_KEYS = {
+    "evidence_past": "past",
+    "evidence_present": "present",
+    "evidence_future": "future"
+}
+
+SECTIONS_BY_VIOLATION = {
+    "has_thesis": ("thesis",),
+    "evidence_count_ok": ("evidence_past", "evidence_present", "evidence_future"),
+    "has_warrant": ("warrant",),
+    "has_qualifier": ("condition",),
+    "has_limit": ("limit",),
+    "has_condition": ("condition",),
+    "ato_has_deadline": ("ato",),
+    "ato_has_criterion": ("ato",),
+    "preco_has_deadline": ("preco",),
+    "preco_is_concrete": ("preco",)
+}
+
+
+def sections_for_violations(violations, evidence_lines=None) -> frozenset:
+    sections = set()
+    for violation in violations:
+        sections.update(SECTIONS_BY_VIOLATION.get(violation, READING_SECTIONS + ("ato", "preco")))
+    if evidence_lines is not None and "evidence_count_ok" in violations:
+        for name in EVIDENCE_KEYS:
+            if READING_SECTIONS.index(name) + 1 in evidence_lines:
+                sections.discard(name)
+    return frozenset(sections)
 
 
 class Interpreter:
-    def __init__(self, templates_path: str, deck=None):
+    def __init__(self, templates_path: str, deck=None, certification_path: Optional[str] = None,
+                 cache: Optional[ReadingCache] = None):
         with open(templates_path, 'r', encoding='utf-8') as f:
             self.templates = json.load(f)
+        self.compiled = compile_templates(self.templates)
+        if certification_path is None:
+            certification_path = os.path.join(os.path.dirname(templates_path), "certification.json")
+        self.certification = load_certification(certification_path, self.templates, self.compiled,
+                                                deck.symbols if deck else None)
+        self.certified = self.certification.apply(self.compiled)
+        self.linter = ObjectiveLinter()
+        self.cache = cache
+        self._lore_namespace = (None, "")
         self.deck = deck
         if deck:
             self.topic_extractor = TopicExtractor(deck)
@@ -19,12 +69,48 @@ class Interpreter:
             self.topic_extractor = None
     
     def interpret(self, state: State, symbols: Tuple[Symbol, Symbol, Symbol], 
-                  taboo: Taboo, lore: dict, rng: SeededRNG, question: Optional[str] = None) -> Dict:
+                  taboo: Taboo, lore: dict, rng: SeededRNG, question: Optional[str] = None,
+                  matches: Optional[MatchSet] = None) -> Dict:
+        stream = self.interpret_stream(state, symbols, taboo, lore, rng, question, matches)
+        while True:
+            try:
+                next(stream)
+            except StopIteration as done:
+                return done.value
+    
+    def interpret_stream(self, state: State, symbols: Tuple[Symbol, Symbol, Symbol],
+                         taboo: Taboo, lore: dict, rng: SeededRNG, question: Optional[str] = None,
+                         matches: Optional[MatchSet] = None) -> Generator[Tuple[str, str], None, Dict]:
+        if self.cache is None:
+            return (yield from self._interpret(state, symbols, lore, rng, question, matches))
+        
+        key = reading_key(state, [s.id for s in symbols], rng, question, self._namespace(lore))
+        reading = self.cache.get(key)
+        if reading is None:
+            reading = yield from self._interpret(state, symbols, lore, rng, question, matches)
+            self.cache.put(key, reading)
+        else:
+            yield "seal", reading["seal"]
+            yield "liturgy", reading["liturgy"]
+            for line in reading["reading"].split("\n"):
+                yield "line", line
+            yield "coda", reading["coda"]
+        return reading
+    
+    def _namespace(self, lore: dict) -> str:
+        cached_lore, namespace = self._lore_namespace
+        if cached_lore is not lore:
+            namespace = self.certification.fingerprint + ":" + stable_digest(lore)
+            self._lore_namespace = (lore, namespace)
+        return namespace
+    
+    def _interpret(self, state: State, symbols: Tuple[Symbol, Symbol, Symbol], lore: dict,
+                   rng: SeededRNG, question: Optional[str],
+                   matches: Optional[MatchSet]) -> Generator[Tuple[str, str], None, Dict]:
         past, present, future = symbols
         
         entity = lore["entity"]
         effects = lore.get("effects", {})
-        voice = lore.get("voice", {})
         
         entropy_high = state.entropy > effects.get("interference_threshold", 60)
         debt_high = state.debt > 50
@@ -39,45 +125,52 @@ class Interpreter:
         sentence_planner = SentencePlanner(rng)
         
         relation = discourse_planner.select_relation(symbols)
-        topic = self._extract_topic(question) if question and self.topic_extractor else "geral"
+        topic = self._extract_topic(question, matches) if question and self.topic_extractor else "geral"
         
         seal = self._build_seal(entity, marker, entropy_high, debt_high)
         liturgy = self._build_liturgy(state, lore, marker, entropy_high, debt_high, echo_symbol, has_eco)
+        yield "seal", seal
+        yield "liturgy", liturgy
         MAX_ATTEMPTS = 3
         attempt = 0
         reading_result = None
         objective_checks = None
         ato = None
         preco = None
+        regenerate = None
+        sections_regenerated = 0
+        reading_context = self._reading_context(symbols, content_planner, echo_symbol)
         
         while attempt < MAX_ATTEMPTS:
-            seed_base = hash(str(state.session_seed_base) + str(question) + str(state.consult_count))
-            seed_attempt = hash(str(seed_base) + str(attempt))
+            seed_base = stable_hash(state.session_seed_base, question, state.consult_count)
+            seed_attempt = stable_hash(seed_base, attempt)
             rng_attempt = SeededRNG(seed_attempt)
             
-            reading_result = self._build_reading(state, symbols, voice, marker, entropy_high, rng_attempt, 
-                                                relation, content_planner, sentence_planner, has_eco, echo_symbol, attempt=attempt)
-            ato_temp = self._generate_ato(symbols, rng_attempt, topic, present)
-            preco_temp = self._generate_preco(symbols, rng_attempt, future)
+            reading_result = self._build_reading(reading_context, entropy_high, rng_attempt, relation,
+                                                sentence_planner, has_eco, echo_symbol,
+                                                previous=reading_result, regenerate=regenerate)
+            if regenerate is None or "ato" in regenerate:
+                ato = self._generate_ato(symbols, rng_attempt, topic, present)
+            if regenerate is None or "preco" in regenerate:
+                preco = self._generate_preco(symbols, rng_attempt, future)
+            if regenerate is not None:
+                sections_regenerated += len(regenerate)
             
-            objective_linter = ObjectiveLinter()
-            objective_checks = objective_linter.lint(reading_result["text"], ato_temp, preco_temp)
+            lint_report = self.linter.report(reading_result["text"], ato, preco)
+            objective_checks = lint_report.to_dict()
             
-            if objective_checks["ok"]:
-                ato = ato_temp
-                preco = preco_temp
+            if lint_report.ok:
                 break
+            regenerate = sections_for_violations(lint_report.violations, lint_report.evidence_lines)
             attempt += 1
         
-        if ato is None:
-            ato = ato_temp
-            preco = preco_temp
         reading = reading_result["text"]
         interference_line = reading_result.get("interference_line", "")
         selected_evidence = reading_result.get("selected_evidence", {})
-        ato = self._generate_ato(symbols, rng, topic, present)
-        preco = self._generate_preco(symbols, rng, future)
+        for line in reading.split("\n"):
+            yield "line", line
         coda = self._build_coda(state, ato, preco, marker, entropy_high, debt_high)
+        yield "coda", coda
         
         correspondencias = {
             "passado": {
@@ -122,7 +215,8 @@ class Interpreter:
             "topic": topic,
             "attempt": attempt,
             "objective_checks": objective_checks or {},
-            "selected_evidence": selected_evidence
+            "selected_evidence": selected_evidence,
+            "sections_regenerated": sections_regenerated
         }
         
         return result
@@ -154,173 +248,134 @@ class Interpreter:
         else:
             return f"[LITURGIA]\nLeis aplicáveis: {laws_applicable}\nCusto do momento: Entropia {state.entropy}%, Dívida {state.debt}%"
     
-    def _build_reading(self, state: State, symbols: Tuple[Symbol, Symbol, Symbol],
-                      voice: dict, marker: str, entropy_high: bool, rng: SeededRNG,
-                      relation: DiscourseRelation, content_planner: ContentPlanner,
-                      sentence_planner: SentencePlanner, has_eco: bool, echo_symbol: Optional[str],
-                      attempt: int = 0) -> Dict:
+    def _reading_context(self, symbols: Tuple[Symbol, Symbol, Symbol],
+                         content_planner: ContentPlanner, echo_symbol: Optional[str]) -> Dict:
         past, present, future = symbols
-        
         past_msg = content_planner.extract_messages(past)
         present_msg = content_planner.extract_messages(present)
         future_msg = content_planner.extract_messages(future)
-        
-        elemento = past_msg["elemento"] or "fogo"
-        dominio_principal = present.dominios[0] if present.dominios else "geral"
-        
-        thesis_templates = self.templates.get("thesis_templates", {}).get(relation.value, [])
-        if not thesis_templates:
-            thesis_templates = ["Tese: {present_quality} no presente define a direção."]
-        thesis = rng.choice(thesis_templates).format(
-            past_quality=past_msg["pilar"],
-            present_quality=present_msg["pilar"],
-            future_quality=future_msg["pilar"],
-            past_shadow=past_msg["sombra"],
-            present_shadow=present_msg["sombra"],
-            future_shadow=future_msg["sombra"],
-            present_verbo=present_msg["verbo"]
-        )
-        
-        finding_past_templates = self.templates.get("finding_past_templates", {}).get(elemento, [])
-        if not finding_past_templates:
-            finding_past_templates = ["Passado: {past_quality} se acumulou enquanto {past_shadow} crescia."]
-        finding_past = rng.choice(finding_past_templates).format(
-            past_quality=past_msg["pilar"],
-            past_shadow=past_msg["sombra"]
-        )
-        
-        evidence_past_signal = ""
-        if past_msg["sinais_observaveis"]:
-            evidence_past_signal = rng.choice(past_msg["sinais_observaveis"])
-        else:
-            evidence_past_signal = "padrões que se repetem no mesmo ponto"
-        
-        evidence_past_templates = self.templates.get("evidence_past_templates", ["Evidência: {sinal_observavel}"])
-        evidence_1 = rng.choice(evidence_past_templates).format(sinal_observavel=evidence_past_signal)
-        
-        finding_present_templates = self.templates.get("finding_present_templates", {}).get(elemento, [])
-        if not finding_present_templates:
-            finding_present_templates = ["Presente: você {present_verbo} com {present_quality}, mas {present_shadow} ameaça."]
-        finding_present = rng.choice(finding_present_templates).format(
-            presente_verbo=present_msg["verbo"],
-            present_verbo=present_msg["verbo"],
-            presente_quality=present_msg["pilar"],
-            present_quality=present_msg["pilar"],
-            presente_shadow=present_msg["sombra"],
-            present_shadow=present_msg["sombra"]
-        )
-        
-        evidence_present_signal = ""
-        if present_msg["sinais_observaveis"]:
-            evidence_present_signal = rng.choice(present_msg["sinais_observaveis"])
-        else:
-            evidence_present_signal = "sinais observáveis no presente"
-        
-        evidence_present_templates = self.templates.get("evidence_present_templates", ["Evidência: {sinal_observavel}"])
-        evidence_2 = rng.choice(evidence_present_templates).format(sinal_observavel=evidence_present_signal)
-        
-        warrant_templates = self.templates.get("warrant_by_relation", {}).get(relation.value, [])
-        if not warrant_templates:
-            warrant_templates = [f"Regra: {sentence_planner.get_connector(relation)}, {present_msg['pilar']} continua {past_msg['pilar']}."]
-        warrant = rng.choice(warrant_templates).format(
-            presente_verbo=present_msg["verbo"],
-            present_verbo=present_msg["verbo"],
-            passado_qualidade=past_msg["pilar"],
-            past_qualidade=past_msg["pilar"],
-            presente_qualidade=present_msg["pilar"],
-            present_qualidade=present_msg["pilar"],
-            tend_sombra=future_msg["sombra"],
-            futuro_qualidade=future_msg["pilar"],
-            dominio=dominio_principal
-        )
-        
-        qualifier_templates = self.templates.get("qualifier_templates", ["provável", "possível"])
-        qualifier = rng.choice(qualifier_templates)
-        
-        trend_templates = self.templates.get("trend_sentence_templates", {}).get(elemento, [])
-        if not trend_templates:
-            trend_templates = [f"Se você manter {{present_quality}}, a tendência é {{future_quality}}, mas {{future_shadow}} cresce."]
-        condition_trend = rng.choice(trend_templates).format(
-            present_quality=present_msg["pilar"],
-            present_verbo=present_msg["verbo"],
-            future_quality=future_msg["pilar"],
-            future_shadow=future_msg["sombra"]
-        )
-        condition_trend = f"Condição ({qualifier}): {condition_trend}"
-        
-        evidence_future_signal = ""
-        if future_msg["sinais_observaveis"]:
-            evidence_future_signal = rng.choice(future_msg["sinais_observaveis"])
-        else:
-            evidence_future_signal = "sinais prováveis no futuro"
-        
-        if has_eco and echo_symbol:
-            eco_templates = self.templates.get("eco_templates", [])
-            if eco_templates:
-                evidence_3 = rng.choice(eco_templates).format(echo_symbol=echo_symbol)
-            else:
-                evidence_future_templates = self.templates.get("evidence_future_templates", ["Evidência prevista: {sinal_observavel}"])
-                evidence_3 = rng.choice(evidence_future_templates).format(sinal_observavel=evidence_future_signal)
+        return {
+            "past": past_msg,
+            "present": present_msg,
+            "future": future_msg,
+            "elemento": past_msg["elemento"] or "fogo",
+            "fields": {
+                "past_quality": past_msg["pilar"],
+                "present_quality": present_msg["pilar"],
+                "future_quality": future_msg["pilar"],
+                "past_shadow": past_msg["sombra"],
+                "present_shadow": present_msg["sombra"],
+                "future_shadow": future_msg["sombra"],
+                "present_verbo": present_msg["verbo"],
+                "dominio": present.dominios[0] if present.dominios else "geral",
+                "echo_symbol": echo_symbol
+            }
+        }
+    
+    def _build_reading(self, reading_context: Dict, entropy_high: bool, rng: SeededRNG,
+                      relation: DiscourseRelation, sentence_planner: SentencePlanner,
+                      has_eco: bool, echo_symbol: Optional[str],
+                      previous: Optional[Dict] = None, regenerate: Optional[frozenset] = None) -> Dict:
+        if previous is None:
+            sections = {}
+            selected_evidence = {}
         else:
-            evidence_future_templates = self.templates.get("evidence_future_templates", ["Evidência prevista: {sinal_observavel}"])
-            evidence_3 = rng.choice(evidence_future_templates).format(sinal_observavel=evidence_future_signal)
-        
-        tension_templates = self.templates.get("tension_templates", [])
-        if not tension_templates:
-            tension_templates = ["Tensão: {present_quality} versus {future_shadow}."]
-        tension = rng.choice(tension_templates).format(
-            past_quality=past_msg["pilar"],
-            present_quality=present_msg["pilar"],
-            future_quality=future_msg["pilar"],
-            past_shadow=past_msg["sombra"],
-            present_shadow=present_msg["sombra"],
-            future_shadow=future_msg["sombra"]
-        )
-        
-        limit_text = ""
-        if present_msg["excecoes"]:
-            limit_text = f"Limite: {rng.choice(present_msg['excecoes'])}"
+            sections = dict(previous["sections"])
+            selected_evidence = dict(previous["selected_evidence"])
+        
+        for name in READING_SECTIONS:
+            if previous is None or name in regenerate:
+                line, signal = self._build_section(name, reading_context, rng, relation,
+                                                   sentence_planner, has_eco, echo_symbol)
+                sections[name] = line
+                if signal is not None:
+                    selected_evidence[EVIDENCE_KEYS[name]] = signal
+        
+        reading_text = "\n".join(["[LEITURA]"] + [sections[name] for name in READING_SECTIONS])
+        
+        if previous is None:
+            interference_line = ""
+            if entropy_high:
+                frag = rng.choice(self.compiled.interference_fragments)
+                interference_line = f"[INTERFERÊNCIA] {frag} eco… eco… {frag}"
         else:
-            limit_templates = self.templates.get("limit_templates", ["Limite: não confunda tendência com certeza."])
-            limit_text = rng.choice(limit_templates).format(
-                present_quality=present_msg["pilar"],
-                present_shadow=present_msg["sombra"],
-                past_quality=past_msg["pilar"],
-                future_quality=future_msg["pilar"]
-            )
-        
-        lines = [
-            "[LEITURA]",
-            thesis,
-            finding_past,
-            evidence_1,
-            finding_present,
-            evidence_2,
-            warrant,
-            condition_trend,
-            evidence_3,
-            tension,
-            limit_text
-        ]
-        
-        reading_text = "\n".join(lines)
-        
-        interference_line = ""
-        if entropy_high:
-            fragments = self.templates.get("interference_fragments", ["░", "▒", "▓"])
-            frag = rng.choice(fragments)
-            interference_line = f"[INTERFERÊNCIA] {frag} eco… eco… {frag}"
+            interference_line = previous["interference_line"]
         
         return {
             "text": reading_text,
+            "sections": sections,
             "interference_line": interference_line,
-            "selected_evidence": {
-                "past": evidence_past_signal,
-                "present": evidence_present_signal,
-                "future": evidence_future_signal
-            }
+            "selected_evidence": selected_evidence
         }
     
+    def _build_section(self, name: str, reading_context: Dict, rng: SeededRNG,
+                       relation: DiscourseRelation, sentence_planner: SentencePlanner,
+                       has_eco: bool, echo_symbol: Optional[str]) -> Tuple[str, Optional[str]]:
+        compiled = self.certified
+        past_msg = reading_context["past"]
+        present_msg = reading_context["present"]
+        future_msg = reading_context["future"]
+        elemento = reading_context["elemento"]
+        context = reading_context["fields"]
+        
+        if name == "thesis":
+            thesis_templates = compiled.thesis.get(relation.value) or compiled.default_thesis
+            return rng.choice(thesis_templates).render(context), None
+        
+        if name == "finding_past":
+            finding_past_templates = compiled.finding_past.get(elemento) or compiled.default_finding_past
+            return rng.choice(finding_past_templates).render(context), None
+        
+        if name == "evidence_past":
+            if past_msg["sinais_observaveis"]:
+                signal = rng.choice(past_msg["sinais_observaveis"])
+            else:
+                signal = "padrões que se repetem no mesmo ponto"
+            return rng.choice(compiled.evidence_past).render({"sinal_observavel": signal}), signal
+        
+        if name == "finding_present":
+            finding_present_templates = compiled.finding_present.get(elemento) or compiled.default_finding_present
+            return rng.choice(finding_present_templates).render(context), None
+        
+        if name == "evidence_present":
+            if present_msg["sinais_observaveis"]:
+                signal = rng.choice(present_msg["sinais_observaveis"])
+            else:
+                signal = "sinais observáveis no presente"
+            return rng.choice(compiled.evidence_present).render({"sinal_observavel": signal}), signal
+        
+        if name == "warrant":
+            warrant_templates = compiled.warrant.get(relation.value)
+            if warrant_templates:
+                return rng.choice(warrant_templates).render(context), None
+            connector = sentence_planner.get_connector(relation)
+            return rng.choice(compiled.default_warrant).render(dict(context, conector=connector)), None
+        
+        if name == "condition":
+            qualifier = rng.choice(compiled.qualifier).render(context)
+            trend_templates = compiled.trend.get(elemento) or compiled.default_trend
+            condition_trend = rng.choice(trend_templates).render(context)
+            return f"Condição ({qualifier}): {condition_trend}", None
+        
+        if name == "evidence_future":
+            if future_msg["sinais_observaveis"]:
+                signal = rng.choice(future_msg["sinais_observaveis"])
+            else:
+                signal = "sinais prováveis no futuro"
+            if has_eco and echo_symbol and compiled.eco:
+                return rng.choice(compiled.eco).render(context), signal
+            return rng.choice(compiled.evidence_future).render({"sinal_observavel": signal}), signal
+        
+        if name == "tension":
+            return rng.choice(compiled.tension).render(context), None
+        
+        if name == "limit":
+            if present_msg["excecoes"]:
+                return f"Limite: {rng.choice(present_msg['excecoes'])}", None
+            return rng.choice(compiled.limit).render(context), None
+        
+        raise ValueError(f"Seção desconhecida: {name}")
+    
     def _build_coda(self, state: State, ato: str, preco: str,
                    marker: str, entropy_high: bool, debt_high: bool) -> str:
         if debt_high:
@@ -330,48 +385,25 @@ class Interpreter:
     
     def _generate_ato(self, symbols: Tuple[Symbol, Symbol, Symbol], rng: SeededRNG, 
                      topic: str, present: Symbol) -> str:
+        compiled = self.certified
         if present.intervencoes_minimas:
-            intervention = rng.choice(present.intervencoes_minimas)
-            prazo_horas = intervention.get("prazo_horas", 24)
-            acao = intervention.get("acao", "execute uma ação")
-            
-            if prazo_horas == 24:
-                prazo_str = "24h"
-            elif prazo_horas == 48:
-                prazo_str = "48h"
-            elif prazo_horas <= 12:
-                prazo_str = "hoje"
-            else:
-                prazo_str = f"{prazo_horas}h"
-            
-            templates = self.templates.get("ato_templates", [])
-            if templates and "{acao}" in templates[0]:
-                template = rng.choice([t for t in templates if "{acao}" in t] or templates)
-                return template.format(acao=acao, tema=topic, prazo_horas=prazo_horas, prazo=prazo_str)
-            else:
-                return f"Em {prazo_str}, {acao} sobre {topic}."
+            intervention = rng.choice(self.certification.interventions(present))
+            template = rng.choice(compiled.ato_with_acao) if compiled.ato[0].uses("acao") else None
+            return render_intervention(template, intervention, topic)
         
-        templates = self.templates.get("ato_templates", [])
-        if not templates:
-            templates = ["Hoje, faça uma ação pequena de {verbo} sobre {tema}: {passo}."]
-        template = rng.choice(templates)
+        template = rng.choice(compiled.ato_generic)
         verbo = present.correspondencias.get("verbo", "agir")
-        passos = self.templates.get("passos_observaveis", ["anote 3 evidências"])
-        passo = rng.choice(passos)
-        return template.format(verbo=verbo, tema=topic, passo=passo)
+        passo = rng.choice(compiled.passos_observaveis)
+        return template.render({"verbo": verbo, "tema": topic, "passo": passo})
     
     def _generate_preco(self, symbols: Tuple[Symbol, Symbol, Symbol], rng: SeededRNG, 
                        future: Symbol) -> str:
-        templates = self.templates.get("preco_templates", [])
-        if not templates:
-            templates = ["Por {prazo}, renuncie a {renuncia} — para que {sombra} não governe."]
-        template = rng.choice(templates)
+        compiled = self.certified
+        template = rng.choice(compiled.preco)
         sombra = future.correspondencias.get("sombra", "algo")
         qualidade = future.correspondencias.get("qualidade", "algo")
-        time_refs = self.templates.get("time_references", ["48h", "24h", "3 dias"])
-        renuncias = self.templates.get("renuncias", ["perguntar de novo por 48h"])
-        prazo = rng.choice(time_refs)
-        renuncia = rng.choice(renuncias)
+        prazo = rng.choice(compiled.time_references)
+        renuncia = rng.choice(compiled.renuncias)
         
         if sombra == "rigidez":
             renuncia = "controle excessivo" if "controle" not in renuncia else renuncia
@@ -381,12 +413,12 @@ class Interpreter:
             renuncia = "repetir a mesma pergunta" if "pergunta" not in renuncia else renuncia
         
         acao_proibida = "perguntar de novo" if "perguntar" in renuncia else ("repetir" if "repetir" in renuncia else "fazer")
-        return template.format(
-            prazo=prazo, renuncia=renuncia, sombra=sombra, 
-            qualidade=qualidade, acao_proibida=acao_proibida
-        )
+        return template.render({
+            "prazo": prazo, "renuncia": renuncia, "sombra": sombra,
+            "qualidade": qualidade, "acao_proibida": acao_proibida
+        })
     
-    def _extract_topic(self, question: str) -> str:
+    def _extract_topic(self, question: str, matches: Optional[MatchSet] = None) -> str:
         if self.topic_extractor:
-            return self.topic_extractor.get_primary_topic(question)
+            return self.topic_extractor.get_primary_topic(question, matches)
         return "geral"
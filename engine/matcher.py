@@ -0,0 +1,140 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Automaton:
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._always: Tuple[int, ...] = ()
+
+        always = []
+        for pattern in patterns:
+            if pattern in self._ids:
+                continue
+            pattern_id = len(self.patterns)
+            self._ids[pattern] = pattern_id
+            self.patterns.append(pattern)
+            if not pattern:
+                always.append(pattern_id)
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (pattern_id,)
+        self._always = tuple(always)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def pattern_id(self, pattern: str) -> Optional[int]:
+        return self._ids.get(pattern)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        for pattern_id in self._always:
+            yield pattern_id, 0
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in out[node]:
+                yield pattern_id, end
+
+    def find_all(self, text: str) -> set:
+        return {pattern_id for pattern_id, _ in self.iter_matches(text)}
+
+
+@dataclass
+class MatchSet:
+    patterns: frozenset = frozenset()
+    taboo_index: Optional[int] = None
+    domain_scores: List[Tuple[str, int]] = field(default_factory=list)
+    symbol_hits: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    def contra_hits(self, symbol_index: int) -> int:
+        return self.symbol_hits.get(symbol_index, (0, 0))[0]
+
+    def gatilho_hits(self, symbol_index: int) -> int:
+        return self.symbol_hits.get(symbol_index, (0, 0))[1]
+
+
+class TriggerMatcher:
+    def __init__(self, symbols: list, taboos: Optional[list] = None):
+        self.taboos = list(taboos or [])
+        self.domains: List[str] = []
+
+        tags: Dict[str, list] = {}
+
+        def tag(pattern: str, value: tuple):
+            tags.setdefault(pattern.lower(), []).append(value)
+
+        for taboo_index, taboo_data in enumerate(self.taboos):
+            for trigger in taboo_data.get("triggers", []):
+                tag(trigger, ("taboo", taboo_index))
+
+        domain_order = {}
+        for symbol_index, symbol in enumerate(symbols):
+            for contra in symbol.contraindicacoes:
+                tag(contra, ("contra", symbol_index))
+            for gatilho in symbol.gatilhos:
+                tag(gatilho, ("gatilho", symbol_index))
+            for domain in symbol.dominios:
+                if domain not in domain_order:
+                    domain_order[domain] = len(self.domains)
+                    self.domains.append(domain)
+                for keyword in symbol.gatilhos:
+                    tag(keyword, ("domain", domain_order[domain]))
+                tag(domain, ("domain", domain_order[domain]))
+
+        self.automaton = Automaton(tags)
+        self._tags = [tuple(tags[pattern]) for pattern in self.automaton.patterns]
+
+    def scan(self, question: str) -> MatchSet:
+        hit_ids = self.automaton.find_all(question.lower())
+
+        taboo_index = None
+        domain_scores: Dict[int, int] = {}
+        symbol_hits: Dict[int, list] = {}
+        for pattern_id in hit_ids:
+            for kind, index in self._tags[pattern_id]:
+                if kind == "taboo":
+                    if taboo_index is None or index < taboo_index:
+                        taboo_index = index
+                elif kind == "domain":
+                    domain_scores[index] = domain_scores.get(index, 0) + 1
+                else:
+                    hits = symbol_hits.setdefault(index, [0, 0])
+                    hits[0 if kind == "contra" else 1] += 1
+
+        ranked = sorted(domain_scores.items(), key=lambda x: (-x[1], x[0]))
+        return MatchSet(
+            patterns=frozenset(self.automaton.patterns[i] for i in hit_ids),
+            taboo_index=taboo_index,
+            domain_scores=[(self.domains[i], score) for i, score in ranked],
+            symbol_hits={i: tuple(hits) for i, hits in symbol_hits.items()}
+        )
@@ -1,4 +1,6 @@
-from typing import Dict, List, Tuple, Optional
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 from enum import Enum
 from .state import State
 from .deck import Symbol
@@ -133,6 +135,87 @@ class SentencePlanner:
         return self.rng.choice(connectors_by_relation.get(relation, ["então"]))
 
 
+class LintMatch(NamedTuple):
+    rule: str
+    offset: int
+    text: str
+
+
+class PatternScanner:
+    def __init__(self, literals: List[Tuple[str, str]], expressions: List[Tuple[str, str]] = (),
+                 repeated: Set[str] = frozenset()):
+        rules_by_literal: Dict[str, List[str]] = {}
+        for rule, literal in literals:
+            rules_by_literal.setdefault(literal, []).append(rule)
+        self.plan = [
+            (literal, tuple(rules), frozenset(rules), any(rule in repeated for rule in rules))
+            for literal, rules in rules_by_literal.items()
+        ]
+        self.expressions = [(rule, re.compile(pattern)) for rule, pattern in expressions]
+    
+    def scan(self, text: str) -> List[LintMatch]:
+        matches = []
+        append = matches.append
+        satisfied = set()
+        find = text.find
+        for literal, rules, rule_set, repeated in self.plan:
+            if rule_set <= satisfied:
+                continue
+            offset = find(literal)
+            if offset == -1:
+                continue
+            if not repeated:
+                satisfied |= rule_set
+            while offset != -1:
+                for rule in rules:
+                    append(LintMatch(rule, offset, literal))
+                offset = find(literal, offset + 1) if repeated else -1
+        for rule, expression in self.expressions:
+            found = expression.search(text)
+            if found:
+                append(LintMatch(rule, found.start(), found.group()))
+        return matches
+
+
+DEADLINE_EXPRESSION = r'\b(?:hoje|24h|48h|\d+\s*dias?)\b'
+
+READING_SCANNER = PatternScanner(
+    [("has_thesis", "tese:"),
+     ("evidence", "evidência:"), ("evidence", "observe:"),
+     ("has_warrant", "por isso"), ("has_warrant", "logo"), ("has_warrant", "se"),
+     ("has_warrant", "caso"), ("has_warrant", "no entanto"), ("has_warrant", "regra:"),
+     ("has_qualifier", "provável"), ("has_qualifier", "possível"), ("has_qualifier", "se "),
+     ("has_qualifier", "caso"), ("has_qualifier", "quando"),
+     ("has_limit", "limite:"), ("has_limit", "não confunda"),
+     ("has_limit", "isto falha quando"), ("has_limit", "exceção"),
+     ("condition_se", "se"), ("condition_entao", "então"),
+     ("evidence_start", "evidência")],
+    repeated={"evidence", "evidence_start"}
+)
+
+ATO_SCANNER = PatternScanner(
+    [("criterion", word) for word in ["anote", "escreva", "liste", "observe", "documente", "registre", "identifique"]],
+    [("deadline", DEADLINE_EXPRESSION)]
+)
+
+PRECO_SCANNER = PatternScanner(
+    [("abstract", "moral"), ("abstract", "espiritual"), ("abstract", "abstrato"),
+     ("renounce", "renuncie"), ("renounce", "não")],
+    [("deadline", DEADLINE_EXPRESSION)]
+)
+
+CONTRADICTION_PAIRS = [
+    ("faça", "não faça"),
+    ("sim", "não"),
+    ("sempre", "nunca")
+]
+
+CONTRADICTION_SCANNER = PatternScanner(
+    [(word, word) for pair in CONTRADICTION_PAIRS for word in pair] + [("no entanto", "no entanto")],
+    repeated={"no entanto"}
+)
+
+
 class CoherenceChecker:
     def check(self, reading_text: str, has_thesis: bool, has_tension: bool, 
               has_ato: bool, has_preco: bool) -> Dict[str, bool]:
@@ -147,19 +230,21 @@ class CoherenceChecker:
         return checks
     
     def _check_contradiction(self, text: str) -> bool:
-        text_lower = text.lower()
-        contradictions = [
-            ("faça", "não faça"),
-            ("sim", "não"),
-            ("sempre", "nunca")
-        ]
+        first = {}
+        softeners = []
+        for match in CONTRADICTION_SCANNER.scan(text.lower()):
+            if match.rule == "no entanto":
+                softeners.append(match.offset)
+            first.setdefault(match.rule, match.offset)
         
-        for pos, neg in contradictions:
-            if pos in text_lower and neg in text_lower:
-                pos_idx = text_lower.find(pos)
-                neg_idx = text_lower.find(neg)
+        for pos, neg in CONTRADICTION_PAIRS:
+            if pos in first and neg in first:
+                pos_idx = first[pos]
+                neg_idx = first[neg]
                 if abs(pos_idx - neg_idx) < 100:
-                    if "no entanto" not in text_lower[max(0, pos_idx-50):pos_idx+50]:
+                    start = max(0, pos_idx - 50)
+                    end = pos_idx + 50
+                    if not any(start <= s and s + len("no entanto") <= end for s in softeners):
                         return False
         return True
     
@@ -168,63 +253,84 @@ class CoherenceChecker:
         return all(checks.get(key, False) for key in required) and checks.get("no_explicit_contradiction", True)
 
 
+REQUIRED_CHECKS = [
+    "has_thesis", "evidence_count_ok", "has_warrant", 
+    "has_qualifier", "has_limit", "has_condition",
+    "ato_has_deadline", "ato_has_criterion", 
+    "preco_has_deadline", "preco_is_concrete"
+]
+
+
+@dataclass
+class LintReport:
+    checks: Dict
+    violations: List[str]
+    evidence_lines: Set[int]
+    matches: Dict[str, List[LintMatch]] = field(default_factory=dict)
+    
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+    
+    def to_dict(self) -> Dict:
+        return {
+            "ok": self.ok,
+            "checks": self.checks,
+            "violations": self.violations
+        }
+
+
 class ObjectiveLinter:
-    def lint(self, reading_text: str, ato: str, preco: str) -> Dict:
-        import re
-        
+    def report(self, reading_text: str, ato: str, preco: str) -> LintReport:
         text_lower = reading_text.lower()
-        lines = reading_text.split('\n')
-        
-        has_thesis = "tese:" in text_lower
-        
-        evidence_count = sum(1 for line in lines if "evidência:" in line.lower() or "observe:" in line.lower() or line.strip().startswith("Evidência"))
-        
-        warrant_connectors = ["por isso", "logo", "se", "caso", "no entanto", "regra:"]
-        has_warrant = any(conn in text_lower for conn in warrant_connectors) or "regra:" in text_lower
-        
-        qualifier_words = ["provável", "possível", "se ", "caso", "quando"]
-        has_qualifier = any(word in text_lower for word in qualifier_words)
-        
-        limit_indicators = ["limite:", "não confunda", "isto falha quando", "exceção"]
-        has_limit = any(ind in text_lower for ind in limit_indicators)
+        aligned = len(text_lower) == len(reading_text)
+        reading_matches = READING_SCANNER.scan(text_lower)
         
-        has_condition = "se" in text_lower and "então" in text_lower
+        found = set()
+        evidence_lines = set()
+        for match in reading_matches:
+            rule = match.rule
+            if rule == "evidence":
+                evidence_lines.add(text_lower.count("\n", 0, match.offset))
+            elif rule == "evidence_start":
+                line_start = text_lower.rfind("\n", 0, match.offset) + 1
+                at_line_start = match.offset == line_start or text_lower[line_start:match.offset].isspace()
+                if aligned and at_line_start and reading_text.startswith("Evidência", match.offset):
+                    evidence_lines.add(text_lower.count("\n", 0, match.offset))
+            else:
+                found.add(rule)
+        if not aligned:
+            lines = reading_text.split('\n')
+            evidence_lines.update(i for i, l in enumerate(lines) if l.strip().startswith("Evidência"))
         
-        deadline_pattern = r'\b(hoje|24h|48h|\d+\s*dias?)\b'
-        ato_has_deadline = bool(re.search(deadline_pattern, ato, re.IGNORECASE))
-        preco_has_deadline = bool(re.search(deadline_pattern, preco, re.IGNORECASE))
-        
-        criterion_words = ["anote", "escreva", "liste", "observe", "documente", "registre", "identifique"]
-        ato_has_criterion = any(word in ato.lower() for word in criterion_words)
-        
-        preco_is_concrete = not any(word in preco.lower() for word in ["moral", "espiritual", "abstrato"]) and ("renuncie" in preco.lower() or "não" in preco.lower())
+        ato_matches = ATO_SCANNER.scan(ato.lower())
+        ato_rules = {match.rule for match in ato_matches}
+        preco_matches = PRECO_SCANNER.scan(preco.lower())
+        preco_rules = {match.rule for match in preco_matches}
         
+        evidence_count = len(evidence_lines)
         checks = {
-            "has_thesis": has_thesis,
+            "has_thesis": "has_thesis" in found,
             "evidence_count": evidence_count,
             "evidence_count_ok": evidence_count >= 2,
-            "has_warrant": has_warrant,
-            "has_qualifier": has_qualifier,
-            "has_limit": has_limit,
-            "has_condition": has_condition,
-            "ato_has_deadline": ato_has_deadline,
-            "ato_has_criterion": ato_has_criterion,
-            "preco_has_deadline": preco_has_deadline,
-            "preco_is_concrete": preco_is_concrete
+            "has_warrant": "has_warrant" in found,
+            "has_qualifier": "has_qualifier" in found,
+            "has_limit": "has_limit" in found,
+            "has_condition": "condition_se" in found and "condition_entao" in found,
+            "ato_has_deadline": "deadline" in ato_rules,
+            "ato_has_criterion": "criterion" in ato_rules,
+            "preco_has_deadline": "deadline" in preco_rules,
+            "preco_is_concrete": "abstract" not in preco_rules and "renounce" in preco_rules
         }
         
-        required_checks = [
-            "has_thesis", "evidence_count_ok", "has_warrant", 
-            "has_qualifier", "has_limit", "has_condition",
-            "ato_has_deadline", "ato_has_criterion", 
-            "preco_has_deadline", "preco_is_concrete"
-        ]
-        
-        violations = [key for key in required_checks if not checks.get(key, False)]
-        ok = len(violations) == 0
+        violations = [key for key in REQUIRED_CHECKS if not checks.get(key, False)]
         
-        return {
-            "ok": ok,
-            "checks": checks,
-            "violations": violations
-        }
+        return LintReport(
+            checks=checks,
+            violations=violations,
+            evidence_lines=evidence_lines,
+            matches={"reading": reading_matches, "ato": ato_matches, "preco": preco_matches}
+        )
+    
+    def lint(self, reading_text: str, ato: str, preco: str) -> Dict:
+        return self.report(reading_text, ato, preco).to_dict()
@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+DEFAULT_PAGE_SIZE = 20
+OFFSET_SIZE = 8
+
+
+def index_path_for(path) -> str:
+    return str(path) + ".idx"
+
+
+def _to_array(data: bytes) -> array:
+    offsets = array('Q')
+    offsets.frombytes(data[:len(data) - len(data) % OFFSET_SIZE])
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+def _to_bytes(offsets: Sequence[int]) -> bytes:
+    packed = array('Q', offsets)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+class RegisterPage(NamedTuple):
+    readings: List[Dict]
+    total: int
+    before: int
+    next_before: Optional[int]
+
+
+class ReadingIndex:
+    def __init__(self, path):
+        self.path = str(path)
+        self.index_path = index_path_for(path)
+
+    def count(self) -> int:
+        return file_size(self.index_path) // OFFSET_SIZE
+
+    def append(self, offsets: Sequence[int]):
+        if not offsets:
+            return
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, _to_bytes(offsets))
+        finally:
+            os.close(fd)
+
+    def reconcile(self) -> int:
+        data_size = file_size(self.path)
+        count = self.count()
+        if count == 0 or data_size == 0:
+            return self.rebuild()
+        with open(self.path, 'rb') as f:
+            last = self._offsets(count - 1, count)[0]
+            if last >= data_size or (last and os.pread(f.fileno(), 1, last - 1) != b"\n"):
+                return self.rebuild()
+            f.seek(last)
+            f.readline()
+            offsets = self._scan(f)
+        if file_size(self.index_path) % OFFSET_SIZE:
+            os.truncate(self.index_path, count * OFFSET_SIZE)
+        self.append(offsets)
+        return len(offsets)
+
+    def rebuild(self) -> int:
+        offsets: List[int] = []
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                offsets = self._scan(f)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_to_bytes(offsets))
+        os.replace(tmp_path, self.index_path)
+        return len(offsets)
+
+    def page(self, before: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE) -> RegisterPage:
+        total = self.count()
+        before = total if before is None else max(0, min(before, total))
+        start = max(0, before - limit)
+        readings = self.read(start, before)
+        readings.reverse()
+        return RegisterPage(readings, total, before, start if start > 0 else None)
+
+    def read(self, start: int, stop: int) -> List[Dict]:
+        total = self.count()
+        stop = min(stop, total)
+        if start >= stop:
+            return []
+        bounds = self._offsets(start, min(stop + 1, total))
+        with open(self.path, 'rb') as f:
+            if len(bounds) > stop - start:
+                data = os.pread(f.fileno(), bounds[-1] - bounds[0], bounds[0])
+            else:
+                f.seek(bounds[0])
+                data = f.read(bounds[-1] - bounds[0])
+                data += f.readline()
+        readings = []
+        lines = [line for line in data.splitlines() if line.strip()]
+        for number, line in zip(range(start, stop), lines):
+            reading = json.loads(line)
+            reading["id"] = number
+            readings.append(reading)
+        return readings
+
+    def _offsets(self, start: int, stop: int) -> array:
+        with open(self.index_path, 'rb') as f:
+            f.seek(start * OFFSET_SIZE)
+            return _to_array(f.read((stop - start) * OFFSET_SIZE))
+
+    @staticmethod
+    def _scan(f) -> List[int]:
+        offsets = []
+        position = f.tell()
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+        return offsets
@@ -0,0 +1,88 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from .snapshot import CompiledEngine
+
+logger = logging.getLogger(__name__)
+
+
+def file_stamps(paths: Iterable[str]) -> Tuple:
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+class EngineReloader:
+    def __init__(self, engine: CompiledEngine, load: Callable[[], CompiledEngine], paths: Iterable = (),
+                 on_swap: Optional[Callable[[CompiledEngine], None]] = None):
+        self.engine = engine
+        self.load = load
+        self.paths = [str(path) for path in paths]
+        self.on_swap = on_swap
+        self.generation = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._stamps = file_stamps(self.paths)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reload(self) -> bool:
+        with self._lock:
+            self._stamps = file_stamps(self.paths)
+            current = self.engine
+            try:
+                engine = self.load()
+                if engine.digest == current.digest:
+                    return False
+                if self.on_swap is not None:
+                    self.on_swap(engine)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.error("Recarga do motor falhou, mantendo a versão %s: %s", current.version, e)
+                return False
+            self.engine = engine
+            self.generation += 1
+            self.last_error = None
+            return True
+
+    def reload_in_background(self):
+        threading.Thread(target=self.reload, name="engine-reload", daemon=True).start()
+
+    def poll(self) -> bool:
+        stamps = file_stamps(self.paths)
+        if stamps == self._stamps:
+            return False
+        self._stamps = stamps
+        return True
+
+    def watch(self, interval: float) -> "EngineReloader":
+        def run():
+            while not self._stop.wait(interval):
+                if self.poll():
+                    self.reload()
+
+        self._thread = threading.Thread(target=run, name="engine-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.engine.version,
+            "generation": self.generation,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
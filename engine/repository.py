@@ -0,0 +1,551 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from .filelock import FileLock
+from .register import DEFAULT_PAGE_SIZE, ReadingIndex, RegisterPage, file_size
+from .segments import DEFAULT_CODEC, DEFAULT_SEGMENT_BYTES, DEFAULT_SEGMENT_SECONDS, SegmentStore
+
+STORE_JSONL = "jsonl"
+STORE_SQLITE = "sqlite"
+COUNT_FIELDS = ("symbol", "topic", "relation", "attempt")
+SCAN_BLOCK = 512
+IMPORT_BATCH = 1000
+
+
+class ReadingFilter(NamedTuple):
+    symbol: Optional[str] = None
+    topic: Optional[str] = None
+    relation: Optional[str] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    min_attempt: Optional[int] = None
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in self)
+
+    def matches(self, record: Dict) -> bool:
+        if self.symbol is not None and self.symbol not in record.get("symbols", ()):
+            return False
+        if self.topic is not None and record.get("topic", "") != self.topic:
+            return False
+        if self.relation is not None and record.get("relation", "") != self.relation:
+            return False
+        timestamp = record.get("timestamp", 0)
+        if self.since is not None and timestamp < self.since:
+            return False
+        if self.until is not None and timestamp >= self.until:
+            return False
+        if self.min_attempt is not None and record.get("attempt", 0) < self.min_attempt:
+            return False
+        return True
+
+
+NO_FILTER = ReadingFilter()
+
+
+class ReadingRepository(ABC):
+    name = ""
+    path = ""
+
+    def open(self):
+        pass
+
+    @abstractmethod
+    def write(self, lines: Sequence[str]) -> int:
+        ...
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def last_modified(self) -> float:
+        ...
+
+    @abstractmethod
+    def iter_readings(self, filters: ReadingFilter = NO_FILTER, before: Optional[int] = None,
+                      newest_first: bool = True) -> Iterator[Dict]:
+        ...
+
+    def page(self, before: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+             filters: ReadingFilter = NO_FILTER) -> RegisterPage:
+        total = self.count()
+        before = total if before is None else max(0, min(before, total))
+        readings = []
+        for reading in self.iter_readings(filters, before):
+            readings.append(reading)
+            if len(readings) > limit:
+                break
+        next_before = readings[limit - 1]["id"] if len(readings) > limit else None
+        return RegisterPage(readings[:limit], total, before, next_before)
+
+    def disk_usage(self) -> Dict[str, int]:
+        return {}
+
+    def counts(self, field: str, filters: ReadingFilter = NO_FILTER) -> List[Tuple[object, int]]:
+        if field not in COUNT_FIELDS:
+            raise ValueError(f"Campo de contagem inválido: {field}")
+        counter: Counter = Counter()
+        for reading in self.iter_readings(filters):
+            if field == "symbol":
+                counter.update(reading.get("symbols", ()))
+            else:
+                counter[reading.get(field, 0 if field == "attempt" else "")] += 1
+        return sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+class JsonlRepository(ReadingRepository):
+    name = STORE_JSONL
+
+    def __init__(self, path, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 segment_seconds: float = DEFAULT_SEGMENT_SECONDS, codec: str = DEFAULT_CODEC):
+        self.path = str(path)
+        self.index = ReadingIndex(path)
+        self.segments = SegmentStore(Path(path).parent / "segments", codec)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compression_errors = 0
+        self._fd: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path + ".lock")
+        self._active_since: Optional[float] = None
+        self._compressor: Optional[ThreadPoolExecutor] = None
+
+    def open(self):
+        with self._lock, self._file_lock.hold():
+            self.index.reconcile()
+            pending = self.segments.recover()
+        for entry in pending:
+            self._compress_later(entry)
+
+    def write(self, lines: Sequence[str]) -> int:
+        encoded = [line.encode('utf-8') for line in lines]
+        data = b"".join(encoded)
+        with self._lock, self._file_lock.hold():
+            self._follow_replacement()
+            if self._should_roll():
+                self.roll()
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self._inode = os.fstat(self._fd).st_ino
+            position = os.fstat(self._fd).st_size
+            view = memoryview(data)
+            offsets = []
+            end = position
+            for line in encoded:
+                offsets.append(end)
+                end += len(line)
+            try:
+                while view:
+                    view = view[os.write(self._fd, view):]
+                self.index.append(offsets)
+            except OSError:
+                # Sem a linha pela metade, o ReadingWriter pode repetir o lote inteiro.
+                os.ftruncate(self._fd, position)
+                raise
+        return len(data)
+
+    def roll(self) -> Optional[Dict]:
+        with self._lock, self._file_lock.hold():
+            self._follow_replacement()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            count = self.index.count()
+            if count == 0:
+                return None
+            entry = self.segments.add(self.path, self.segments.total(), count)
+            self.index.rebuild()
+            self._active_since = None
+            self._inode = None
+        self._compress_later(entry)
+        return entry
+
+    def sync(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+        self._file_lock.close()
+
+    def count(self) -> int:
+        with self._lock, self._file_lock.hold(exclusive=False):
+            return self.segments.total() + self.index.count()
+
+    def last_modified(self) -> float:
+        return max(_mtime(self.index.index_path), _mtime(self.segments.manifest_path))
+
+    def page(self, before: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+             filters: ReadingFilter = NO_FILTER) -> RegisterPage:
+        if filters.active:
+            return super().page(before, limit, filters)
+        total = self.count()
+        before = total if before is None else max(0, min(before, total))
+        start = max(0, before - limit)
+        readings = self.read(start, before)
+        readings.reverse()
+        return RegisterPage(readings, total, before, start if start > 0 else None)
+
+    def read(self, start: int, stop: int) -> List[Dict]:
+        readings = []
+        with self._lock, self._file_lock.hold(exclusive=False):
+            base = self.segments.total()
+            segments = self.segments.segments()
+            active = self.index.read(max(start - base, 0), stop - base) if stop > base else []
+        for entry in segments:
+            first = entry["first_id"]
+            lo, hi = max(start, first), min(stop, first + entry["count"])
+            if lo >= hi:
+                continue
+            lines = self.segments.lines(entry)
+            for number in range(lo, hi):
+                reading = json.loads(lines[number - first])
+                reading["id"] = number
+                readings.append(reading)
+        for reading in active:
+            reading["id"] += base
+            readings.append(reading)
+        return readings
+
+    def iter_readings(self, filters: ReadingFilter = NO_FILTER, before: Optional[int] = None,
+                      newest_first: bool = True) -> Iterator[Dict]:
+        with self._lock, self._file_lock.hold(exclusive=False):
+            base = self.segments.total()
+            spans = [(e["first_id"], e["first_id"] + e["count"], e) for e in self.segments.segments()]
+            spans.append((base, base + self.index.count(), None))
+        before = spans[-1][1] if before is None else before
+        if newest_first:
+            spans.reverse()
+        for first, last, entry in spans:
+            last = min(last, before)
+            if first >= last or (entry is not None and not self._may_match(entry, filters)):
+                continue
+            blocks = range(first, last, SCAN_BLOCK)
+            for block in (reversed(blocks) if newest_first else blocks):
+                readings = self.read(block, min(block + SCAN_BLOCK, last))
+                for reading in (reversed(readings) if newest_first else readings):
+                    if filters.matches(reading):
+                        yield reading
+
+    def disk_usage(self) -> Dict[str, int]:
+        usage = self.segments.disk_bytes()
+        usage["active_bytes"] = file_size(self.path)
+        return usage
+
+    @staticmethod
+    def _may_match(entry: Dict, filters: ReadingFilter) -> bool:
+        if entry["first_ts"] is None:
+            return True
+        if filters.since is not None and entry["last_ts"] < filters.since:
+            return False
+        if filters.until is not None and entry["first_ts"] >= filters.until:
+            return False
+        return True
+
+    def _follow_replacement(self):
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != self._inode:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._active_since = None
+            self._inode = inode
+
+    def _should_roll(self) -> bool:
+        if self.index.count() == 0:
+            return False
+        if self.segment_bytes and file_size(self.path) >= self.segment_bytes:
+            return True
+        if self.segment_seconds:
+            if self._active_since is None:
+                try:
+                    self._active_since = self.index.read(0, 1)[0].get("timestamp", 0)
+                except (ValueError, IndexError):
+                    self._active_since = time.time()
+            return time.time() - self._active_since >= self.segment_seconds
+        return False
+
+    def _compress_later(self, entry: Dict):
+        if self._compressor is None:
+            self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment-compressor")
+        self._compressor.submit(self._compress, entry)
+
+    def _compress(self, entry: Dict):
+        try:
+            self.segments.compress(entry)
+        except (OSError, ValueError):
+            self.compression_errors += 1
+
+
+def _mtime(path) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    topic TEXT NOT NULL DEFAULT '',
+    relation TEXT NOT NULL DEFAULT '',
+    attempt INTEGER NOT NULL DEFAULT 0,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reading_symbols (
+    reading_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (reading_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS readings_timestamp ON readings (timestamp, topic, relation, attempt);
+CREATE INDEX IF NOT EXISTS readings_topic ON readings (topic, id);
+CREATE INDEX IF NOT EXISTS readings_relation ON readings (relation, id);
+CREATE INDEX IF NOT EXISTS readings_attempt ON readings (attempt, id);
+CREATE INDEX IF NOT EXISTS reading_symbols_symbol ON reading_symbols (symbol, reading_id);
+CREATE INDEX IF NOT EXISTS reading_symbols_timestamp ON reading_symbols (timestamp, symbol);
+"""
+
+
+class SqliteRepository(ReadingRepository):
+    name = STORE_SQLITE
+
+    def __init__(self, path, synchronous: str = "NORMAL"):
+        self.path = str(path)
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._readers = set()
+        self._schema_ready = False
+        self._writer: Optional[sqlite3.Connection] = None
+        self._dirty = False
+
+    def open(self):
+        self._create_schema()
+        self._writer = self._connect()
+        self._writer.execute(f"PRAGMA synchronous={self.synchronous}")
+
+    def write(self, lines: Sequence[str]) -> int:
+        if self._writer is None:
+            self.open()
+        records = [json.loads(line) for line in lines]
+        size = sum(len(line.encode('utf-8')) for line in lines)
+        with self._writer:
+            # Outros processos gravam no mesmo banco: o id é alocado sob a trava de escrita.
+            self._writer.execute("BEGIN IMMEDIATE")
+            first_id = self._writer.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM readings").fetchone()[0]
+            rows = []
+            symbol_rows = []
+            for reading_id, (line, record) in enumerate(zip(lines, records), first_id):
+                timestamp = record.get("timestamp", 0)
+                rows.append((reading_id, timestamp, record.get("topic", ""),
+                             record.get("relation", ""), record.get("attempt", 0), line.rstrip("\n")))
+                symbol_rows.extend((reading_id, position, symbol, timestamp)
+                                   for position, symbol in enumerate(record.get("symbols", ())))
+            self._writer.executemany(
+                "INSERT INTO readings (id, timestamp, topic, relation, attempt, record) VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+            self._writer.executemany(
+                "INSERT INTO reading_symbols (reading_id, position, symbol, timestamp) VALUES (?, ?, ?, ?)", symbol_rows)
+        self._dirty = True
+        return size
+
+    def sync(self):
+        if self._writer is not None and self._dirty:
+            self._writer.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self._dirty = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        with self._lock:
+            readers, self._readers = self._readers, set()
+        for connection in readers:
+            connection.close()
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COALESCE(MAX(id) + 1, 0) FROM readings").fetchone()[0]
+
+    def last_modified(self) -> float:
+        return max(_mtime(self.path), _mtime(self.path + "-wal"))
+
+    def disk_usage(self) -> Dict[str, int]:
+        return {"bytes": file_size(self.path) + file_size(self.path + "-wal")}
+
+    def iter_readings(self, filters: ReadingFilter = NO_FILTER, before: Optional[int] = None,
+                      newest_first: bool = True) -> Iterator[Dict]:
+        where, params = self._where(filters)
+        id_bound = "+readings.id < ?" if self._timed(filters) else "readings.id < ?"
+        order = "DESC" if newest_first else "ASC"
+        cursor = self._reader().execute(
+            f"SELECT id, record FROM readings WHERE {id_bound}{where} ORDER BY id {order}",
+            [self.count() if before is None else before, *params])
+        for reading_id, record in cursor:
+            reading = json.loads(record)
+            reading["id"] = reading_id
+            yield reading
+
+    def page(self, before: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+             filters: ReadingFilter = NO_FILTER) -> RegisterPage:
+        total = self.count()
+        before = total if before is None else max(0, min(before, total))
+        where, params = self._where(filters)
+        # Com intervalo de tempo, "+" impede o planner de preferir a varredura por id ao índice de timestamp.
+        id_bound = "+readings.id < ?" if self._timed(filters) else "readings.id < ?"
+        rows = self._reader().execute(
+            f"SELECT id, record FROM readings WHERE {id_bound}{where} ORDER BY id DESC LIMIT ?",
+            [before, *params, limit + 1]).fetchall()
+        readings = []
+        for reading_id, record in rows[:limit]:
+            reading = json.loads(record)
+            reading["id"] = reading_id
+            readings.append(reading)
+        next_before = readings[-1]["id"] if len(rows) > limit else None
+        return RegisterPage(readings, total, before, next_before)
+
+    def counts(self, field: str, filters: ReadingFilter = NO_FILTER) -> List[Tuple[object, int]]:
+        if field not in COUNT_FIELDS:
+            raise ValueError(f"Campo de contagem inválido: {field}")
+        where, params = self._where(filters)
+        group = "+" if self._timed(filters) else ""
+        if field == "symbol" and filters._replace(since=None, until=None).active:
+            query = ("SELECT s.symbol, COUNT(*) FROM reading_symbols s JOIN readings ON readings.id = s.reading_id "
+                     f"WHERE 1{where} GROUP BY s.symbol")
+        elif field == "symbol":
+            where = where.replace("readings.timestamp", "timestamp")
+            query = f"SELECT symbol, COUNT(*) FROM reading_symbols WHERE 1{where} GROUP BY {group}symbol"
+        else:
+            query = f"SELECT {field}, COUNT(*) FROM readings WHERE 1{where} GROUP BY {group}{field}"
+        rows = self._reader().execute(query, params).fetchall()
+        return sorted(rows, key=lambda item: (-item[1], str(item[0])))
+
+    @staticmethod
+    def _timed(filters: ReadingFilter) -> bool:
+        return filters.since is not None or filters.until is not None
+
+    def _where(self, filters: ReadingFilter) -> Tuple[str, List]:
+        clauses = []
+        params: List = []
+        if filters.symbol is not None:
+            clauses.append("readings.id IN (SELECT reading_id FROM reading_symbols WHERE symbol = ?)")
+            params.append(filters.symbol)
+        if filters.topic is not None:
+            clauses.append("readings.topic = ?")
+            params.append(filters.topic)
+        if filters.relation is not None:
+            clauses.append("readings.relation = ?")
+            params.append(filters.relation)
+        if filters.since is not None:
+            clauses.append("readings.timestamp >= ?")
+            params.append(filters.since)
+        if filters.until is not None:
+            clauses.append("readings.timestamp < ?")
+            params.append(filters.until)
+        if filters.min_attempt is not None:
+            clauses.append("readings.attempt >= ?")
+            params.append(filters.min_attempt)
+        return "".join(" AND " + clause for clause in clauses), params
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or connection not in self._readers:
+            self._create_schema()
+            connection = self._connect()
+            self._local.connection = connection
+            with self._lock:
+                self._readers.add(connection)
+        return connection
+
+    def _create_schema(self):
+        # O DDL pega a trava de escrita: roda uma vez por instância, nunca no caminho das leituras.
+        with self._lock:
+            if self._schema_ready:
+                return
+            connection = self._connect()
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+            finally:
+                connection.close()
+            self._schema_ready = True
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+
+
+def open_repository(store: str, storage_path, fsync_interval: Optional[float] = None,
+                    segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                    segment_seconds: float = DEFAULT_SEGMENT_SECONDS) -> ReadingRepository:
+    storage_path = Path(storage_path)
+    if store == STORE_JSONL:
+        return JsonlRepository(storage_path / "readings.jsonl", segment_bytes, segment_seconds)
+    if store == STORE_SQLITE:
+        if fsync_interval is None:
+            synchronous = "OFF"
+        elif fsync_interval == 0:
+            synchronous = "FULL"
+        else:
+            synchronous = "NORMAL"
+        return SqliteRepository(storage_path / "readings.db", synchronous=synchronous)
+    raise ValueError(f"Armazenamento de leituras desconhecido: {store}")
+
+
+def import_readings(source: ReadingRepository, target: ReadingRepository,
+                    batch_size: int = IMPORT_BATCH) -> int:
+    target.open()
+    if target.count():
+        raise ValueError("O repositório de destino já contém leituras")
+    imported = 0
+    batch: List[str] = []
+    for reading in source.iter_readings(newest_first=False):
+        del reading["id"]
+        batch.append(json.dumps(reading, ensure_ascii=False) + "\n")
+        if len(batch) >= batch_size:
+            imported += len(batch)
+            target.write(batch)
+            batch = []
+    if batch:
+        imported += len(batch)
+        target.write(batch)
+    target.sync()
+    return imported
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "storage/readings.jsonl"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(source), "readings.db")
+
+    repository = SqliteRepository(target)
+    try:
+        count = import_readings(JsonlRepository(source), repository)
+    finally:
+        repository.close()
+    print(f"{count} leituras importadas para {target}")
@@ -1,4 +1,6 @@
+import json
 import random
+from array import array
 import hashlib
 import unicodedata
 import re
@@ -19,6 +21,26 @@ def make_seed(base: str, question: str, count: int, offer: str = "") -> int:
     return int(hash_obj.hexdigest()[:16], 16)
 
 
+HASH_KEY = b"observador"
+
+
+def canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def stable_digest(*parts, digest_size: int = 16) -> str:
+    digest = hashlib.blake2b(key=HASH_KEY, digest_size=digest_size)
+    for part in parts:
+        data = part if isinstance(part, bytes) else canonical_json(part).encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def stable_hash(*parts) -> int:
+    return int(stable_digest(*parts, digest_size=8), 16)
+
+
 class SeededRNG:
     def __init__(self, seed: int):
         self.rng = random.Random(seed)
@@ -34,3 +56,7 @@ class SeededRNG:
     
     def randint(self, a, b):
         return self.rng.randint(a, b)
+    
+    def state_bytes(self) -> bytes:
+        _, internal, _ = self.rng.getstate()
+        return array('I', internal).tobytes()
@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional, Sequence
+from .rng import SeededRNG
+
+SAMPLER_V1 = "v1"
+SAMPLER_V2 = "v2"
+SAMPLER_VERSIONS = (SAMPLER_V1, SAMPLER_V2)
+
+
+class FenwickSampler:
+    def __init__(self, weights: Sequence[float]):
+        self.size = len(weights)
+        self.weights = [float(w) for w in weights]
+        self.tree = [0.0] * (self.size + 1)
+        for pos, weight in enumerate(self.weights, 1):
+            self.tree[pos] += weight
+            parent = pos + (pos & -pos)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[pos]
+        self.total = sum(self.weights)
+        self.live = sum(1 for w in self.weights if w > 0)
+        self.top = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def session(self) -> "SamplerSession":
+        return SamplerSession(self)
+
+
+class SamplerSession:
+    def __init__(self, base: FenwickSampler):
+        self.base = base
+        self.total = base.total
+        self.live = base.live
+        self.overrides: Dict[int, float] = {}
+        self.delta: Dict[int, float] = {}
+
+    def weight(self, index: int) -> float:
+        return self.overrides.get(index, self.base.weights[index])
+
+    def set_weight(self, index: int, weight: float):
+        previous = self.weight(index)
+        change = weight - previous
+        if not change:
+            return
+        self.live += (weight > 0) - (previous > 0)
+        self.overrides[index] = weight
+        self.total += change
+        pos = index + 1
+        while pos <= self.base.size:
+            self.delta[pos] = self.delta.get(pos, 0.0) + change
+            pos += pos & -pos
+
+    def remove(self, index: int):
+        self.set_weight(index, 0.0)
+
+    def find(self, target: float) -> int:
+        tree = self.base.tree
+        delta = self.delta
+        size = self.base.size
+        pos = 0
+        step = self.base.top
+        while step:
+            nxt = pos + step
+            if nxt <= size:
+                node = tree[nxt] + delta.get(nxt, 0.0)
+                if node <= target:
+                    pos = nxt
+                    target -= node
+            step >>= 1
+        return self._nearest_live(min(pos, size - 1))
+
+    def _nearest_live(self, index: int) -> int:
+        if self.weight(index) > 0:
+            return index
+        for candidate in range(index - 1, -1, -1):
+            if self.weight(candidate) > 0:
+                return candidate
+        for candidate in range(index + 1, self.base.size):
+            if self.weight(candidate) > 0:
+                return candidate
+        return index
+
+    def draw(self, rng: SeededRNG) -> Optional[int]:
+        if not self.live:
+            return None
+        return self.find(rng.random() * self.total)
+
+    def take(self, rng: SeededRNG, k: int) -> List[int]:
+        taken = []
+        while len(taken) < k:
+            index = self.draw(rng)
+            if index is None:
+                break
+            taken.append(index)
+            self.remove(index)
+        return taken
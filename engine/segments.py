@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from .filelock import FileLock
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+HAS_ZSTD = zstandard is not None
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+DEFAULT_CODEC = CODEC_ZSTD if HAS_ZSTD else CODEC_GZIP
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_SEGMENT_SECONDS = 24 * 60 * 60
+MANIFEST_VERSION = 1
+CACHED_SEGMENTS = 2
+
+_EXTENSIONS = {CODEC_GZIP: ".gz", CODEC_ZSTD: ".zst"}
+_RAW_SEGMENT = re.compile(r"^readings-(\d{10})\.jsonl$")
+
+
+def segment_name(first_id: int) -> str:
+    return f"readings-{first_id:010d}.jsonl"
+
+
+def compress_file(source: str, target: str, codec: str):
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        if codec == CODEC_ZSTD:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode='wb', compresslevel=6, mtime=0) as gz:
+                shutil.copyfileobj(src, gz, 1024 * 1024)
+    os.replace(tmp_path, target)
+
+
+def read_segment_bytes(path: str, codec: Optional[str]) -> bytes:
+    with open(path, 'rb') as f:
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+        if codec == CODEC_GZIP:
+            return gzip.GzipFile(fileobj=f, mode='rb').read()
+        return f.read()
+
+
+class SegmentStore:
+    def __init__(self, directory, codec: str = DEFAULT_CODEC):
+        if codec == CODEC_ZSTD and not HAS_ZSTD:
+            raise ValueError("Compressão zstd requer o pacote zstandard")
+        self.directory = Path(directory)
+        self.codec = codec
+        self.manifest_path = self.directory / "manifest.json"
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.directory / "manifest.lock")
+        self._segments: List[Dict] = []
+        self._stamp = None
+        self._cache: "OrderedDict[str, List[bytes]]" = OrderedDict()
+
+    def segments(self) -> List[Dict]:
+        with self._lock:
+            self._reload()
+            return list(self._segments)
+
+    def total(self) -> int:
+        with self._lock:
+            self._reload()
+            return self._total()
+
+    def add(self, path, first_id: int, count: int) -> Dict:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = segment_name(first_id)
+        with self._lock, self._file_lock.hold():
+            os.replace(path, self.directory / name)
+            self._reload()
+            entry = self._entry(name, first_id, count)
+            self._segments.append(entry)
+            self._save()
+        return entry
+
+    def recover(self) -> List[Dict]:
+        with self._lock, self._file_lock.hold():
+            self._reload()
+            if self.directory.exists():
+                known = {entry["file"] for entry in self._segments}
+                orphans = sorted(name for name in os.listdir(self.directory)
+                                 if _RAW_SEGMENT.match(name) and name not in known)
+                for name in orphans:
+                    first_id = int(_RAW_SEGMENT.match(name).group(1))
+                    if first_id != self._total():
+                        continue
+                    with open(self.directory / name, 'rb') as f:
+                        count = sum(1 for line in f if line.strip() and line.endswith(b"\n"))
+                    self._segments.append(self._entry(name, first_id, count))
+                if orphans:
+                    self._save()
+            return [entry for entry in self._segments if entry["codec"] is None]
+
+    def compress(self, entry: Dict) -> Dict:
+        raw_path = str(self.directory / entry["file"])
+        name = entry["file"] + _EXTENSIONS[self.codec]
+        try:
+            data = read_segment_bytes(raw_path, None)
+            compress_file(raw_path, str(self.directory / name), self.codec)
+        except FileNotFoundError:
+            return self._current(entry)
+        timestamps = [json.loads(line).get("timestamp", 0) for line in data.splitlines() if line.strip()]
+        with self._lock, self._file_lock.hold():
+            self._reload()
+            for index, current in enumerate(self._segments):
+                if current["file"] == entry["file"] and os.path.exists(raw_path):
+                    current = dict(current, file=name, codec=self.codec,
+                                   bytes=os.path.getsize(self.directory / name))
+                    if timestamps:
+                        current.update(first_ts=min(timestamps), last_ts=max(timestamps))
+                    self._segments[index] = current
+                    entry = current
+            self._save()
+            if os.path.exists(raw_path):
+                os.unlink(raw_path)
+        return entry
+
+    def lines(self, entry: Dict) -> List[bytes]:
+        for _ in range(2):
+            with self._lock:
+                cached = self._cache.get(entry["file"])
+                if cached is not None:
+                    self._cache.move_to_end(entry["file"])
+                    return cached
+            try:
+                data = read_segment_bytes(str(self.directory / entry["file"]), entry["codec"])
+            except FileNotFoundError:
+                entry = self._current(entry)
+                continue
+            lines = [line for line in data.splitlines() if line.strip()]
+            with self._lock:
+                self._cache[entry["file"]] = lines
+                while len(self._cache) > CACHED_SEGMENTS:
+                    self._cache.popitem(last=False)
+            return lines
+        raise FileNotFoundError(entry["file"])
+
+    def disk_bytes(self) -> Dict[str, int]:
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "raw_bytes": sum(entry["raw_bytes"] for entry in segments),
+            "bytes": sum(entry["bytes"] for entry in segments)
+        }
+
+    def _current(self, entry: Dict) -> Dict:
+        return next((e for e in self.segments() if e["first_id"] == entry["first_id"]), entry)
+
+    def _total(self) -> int:
+        if not self._segments:
+            return 0
+        return self._segments[-1]["first_id"] + self._segments[-1]["count"]
+
+    def _entry(self, name: str, first_id: int, count: int) -> Dict:
+        size = os.path.getsize(self.directory / name)
+        return {
+            "file": name,
+            "codec": None,
+            "first_id": first_id,
+            "count": count,
+            "first_ts": None,
+            "last_ts": None,
+            "raw_bytes": size,
+            "bytes": size
+        }
+
+    def _reload(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            self._segments, self._stamp = [], None
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._stamp:
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            self._segments = json.load(f)["segments"]
+        self._stamp = stamp
+
+    def _save(self):
+        tmp_path = str(self.manifest_path) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "segments": self._segments}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+        stat = os.stat(self.manifest_path)
+        self._stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
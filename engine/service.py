@@ -0,0 +1,166 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+from .deck import Deck, Symbol
+from .interpret import Interpreter
+from .matcher import MatchSet
+from .rng import make_seed, SeededRNG, stable_digest
+from .state import State
+from .taboos import check_taboos
+from .writer import ReadingWriter
+
+CRISIS_TABOO_ID = "T6"
+CRISIS_RESPONSE = "Eu não selo portas finais."
+CRISIS_ALTERNATIVE = "Procure ajuda agora. Se houver risco imediato, ligue para serviços de emergência locais."
+EMPTY_QUESTION = "Pergunta vazia."
+
+KIND_READING = "reading"
+KIND_TABOO = "taboo"
+KIND_CRISIS = "crisis"
+KIND_EMPTY = "empty"
+EVENT_RESULT = "result"
+
+
+@dataclass
+class ConsultResult:
+    question: str
+    kind: str
+    response: str = ""
+    alternative: str = ""
+    seed: Optional[int] = None
+    symbols: List[Symbol] = field(default_factory=list)
+    reading: Dict = field(default_factory=dict)
+    entropy_high: bool = False
+    record_line: Optional[str] = None
+
+    @property
+    def is_reading(self) -> bool:
+        return self.kind == KIND_READING
+
+
+class Draw(NamedTuple):
+    question: str
+    seed: int
+    rng: SeededRNG
+    symbols: Tuple[Symbol, Symbol, Symbol]
+    matches: MatchSet
+
+
+class ConsultationService:
+    def __init__(self, deck: Deck, interpreter: Interpreter, lore: dict, writer: ReadingWriter,
+                 engine_version: Optional[str] = None):
+        self.deck = deck
+        self.interpreter = interpreter
+        self.lore = lore
+        self.writer = writer
+        self.engine_version = engine_version
+        self.interference_threshold = lore.get('effects', {}).get('interference_threshold', 60)
+
+    def consult(self, state: State, question: str) -> ConsultResult:
+        result = self._consult(state, question)
+        if result.record_line is not None:
+            self._write([result.record_line])
+        return result
+
+    def consult_batch(self, state: State, questions: Sequence[str]) -> List[ConsultResult]:
+        results = [self._consult(state, question) for question in questions]
+        self._write([r.record_line for r in results if r.record_line is not None])
+        return results
+
+    def consult_stream(self, state: State, question: str) -> Iterator[Tuple[str, object]]:
+        draw = self._draw(state, question)
+        if isinstance(draw, ConsultResult):
+            yield EVENT_RESULT, draw
+            return
+        reading_data = yield from self.interpreter.interpret_stream(
+            state, draw.symbols, None, self.lore, draw.rng, question=draw.question, matches=draw.matches)
+        result = self._complete(state, draw, reading_data)
+        self._write([result.record_line])
+        yield EVENT_RESULT, result
+
+    def _consult(self, state: State, question: str) -> ConsultResult:
+        draw = self._draw(state, question)
+        if isinstance(draw, ConsultResult):
+            return draw
+        reading_data = self.interpreter.interpret(state, draw.symbols, None, self.lore, draw.rng,
+                                                  question=draw.question, matches=draw.matches)
+        return self._complete(state, draw, reading_data)
+
+    def _draw(self, state: State, question: str) -> Union[Draw, ConsultResult]:
+        question = question.strip()
+        if not question:
+            return ConsultResult(question, KIND_EMPTY, response=EMPTY_QUESTION)
+
+        lore = self.lore
+        matches = self.deck.scan(question)
+        taboo, _ = check_taboos(question, lore, matches)
+
+        if taboo and taboo.id == CRISIS_TABOO_ID:
+            return ConsultResult(question, KIND_CRISIS, response=CRISIS_RESPONSE, alternative=CRISIS_ALTERNATIVE)
+
+        if taboo:
+            state.apply_taboo_penalty(taboo.debt_delta, taboo.entropy_delta)
+            return ConsultResult(question, KIND_TABOO, response=taboo.response, alternative=taboo.alternative)
+
+        if state.check_repeat_question(question):
+            state.apply_repeat_penalty()
+
+        if "sim ou não" in question.lower() or "certeza" in question.lower():
+            state.apply_certainty_penalty()
+
+        state.consult_count += 1
+        state.remember_question(question)
+
+        seed = make_seed(state.session_seed_base, question, state.consult_count)
+        rng = SeededRNG(seed)
+
+        symbols = self.deck.draw_three(state, rng, question, matches)
+        state.last_draw = [s.id for s in symbols]
+
+        domains = []
+        for symbol in symbols:
+            domains.extend(symbol.dominios)
+        state.update_memory([s.id for s in symbols], domains)
+        return Draw(question, seed, rng, symbols, matches)
+
+    def _complete(self, state: State, draw: Draw, reading_data: Dict) -> ConsultResult:
+        question, seed, symbols = draw.question, draw.seed, draw.symbols
+        state.last_answer_hash = stable_digest(reading_data)
+
+        record = {
+            "timestamp": time.time(),
+            "question": question,
+            "seed": seed,
+            "engine_version": self.engine_version,
+            "symbols": [s.id for s in symbols],
+            "state_snapshot": state.to_dict(),
+            "reading_text": {
+                "seal": reading_data["seal"],
+                "liturgy": reading_data["liturgy"],
+                "reading": reading_data["reading"],
+                "coda": reading_data["coda"]
+            },
+            "ato": reading_data["ato"],
+            "preco": reading_data["preco"],
+            "relation": reading_data.get("relation", ""),
+            "topic": reading_data.get("topic", ""),
+            "objective_checks": reading_data.get("objective_checks", {}),
+            "attempt": reading_data.get("attempt", 0),
+            "sections_regenerated": reading_data.get("sections_regenerated", 0),
+            "selected_evidence": reading_data.get("selected_evidence", {}),
+            "interference_line": reading_data.get("interference_line", "")
+        }
+
+        return ConsultResult(
+            question, KIND_READING,
+            seed=seed,
+            symbols=list(symbols),
+            reading=reading_data,
+            entropy_high=state.entropy > self.interference_threshold,
+            record_line=json.dumps(record, ensure_ascii=False) + "\n"
+        )
+
+    def _write(self, lines: List[str]):
+        if lines:
+            self.writer.submit(lines)
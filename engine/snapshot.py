@@ -0,0 +1,248 @@
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import pickle
+import secrets
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+from .deck import Deck
+from .interpret import Interpreter
+from .rng import SeededRNG, stable_digest
+from .sampler import SAMPLER_V1
+from .state import State
+from .tables import SymbolTable, tables_path, write_tables
+
+SNAPSHOT_VERSION = 3
+SNAPSHOT_MAGIC = b"OBSVENG"
+SIGNATURE_SIZE = 32
+DATA_FILES = ("lore.json", "deck.json", "templates.json", "certification.json")
+ENGINE_PATH = Path(__file__).parent
+VERSION_SIZE = 12
+PROBE_QUESTION = "Como está o meu trabalho?"
+
+# Sem OBSERVADOR_SNAPSHOT_KEY, a chave é gerada uma vez e guardada fora de storage/, que pode ser compartilhado.
+KEY_PATH = ENGINE_PATH.parent / ".snapshot-key"
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledEngine:
+    def __init__(self, digest: str, lore: dict, deck: Deck, interpreter: Interpreter, sampler: str = SAMPLER_V1):
+        self.digest = digest
+        self.sampler = sampler
+        self.lore = lore
+        self.deck = deck
+        self.interpreter = interpreter
+
+    @property
+    def version(self) -> str:
+        return self.digest[:VERSION_SIZE]
+
+
+def _read(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return b""
+
+
+def source_digest(data_path, sampler: str = SAMPLER_V1) -> str:
+    data_path = Path(data_path)
+    sources = sorted(ENGINE_PATH.glob("*.py"))
+    return stable_digest(SNAPSHOT_VERSION, sampler, list(sys.version_info[:2]),
+                         *(_read(data_path / name) for name in DATA_FILES),
+                         *(_read(path) for path in sources))
+
+
+def compile_engine(data_path, sampler: str = SAMPLER_V1, digest: Optional[str] = None) -> CompiledEngine:
+    data_path = Path(data_path)
+    with open(data_path / "lore.json", 'r', encoding='utf-8') as f:
+        lore = json.load(f)
+    deck = Deck.load_from_json(str(data_path / "deck.json"), taboos=lore.get("taboos", []), sampler=sampler)
+    interpreter = Interpreter(str(data_path / "templates.json"), deck=deck)
+    engine = CompiledEngine(digest or source_digest(data_path, sampler), lore, deck, interpreter, sampler)
+    validate_engine(engine)
+    return engine
+
+
+def validate_engine(engine: CompiledEngine):
+    state = State("validacao", engine.deck.vocabulary)
+    rng = SeededRNG(0)
+    symbols = engine.deck.draw_three(state, rng, PROBE_QUESTION)
+    engine.interpreter.interpret(state, symbols, None, engine.lore, rng, question=PROBE_QUESTION)
+
+
+def snapshot_path(snapshot_dir, digest: str, sampler: str = SAMPLER_V1) -> Path:
+    return Path(snapshot_dir) / f"engine-{sampler}-{digest}.bin"
+
+
+def signing_key(secret: Optional[str] = None, key_path=KEY_PATH) -> Optional[bytes]:
+    if secret:
+        return hashlib.blake2b(secret.encode('utf-8'), digest_size=32).digest()
+    try:
+        return _persistent_key(Path(key_path))
+    except (OSError, ValueError) as e:
+        logger.warning("Sem chave para o snapshot do motor, compilando em memória: %s", e)
+        return None
+
+
+def _persistent_key(path: Path) -> bytes:
+    if not path.exists():
+        # Grava num arquivo exclusivo e publica com link: quem perder a corrida lê a chave de quem ganhou.
+        tmp_path = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secrets.token_bytes(SIGNATURE_SIZE))
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+    key = path.read_bytes()
+    if len(key) != SIGNATURE_SIZE:
+        raise ValueError(f"Chave do snapshot inválida em {path}")
+    return key
+
+
+def sign(key: bytes, tables: bytes, payload: bytes) -> bytes:
+    digest = hashlib.blake2b(key=key, digest_size=SIGNATURE_SIZE)
+    digest.update(tables)
+    digest.update(payload)
+    return digest.digest()
+
+
+def shared_columns(deck: Deck) -> dict:
+    return {
+        "static_weights": deck.static_weights,
+        "sampler_weights": deck.sampler.weights,
+        "sampler_tree": deck.sampler.tree
+    }
+
+
+class SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, deck: Deck):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared = {id(deck.symbols): ("symbols", None)}
+        self.shared.update({id(values): ("column", name) for name, values in shared_columns(deck).items()})
+
+    def persistent_id(self, obj):
+        return self.shared.get(id(obj))
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, table: SymbolTable):
+        super().__init__(file)
+        self.table = table
+
+    def persistent_load(self, pid):
+        kind, key = pid
+        if kind == "symbols":
+            return self.table.symbols
+        if kind == "column":
+            return self.table.columns[key]
+        raise pickle.UnpicklingError(f"Referência desconhecida: {kind}")
+
+
+def read_snapshot(path, key: bytes) -> CompiledEngine:
+    with open(path, 'rb') as f:
+        data = f.read()
+    header = SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION])
+    if not data.startswith(header):
+        raise ValueError("Snapshot do motor com formato desconhecido")
+    signature = data[len(header):len(header) + SIGNATURE_SIZE]
+    payload = data[len(header) + SIGNATURE_SIZE:]
+    table = SymbolTable(tables_path(path))
+    if not hmac.compare_digest(signature, sign(key, table.data, payload)):
+        raise ValueError("Snapshot do motor com assinatura inválida")
+    try:
+        engine = SnapshotUnpickler(io.BytesIO(payload), table).load()
+    except Exception as e:
+        raise ValueError(f"Snapshot do motor ilegível: {e}") from None
+    if not isinstance(engine, CompiledEngine):
+        raise ValueError("Snapshot do motor ilegível")
+    return engine
+
+
+def write_snapshot(snapshot_dir, engine: CompiledEngine, key: bytes) -> Path:
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    path = snapshot_path(snapshot_dir, engine.digest, engine.sampler)
+    write_tables(tables_path(path), engine.deck.symbols, shared_columns(engine.deck))
+    buffer = io.BytesIO()
+    cache = engine.interpreter.cache
+    engine.interpreter.cache = None
+    try:
+        SnapshotPickler(buffer, engine.deck).dump(engine)
+    finally:
+        engine.interpreter.cache = cache
+    payload = buffer.getvalue()
+    signature = sign(key, tables_path(path).read_bytes(), payload)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]))
+        f.write(signature)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    for stale in snapshot_dir.glob(f"engine-{engine.sampler}-*"):
+        if stale.stem != path.stem and stale.suffix in (".bin", ".tables"):
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def load_engine(data_path, snapshot_dir=None, sampler: str = SAMPLER_V1,
+                key: Optional[bytes] = None) -> CompiledEngine:
+    digest = source_digest(data_path, sampler)
+    if snapshot_dir is None or key is None:
+        return compile_engine(data_path, sampler, digest)
+    path = snapshot_path(snapshot_dir, digest, sampler)
+    try:
+        engine = read_snapshot(path, key)
+        if engine.digest == digest:
+            return engine
+    except (OSError, ValueError):
+        pass
+    engine = compile_engine(data_path, sampler, digest)
+    try:
+        return read_snapshot(write_snapshot(snapshot_dir, engine, key), key)
+    except (OSError, ValueError) as e:
+        logger.warning("Snapshot do motor não gravado em %s: %s", path, e)
+    return engine
+
+
+if __name__ == "__main__":
+    data_path = Path(sys.argv[1]) if len(sys.argv) > 1 else ENGINE_PATH.parent / "data"
+    snapshot_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else ENGINE_PATH.parent / "storage" / "engine"
+    sampler = os.environ.get('OBSERVADOR_SAMPLER', SAMPLER_V1)
+    key = signing_key(os.environ.get('OBSERVADOR_SNAPSHOT_KEY'),
+                      os.environ.get('OBSERVADOR_SNAPSHOT_KEY_FILE', KEY_PATH))
+    if key is None:
+        print("Sem chave para assinar o snapshot: defina OBSERVADOR_SNAPSHOT_KEY.", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        engine = compile_engine(data_path, sampler)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Dados inválidos: {e}", file=sys.stderr)
+        sys.exit(1)
+    compiled_ms = (time.perf_counter() - started) * 1000
+    path = write_snapshot(snapshot_dir, engine, key)
+
+    started = time.perf_counter()
+    read_snapshot(path, key)
+    loaded_ms = (time.perf_counter() - started) * 1000
+    print(f"Snapshot gravado em {path} ({path.stat().st_size} bytes)")
+    print(f"  compilação: {compiled_ms:.1f} ms, carga do snapshot: {loaded_ms:.1f} ms")
+    for gap in engine.interpreter.certification.gaps:
+        print(f"  sem opção certificada: {gap}")
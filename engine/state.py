@@ -1,9 +1,211 @@
-import hashlib
-from typing import Optional
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .rng import normalize_question, stable_digest, stable_hash
+
+STATE_FORMAT_VERSION = 2
+MAX_LAST_QUESTIONS = 5
+MAX_COUNT = 0xFFFF
+
+_HEADER = struct.Struct("<BHHI")
+_HEADER_V1 = struct.Struct("<B8sHHI")
+
+
+class Vocabulary:
+    __slots__ = ("symbols", "domains", "symbol_index", "domain_index", "fingerprint")
+
+    def __init__(self, symbols: Sequence[str] = (), domains: Sequence[str] = ()):
+        self.symbols = tuple(symbols)
+        self.domains = tuple(domains)
+        self.symbol_index = {symbol_id: index for index, symbol_id in enumerate(self.symbols)}
+        self.domain_index = {domain: index for index, domain in enumerate(self.domains)}
+        self.fingerprint = bytes.fromhex(stable_digest(list(self.symbols), list(self.domains), digest_size=8))
+
+    @classmethod
+    def from_symbols(cls, symbols) -> "Vocabulary":
+        domains: Dict[str, None] = {}
+        for symbol in symbols:
+            for domain in symbol.dominios:
+                domains.setdefault(domain, None)
+        return cls([symbol.id for symbol in symbols], list(domains))
+
+
+EMPTY_VOCABULARY = Vocabulary()
+
+
+class _Counts:
+    __slots__ = ("names", "index", "counts", "order", "rank", "extra", "top", "top_count")
+
+    def __init__(self, names: Tuple[str, ...], index: Dict[str, int]):
+        self.names = names
+        self.index = index
+        self.extra: Optional[List[str]] = None
+        self._reset(len(names))
+
+    def _reset(self, size: int):
+        self.counts = array('H', bytes(2 * size))
+        self.rank = array('H', bytes(2 * size))
+        self.order = array('H')
+        self.top = -1
+        self.top_count = 0
+
+    def ordinal(self, name: str, create: bool = False) -> Optional[int]:
+        ordinal = self.index.get(name)
+        if ordinal is not None:
+            return ordinal
+        if self.extra is not None and name in self.extra:
+            return len(self.names) + self.extra.index(name)
+        if not create:
+            return None
+        if self.extra is None:
+            self.extra = []
+        self.extra.append(name)
+        self.counts.append(0)
+        self.rank.append(0)
+        return len(self.names) + len(self.extra) - 1
+
+    def name(self, ordinal: int) -> str:
+        if ordinal < len(self.names):
+            return self.names[ordinal]
+        return self.extra[ordinal - len(self.names)]
+
+    def get(self, name: str) -> int:
+        ordinal = self.ordinal(name)
+        return self.counts[ordinal] if ordinal is not None else 0
+
+    def add(self, name: str, amount: int = 1):
+        ordinal = self.ordinal(name, create=True)
+        if self.counts[ordinal] == 0:
+            self.rank[ordinal] = len(self.order)
+            self.order.append(ordinal)
+        count = min(MAX_COUNT, self.counts[ordinal] + amount)
+        self.counts[ordinal] = count
+        self._promote(ordinal, count)
+
+    def _promote(self, ordinal: int, count: int):
+        if count > self.top_count or (count == self.top_count and self.rank[ordinal] < self.rank[self.top]):
+            self.top, self.top_count = ordinal, count
+
+    def leader(self) -> Tuple[Optional[str], int]:
+        if self.top < 0:
+            return None, 0
+        return self.name(self.top), self.top_count
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        for ordinal in self.order:
+            yield self.name(ordinal), self.counts[ordinal]
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.items())
+
+    def load(self, counts: Dict[str, int]):
+        self.extra = None
+        self._reset(len(self.names))
+        for name, count in counts.items():
+            if count > 0:
+                self.add(name, count)
+
+    def restore(self, names: Sequence[str], counts: Sequence[int]):
+        self.extra = None
+        self._reset(len(self.names))
+        index = self.index
+        order = self.order
+        for name, count in zip(names, counts):
+            ordinal = index.get(name)
+            if ordinal is None:
+                ordinal = self.ordinal(name, create=True)
+            if count == 0 or self.counts[ordinal]:
+                raise IndexError(name)
+            self.counts[ordinal] = count
+            self.rank[ordinal] = len(order)
+            order.append(ordinal)
+            self._promote(ordinal, count)
+
+    def encode(self, out: List[bytes]):
+        out.append(struct.pack("<H", len(self.order)))
+        _pack_names(out, [self.name(ordinal) for ordinal in self.order])
+        out.append(_le(array('H', (self.counts[ordinal] for ordinal in self.order))))
+
+    def decode(self, data: memoryview, offset: int) -> int:
+        (size,) = struct.unpack_from("<H", data, offset)
+        names, offset = _unpack_names(data, offset + 2, size)
+        counts = _from_le(data[offset:offset + 2 * size])
+        offset += 2 * size
+        if len(counts) != size:
+            raise IndexError(offset)
+        self.restore(names, counts)
+        return offset
+
+    def decode_v1(self, data: memoryview, offset: int, compatible: bool) -> Tuple[int, List[str]]:
+        base, extra_count = struct.unpack_from("<HH", data, offset)
+        offset += 4
+        extra = []
+        for _ in range(extra_count):
+            name, offset = _unpack_str(data, offset)
+            extra.append(name)
+        (size,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        order = _from_le(data[offset:offset + 2 * size])
+        offset += 2 * size
+        counts = _from_le(data[offset:offset + 2 * size])
+        offset += 2 * size
+        if len(counts) != size or any(ordinal >= base + extra_count for ordinal in order):
+            raise IndexError(offset)
+        # O formato 1 não guardava os nomes do vocabulário: com outro baralho só os extras são recuperáveis.
+        compatible = compatible and base == len(self.names)
+        names = list(self.names if compatible else [None] * base) + extra
+        entries = [(names[ordinal], count) for ordinal, count in zip(order, counts) if names[ordinal] is not None]
+        self.restore([name for name, _ in entries], [count for _, count in entries])
+        return offset, names if compatible else []
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(data, typecode: str = 'H') -> array:
+    values = array(typecode, bytes(data))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _pack_str(out: List[bytes], value: str):
+    data = value.encode('utf-8')
+    out.append(struct.pack("<H", len(data)))
+    out.append(data)
+
+
+def _unpack_str(data: memoryview, offset: int) -> Tuple[str, int]:
+    (size,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    return bytes(data[offset:offset + size]).decode('utf-8'), offset + size
+
+
+def _pack_names(out: List[bytes], names: Sequence[str]):
+    data = "\0".join(names).encode('utf-8')
+    out.append(struct.pack("<I", len(data)))
+    out.append(data)
+
+
+def _unpack_names(data: memoryview, offset: int, count: int) -> Tuple[List[str], int]:
+    (size,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    names = bytes(data[offset:offset + size]).decode('utf-8').split("\0") if count else []
+    if len(names) != count or offset + size > len(data):
+        raise IndexError(offset)
+    return names, offset + size
 
 
 class State:
-    def __init__(self, session_seed_base: str = None):
+    __slots__ = ("session_seed_base", "entropy", "debt", "consult_count", "last_answer_hash",
+                 "vocabulary", "_motifs", "_themes", "_questions", "_last_draw")
+
+    def __init__(self, session_seed_base: str = None, vocabulary: Vocabulary = EMPTY_VOCABULARY):
         if session_seed_base is None:
             import secrets
             session_seed_base = secrets.token_hex(16)
@@ -11,66 +213,162 @@ class State:
         self.entropy = 0
         self.debt = 0
         self.consult_count = 0
-        self.last_questions = []
-        self.motif_counts = {}
-        self.theme_counts = {}
-        self.last_draw = []
         self.last_answer_hash = ""
-    
+        self.vocabulary = vocabulary
+        self._motifs = _Counts(vocabulary.symbols, vocabulary.symbol_index)
+        self._themes = _Counts(vocabulary.domains, vocabulary.domain_index)
+        self._questions = array('Q')
+        self._last_draw: List[str] = []
+
+    @property
+    def motif_counts(self) -> Dict[str, int]:
+        return self._motifs.to_dict()
+
+    @motif_counts.setter
+    def motif_counts(self, counts: Dict[str, int]):
+        self._motifs.load(counts)
+
+    @property
+    def theme_counts(self) -> Dict[str, int]:
+        return self._themes.to_dict()
+
+    @theme_counts.setter
+    def theme_counts(self, counts: Dict[str, int]):
+        self._themes.load(counts)
+
+    @property
+    def question_hashes(self) -> Tuple[int, ...]:
+        return tuple(self._questions)
+
+    @property
+    def last_draw(self) -> List[str]:
+        return self._last_draw
+
+    @last_draw.setter
+    def last_draw(self, symbol_ids: Sequence[str]):
+        self._last_draw = list(symbol_ids)
+
+    def motif_count(self, symbol_id: str) -> int:
+        return self._motifs.get(symbol_id)
+
+    def iter_motifs(self) -> Iterator[Tuple[str, int]]:
+        return self._motifs.items()
+
+    def remember_question(self, question: str):
+        self._questions.append(stable_hash(question))
+        if len(self._questions) > MAX_LAST_QUESTIONS:
+            self._questions.pop(0)
+
     def check_repeat_question(self, question: str) -> bool:
-        from .rng import normalize_question
         normalized = normalize_question(question)
-        return normalized in self.last_questions
-    
+        return stable_hash(normalized) in self._questions
+
     def apply_repeat_penalty(self):
         self.entropy = min(100, self.entropy + 15)
         self.debt = min(100, self.debt + 10)
-    
+
     def apply_certainty_penalty(self):
         self.debt = min(100, self.debt + 20)
-    
+
     def apply_taboo_penalty(self, debt_delta: int, entropy_delta: int):
         self.debt = min(100, self.debt + debt_delta)
         self.entropy = min(100, self.entropy + entropy_delta)
-    
+
     def update_memory(self, symbols: list, domains: list):
         for symbol_id in symbols:
-            self.motif_counts[symbol_id] = self.motif_counts.get(symbol_id, 0) + 1
+            self._motifs.add(symbol_id)
         for domain in domains:
-            self.theme_counts[domain] = self.theme_counts.get(domain, 0) + 1
-    
+            self._themes.add(domain)
+
     def get_echo_symbol(self) -> Optional[str]:
-        if not self.motif_counts:
-            return None
-        max_count = max(self.motif_counts.values())
-        if max_count >= 2:
-            for symbol_id, count in self.motif_counts.items():
-                if count == max_count:
-                    return symbol_id
-        return None
-    
+        symbol_id, count = self._motifs.leader()
+        return symbol_id if count >= 2 else None
+
     def to_dict(self):
         return {
             "session_seed_base": self.session_seed_base,
             "entropy": self.entropy,
             "debt": self.debt,
             "consult_count": self.consult_count,
-            "last_questions": self.last_questions[-5:],
+            "question_hashes": list(self._questions),
             "motif_counts": self.motif_counts,
             "theme_counts": self.theme_counts,
-            "last_draw": self.last_draw,
+            "last_draw": list(self._last_draw),
             "last_answer_hash": self.last_answer_hash
         }
-    
+
     @classmethod
-    def from_dict(cls, data: dict):
-        state = cls(data.get("session_seed_base", ""))
+    def from_dict(cls, data: dict, vocabulary: Vocabulary = EMPTY_VOCABULARY):
+        state = cls(data.get("session_seed_base", ""), vocabulary)
         state.entropy = data.get("entropy", 0)
         state.debt = data.get("debt", 0)
         state.consult_count = data.get("consult_count", 0)
-        state.last_questions = data.get("last_questions", [])
+        if "question_hashes" in data:
+            state._questions = array('Q', data["question_hashes"][-MAX_LAST_QUESTIONS:])
+        else:
+            for question in data.get("last_questions", []):
+                state.remember_question(question)
         state.motif_counts = data.get("motif_counts", {})
         state.theme_counts = data.get("theme_counts", {})
         state.last_draw = data.get("last_draw", [])
         state.last_answer_hash = data.get("last_answer_hash", "")
         return state
+
+    def to_bytes(self) -> bytes:
+        out = [_HEADER.pack(STATE_FORMAT_VERSION, self.entropy, self.debt, self.consult_count)]
+        _pack_str(out, self.session_seed_base)
+        _pack_str(out, self.last_answer_hash)
+        out.append(struct.pack("<B", len(self._questions)))
+        out.append(_le(self._questions))
+        self._motifs.encode(out)
+        self._themes.encode(out)
+        out.append(struct.pack("<B", len(self._last_draw)))
+        _pack_names(out, self._last_draw)
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, vocabulary: Vocabulary = EMPTY_VOCABULARY):
+        view = memoryview(data)
+        version = view[0] if len(view) else None
+        header = _HEADER_V1 if version == 1 else _HEADER
+        try:
+            if version == 1:
+                _, fingerprint, entropy, debt, consult_count = header.unpack_from(view, 0)
+            else:
+                _, entropy, debt, consult_count = header.unpack_from(view, 0)
+        except struct.error:
+            raise ValueError("Estado binário truncado") from None
+        if version not in (1, STATE_FORMAT_VERSION):
+            raise ValueError(f"Versão de estado desconhecida: {version}")
+        offset = header.size
+        try:
+            session_seed_base, offset = _unpack_str(view, offset)
+            state = cls(session_seed_base, vocabulary)
+            state.entropy, state.debt, state.consult_count = entropy, debt, consult_count
+            state.last_answer_hash, offset = _unpack_str(view, offset)
+            size = view[offset]
+            offset += 1
+            state._questions = _from_le(view[offset:offset + 8 * size], 'Q')
+            offset += 8 * size
+            if version == 1:
+                offset = state._read_v1(view, offset, fingerprint == vocabulary.fingerprint)
+            else:
+                offset = state._motifs.decode(view, offset)
+                offset = state._themes.decode(view, offset)
+                state._last_draw, offset = _unpack_names(view, offset + 1, view[offset])
+            if offset != len(view):
+                raise IndexError(offset)
+        except (struct.error, IndexError, TypeError, UnicodeDecodeError):
+            raise ValueError("Estado binário corrompido") from None
+        return state
+
+    def _read_v1(self, view: memoryview, offset: int, compatible: bool) -> int:
+        offset, names = self._motifs.decode_v1(view, offset, compatible)
+        offset, _ = self._themes.decode_v1(view, offset, compatible)
+        size = view[offset]
+        last_draw = _from_le(view[offset + 1:offset + 1 + 2 * size])
+        if len(last_draw) != size:
+            raise IndexError(offset)
+        if names:
+            self._last_draw = [names[ordinal] for ordinal in last_draw]
+        return offset + 1 + 2 * size
@@ -0,0 +1,121 @@
+import json
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Sequence
+from .deck import Symbol
+
+TABLE_MAGIC = b"OBSVTAB"
+TABLE_VERSION = 1
+HOT_FIELDS = ("id", "nome", "glifo", "polaridade", "raridade")
+COLD_FIELDS = ("glifo_fallback", "cor_tag", "dominios", "correspondencias", "gatilhos", "contraindicacoes",
+               "frases_nucleo", "sinais_observaveis", "perguntas_diagnostico", "intervencoes_minimas", "excecoes")
+COLD_CACHE_SIZE = 64
+
+_HEADER = struct.Struct("<7sBIIQQ")
+_COLUMN = struct.Struct("<16sQQ")
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def _encode(values) -> bytes:
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def write_tables(path, symbols: Sequence[Symbol], columns: Dict[str, Sequence[float]]):
+    hot = _encode([[getattr(symbol, name) for name in HOT_FIELDS] for symbol in symbols])
+    cold = [_encode([getattr(symbol, name) for name in COLD_FIELDS]) for symbol in symbols]
+
+    position = _align(_HEADER.size + _COLUMN.size * len(columns))
+    directory = []
+    for name, values in columns.items():
+        directory.append(_COLUMN.pack(name.encode('ascii'), position, len(values)))
+        position += 8 * len(values)
+    hot_offset = position + 8 * (len(cold) + 1)
+    offsets = [hot_offset + len(hot)]
+    for blob in cold:
+        offsets.append(offsets[-1] + len(blob))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(symbols), len(columns), hot_offset, len(hot)))
+        f.write(b"".join(directory))
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        for values in columns.values():
+            f.write(struct.pack(f"<{len(values)}d", *values))
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(hot)
+        for blob in cold:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class SymbolTable:
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        self.data = view
+        if len(view) < _HEADER.size:
+            raise ValueError("Tabela compartilhada truncada")
+        magic, version, count, column_count, hot_offset, hot_length = _HEADER.unpack_from(view, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError("Tabela compartilhada com formato desconhecido")
+        self.count = count
+        self.columns: Dict[str, memoryview] = {}
+        position = _HEADER.size
+        for _ in range(column_count):
+            name, offset, length = _COLUMN.unpack_from(view, position)
+            position += _COLUMN.size
+            if offset + 8 * length > len(view):
+                raise ValueError("Tabela compartilhada truncada")
+            self.columns[name.rstrip(b"\0").decode('ascii')] = view[offset:offset + 8 * length].cast('d')
+        self._offsets = view[hot_offset - 8 * (count + 1):hot_offset].cast('Q')
+        if (len(self._offsets) != count + 1 or self._offsets[0] != hot_offset + hot_length
+                or self._offsets[-1] != len(view)):
+            raise ValueError("Tabela compartilhada truncada")
+        hot = json.loads(self._mmap[hot_offset:hot_offset + hot_length])
+        self.symbols = [SymbolView(self, index, values) for index, values in enumerate(hot)]
+        self.cold = lru_cache(maxsize=COLD_CACHE_SIZE)(self._decode_cold)
+
+    def _decode_cold(self, index: int) -> list:
+        return json.loads(self._mmap[self._offsets[index]:self._offsets[index + 1]])
+
+
+class ColdField:
+    def __init__(self, position: int):
+        self.position = position
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view._table.cold(view._index)[self.position]
+
+
+class SymbolView:
+    __slots__ = ("_table", "_index") + HOT_FIELDS
+
+    def __init__(self, table: SymbolTable, index: int, hot: list):
+        self._table = table
+        self._index = index
+        for name, value in zip(HOT_FIELDS, hot):
+            setattr(self, name, value)
+
+    def __reduce__(self):
+        return Symbol.from_dict, ({name: getattr(self, name) for name in HOT_FIELDS + COLD_FIELDS},)
+
+    def __repr__(self):
+        return f"SymbolView({self.id!r})"
+
+
+for _position, _name in enumerate(COLD_FIELDS):
+    setattr(SymbolView, _name, ColdField(_position))
+
+
+def tables_path(snapshot_path) -> Path:
+    return Path(snapshot_path).with_suffix(".tables")
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import Optional, Tuple
+from .matcher import MatchSet
 
 
 @dataclass
@@ -13,25 +14,33 @@ class Taboo:
     alternative: str
 
 
-def check_taboos(question: str, lore: dict) -> Tuple[Optional[Taboo], dict]:
-    question_lower = question.lower()
+def _make_taboo(taboo_data: dict) -> Taboo:
+    return Taboo(
+        id=taboo_data.get("id", ""),
+        name=taboo_data.get("name", ""),
+        response=taboo_data.get("response", ""),
+        debt_delta=taboo_data.get("debt_delta", 0),
+        entropy_delta=taboo_data.get("entropy_delta", 0),
+        cooldown_s=taboo_data.get("cooldown_s", 0),
+        alternative=taboo_data.get("alternative", "")
+    )
+
+
+def check_taboos(question: str, lore: dict,
+                 matches: Optional[MatchSet] = None) -> Tuple[Optional[Taboo], dict]:
     taboos_data = lore.get("taboos", [])
     
+    if matches is not None:
+        if matches.taboo_index is None:
+            return None, {}
+        taboo_data = taboos_data[matches.taboo_index]
+        return _make_taboo(taboo_data), taboo_data
+    
+    question_lower = question.lower()
     for taboo_data in taboos_data:
         triggers = taboo_data.get("triggers", [])
         for trigger in triggers:
             if trigger.lower() in question_lower:
-                return (
-                    Taboo(
-                        id=taboo_data.get("id", ""),
-                        name=taboo_data.get("name", ""),
-                        response=taboo_data.get("response", ""),
-                        debt_delta=taboo_data.get("debt_delta", 0),
-                        entropy_delta=taboo_data.get("entropy_delta", 0),
-                        cooldown_s=taboo_data.get("cooldown_s", 0),
-                        alternative=taboo_data.get("alternative", "")
-                    ),
-                    taboo_data
-                )
+                return _make_taboo(taboo_data), taboo_data
     
     return None, {}
@@ -0,0 +1,218 @@
+import json
+import sys
+from string import Formatter
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+
+class TemplateError(ValueError):
+    pass
+
+
+FIELD_ALIASES = {
+    "presente_verbo": "present_verbo",
+    "presente_quality": "present_quality",
+    "presente_qualidade": "present_quality",
+    "present_qualidade": "present_quality",
+    "presente_shadow": "present_shadow",
+    "passado_qualidade": "past_quality",
+    "past_qualidade": "past_quality",
+    "futuro_qualidade": "future_quality",
+    "futuro_sombra": "future_shadow",
+    "tend_sombra": "future_shadow",
+}
+
+QUALITIES = {"past_quality", "present_quality", "future_quality"}
+SHADOWS = {"past_shadow", "present_shadow", "future_shadow"}
+SIGNAL = {"sinal_observavel"}
+WARRANT_FIELDS = {"present_verbo", "past_quality", "present_quality", "future_quality", "future_shadow", "dominio"}
+ATO_GENERIC_FIELDS = {"verbo", "tema", "passo"}
+
+SLOT_FIELDS = {
+    "thesis_templates": QUALITIES | SHADOWS | {"present_verbo"},
+    "finding_past_templates": {"past_quality", "past_shadow"},
+    "finding_present_templates": {"present_verbo", "present_quality", "present_shadow"},
+    "evidence_past_templates": SIGNAL,
+    "evidence_present_templates": SIGNAL,
+    "evidence_future_templates": SIGNAL,
+    "warrant_by_relation": WARRANT_FIELDS,
+    "qualifier_templates": WARRANT_FIELDS,
+    "trend_sentence_templates": {"present_quality", "present_verbo", "future_quality", "future_shadow"},
+    "eco_templates": {"echo_symbol"},
+    "tension_templates": QUALITIES | SHADOWS,
+    "limit_templates": {"present_quality", "present_shadow", "past_quality", "future_quality"},
+    "ato_templates": ATO_GENERIC_FIELDS | {"acao", "prazo_horas", "prazo"},
+    "preco_templates": {"prazo", "renuncia", "sombra", "qualidade", "acao_proibida"},
+}
+
+DEFAULTS = {
+    "thesis_templates": ["Tese: {present_quality} no presente define a direção."],
+    "finding_past_templates": ["Passado: {past_quality} se acumulou enquanto {past_shadow} crescia."],
+    "finding_present_templates": ["Presente: você {present_verbo} com {present_quality}, mas {present_shadow} ameaça."],
+    "warrant_by_relation": ["Regra: {conector}, {present_quality} continua {past_quality}."],
+    "trend_sentence_templates": ["Se você manter {present_quality}, a tendência é {future_quality}, mas {future_shadow} cresce."],
+    "evidence_past_templates": ["Evidência: {sinal_observavel}"],
+    "evidence_present_templates": ["Evidência: {sinal_observavel}"],
+    "evidence_future_templates": ["Evidência prevista: {sinal_observavel}"],
+    "qualifier_templates": ["provável", "possível"],
+    "tension_templates": ["Tensão: {present_quality} versus {future_shadow}."],
+    "limit_templates": ["Limite: não confunda tendência com certeza."],
+    "ato_templates": ["Hoje, faça uma ação pequena de {verbo} sobre {tema}: {passo}."],
+    "preco_templates": ["Por {prazo}, renuncie a {renuncia} — para que {sombra} não governe."],
+}
+
+PLAIN_LISTS = {
+    "interference_fragments": ["░", "▒", "▓"],
+    "time_references": ["48h", "24h", "3 dias"],
+    "renuncias": ["perguntar de novo por 48h"],
+    "passos_observaveis": ["anote 3 evidências"],
+}
+
+
+class Template:
+    __slots__ = ("source", "fields", "_segments", "_constant")
+
+    def __init__(self, source: str, allowed: Optional[Iterable[str]] = None, name: str = "template"):
+        self.source = source
+        segments = []
+        fields = set()
+        try:
+            parsed = list(Formatter().parse(source))
+        except ValueError as exc:
+            raise TemplateError(f"{name}: {exc}") from None
+        for literal, field_name, format_spec, conversion in parsed:
+            if field_name is None:
+                segments.append((literal, None))
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise TemplateError(f"{name}: campo não suportado '{{{field_name}}}'")
+            canonical = FIELD_ALIASES.get(field_name, field_name)
+            if allowed is not None and canonical not in allowed:
+                raise TemplateError(f"{name}: placeholder desconhecido '{{{field_name}}}'")
+            fields.add(canonical)
+            segments.append((literal, canonical))
+        self.fields: FrozenSet[str] = frozenset(fields)
+        self._segments = tuple(segments)
+        self._constant = "".join(literal for literal, _ in segments) if not fields else None
+
+    def uses(self, field_name: str) -> bool:
+        return FIELD_ALIASES.get(field_name, field_name) in self.fields
+
+    def render(self, context: dict) -> str:
+        if self._constant is not None:
+            return self._constant
+        out = []
+        for literal, field_name in self._segments:
+            if literal:
+                out.append(literal)
+            if field_name is not None:
+                out.append(str(context[field_name]))
+        return "".join(out)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+class CompiledTemplates:
+    def __init__(self, templates: dict):
+        self.raw = templates
+        errors: List[str] = []
+
+        def compile_list(slot: str, sources, path: str, extra_fields: FrozenSet[str] = frozenset()) -> List[Template]:
+            compiled = []
+            if not isinstance(sources, list):
+                errors.append(f"{path}: esperado uma lista")
+                return compiled
+            for position, source in enumerate(sources):
+                name = f"{path}[{position}]"
+                if not isinstance(source, str):
+                    errors.append(f"{name}: esperado texto")
+                    continue
+                try:
+                    compiled.append(Template(source, SLOT_FIELDS[slot] | extra_fields, name))
+                except TemplateError as exc:
+                    errors.append(str(exc))
+            return compiled
+
+        def compile_slot(slot: str) -> List[Template]:
+            return compile_list(slot, templates.get(slot, DEFAULTS[slot]), slot) or compile_list(slot, DEFAULTS[slot], slot)
+
+        def compile_keyed(slot: str) -> Dict[str, List[Template]]:
+            groups = templates.get(slot, {})
+            if not isinstance(groups, dict):
+                errors.append(f"{slot}: esperado um objeto")
+                return {}
+            return {key: compile_list(slot, sources, f"{slot}.{key}") for key, sources in groups.items()}
+
+        self.thesis = compile_keyed("thesis_templates")
+        self.finding_past = compile_keyed("finding_past_templates")
+        self.finding_present = compile_keyed("finding_present_templates")
+        self.warrant = compile_keyed("warrant_by_relation")
+        self.trend = compile_keyed("trend_sentence_templates")
+        self.evidence_past = compile_slot("evidence_past_templates")
+        self.evidence_present = compile_slot("evidence_present_templates")
+        self.evidence_future = compile_slot("evidence_future_templates")
+        self.qualifier = compile_slot("qualifier_templates")
+        self.tension = compile_slot("tension_templates")
+        self.limit = compile_slot("limit_templates")
+        self.ato = compile_slot("ato_templates")
+        self.preco = compile_slot("preco_templates")
+        self.eco = compile_list("eco_templates", templates.get("eco_templates", []), "eco_templates")
+
+        self.default_thesis = compile_list("thesis_templates", DEFAULTS["thesis_templates"], "default")
+        self.default_finding_past = compile_list("finding_past_templates", DEFAULTS["finding_past_templates"], "default")
+        self.default_finding_present = compile_list("finding_present_templates", DEFAULTS["finding_present_templates"], "default")
+        self.default_warrant = compile_list("warrant_by_relation", DEFAULTS["warrant_by_relation"], "default",
+                                            frozenset({"conector"}))
+        self.default_trend = compile_list("trend_sentence_templates", DEFAULTS["trend_sentence_templates"], "default")
+
+        self.ato_with_acao = [t for t in self.ato if t.uses("acao")]
+        self.ato_generic = [t for t in self.ato if t.fields <= ATO_GENERIC_FIELDS]
+        if not self.ato_generic:
+            self.ato_generic = compile_list("ato_templates", DEFAULTS["ato_templates"], "default")
+
+        for key, default in PLAIN_LISTS.items():
+            values = templates.get(key, default)
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                errors.append(f"{key}: esperado uma lista de textos")
+                values = default
+            setattr(self, key, values or default)
+
+        if errors:
+            raise TemplateError("Templates inválidos:\n" + "\n".join(errors))
+
+
+def prazo_label(prazo_horas: int) -> str:
+    if prazo_horas == 24:
+        return "24h"
+    if prazo_horas == 48:
+        return "48h"
+    if prazo_horas <= 12:
+        return "hoje"
+    return f"{prazo_horas}h"
+
+
+def render_intervention(template: Optional[Template], intervention: dict, topic: str) -> str:
+    prazo_horas = intervention.get("prazo_horas", 24)
+    acao = intervention.get("acao", "execute uma ação")
+    prazo = prazo_label(prazo_horas)
+    if template is not None:
+        return template.render({"acao": acao, "tema": topic, "prazo_horas": prazo_horas, "prazo": prazo})
+    return f"Em {prazo}, {acao} sobre {topic}."
+
+
+def compile_templates(templates: dict) -> CompiledTemplates:
+    return CompiledTemplates(templates)
+
+
+def load_templates(path: str) -> CompiledTemplates:
+    with open(path, 'r', encoding='utf-8') as f:
+        return CompiledTemplates(json.load(f))
+
+
+if __name__ == "__main__":
+    try:
+        load_templates(sys.argv[1] if len(sys.argv) > 1 else "data/templates.json")
+    except TemplateError as exc:
+        print(exc)
+        sys.exit(1)
+    print("Templates OK.")
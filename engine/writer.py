@@ -0,0 +1,237 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from .repository import ReadingRepository
+
+FSYNC_ALWAYS = "always"
+FSYNC_NEVER = "never"
+DEFAULT_FSYNC = "1000"
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_MAX_BATCH = 512
+DEFAULT_RETRIES = 6
+DEFAULT_RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 5.0
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def parse_fsync_policy(policy: str) -> Optional[float]:
+    policy = str(policy).strip().lower()
+    if policy == FSYNC_ALWAYS:
+        return 0.0
+    if policy == FSYNC_NEVER:
+        return None
+    try:
+        interval_ms = int(policy)
+    except ValueError:
+        raise ValueError(f"Política de fsync inválida: {policy}") from None
+    if interval_ms < 0:
+        raise ValueError(f"Política de fsync inválida: {policy}")
+    return interval_ms / 1000.0
+
+
+class ReadingWriter:
+    def __init__(self, repository: ReadingRepository, fsync: str = DEFAULT_FSYNC,
+                 max_queue: int = DEFAULT_MAX_QUEUE, max_batch: int = DEFAULT_MAX_BATCH,
+                 retries: int = DEFAULT_RETRIES, retry_delay: float = DEFAULT_RETRY_DELAY,
+                 reject_path: Optional[str] = None):
+        self.repository = repository
+        self.fsync_policy = str(fsync)
+        self.fsync_interval = parse_fsync_policy(fsync)
+        self.max_batch = max_batch
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.reject_path = reject_path or repository.path + ".rejected"
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.blocked = 0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+        self.errors = 0
+        self.last_error = ""
+        self.retried = 0
+        self.rejected = 0
+
+    def start(self) -> "ReadingWriter":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="reading-writer", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, lines: Sequence[str]):
+        if self._closed:
+            raise RuntimeError("ReadingWriter já foi fechado")
+        if self._thread is None:
+            self.start()
+        lines = list(lines)
+        if not lines:
+            return
+        # As linhas de uma chamada entram na fila como um só item e são gravadas no mesmo lote.
+        try:
+            self._queue.put_nowait(lines)
+        except queue.Full:
+            started = time.monotonic()
+            self._queue.put(lines)
+            with self._lock:
+                self.blocked += 1
+                self.blocked_seconds += time.monotonic() - started
+        with self._lock:
+            self.submitted += len(lines)
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def flush(self):
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "store": self.repository.name,
+                "fsync": self.fsync_policy,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "written": self.written,
+                "batches": self.batches,
+                "bytes": self.bytes_written,
+                "fsyncs": self.fsyncs,
+                "blocked": self.blocked,
+                "blocked_seconds": round(self.blocked_seconds, 6),
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "retried": self.retried,
+                "rejected": self.rejected,
+                "reject_path": self.reject_path
+            }
+
+    def _run(self):
+        try:
+            self.repository.open()
+        except Exception as exc:
+            self._record_error(exc)
+        while True:
+            batch: List[str] = []
+            try:
+                item = self._queue.get(timeout=self._fsync_due())
+            except queue.Empty:
+                self._sync_quietly()
+                continue
+            items = 1
+            stop = item is _STOP
+            if not stop:
+                batch.extend(item)
+            while not stop and len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                items += 1
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.extend(item)
+            try:
+                if batch:
+                    self._write_batch(batch)
+            finally:
+                for _ in range(items):
+                    self._queue.task_done()
+            if stop:
+                self._finish()
+                return
+
+    def _write_batch(self, batch: List[str]):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                with self._lock:
+                    self.retried += 1
+            try:
+                size = self.repository.write(batch)
+            except Exception as exc:
+                self._record_error(exc)
+                continue
+            self._dirty = True
+            if self.fsync_interval is not None and time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync_quietly()
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+                self.bytes_written += size
+            return
+        self._reject(batch)
+
+    def _reject(self, batch: List[str]):
+        try:
+            with open(self.reject_path, 'a', encoding='utf-8') as f:
+                f.writelines(batch)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as exc:
+            self._record_error(exc)
+            logger.critical("%d leituras perdidas: falha ao gravar e ao rejeitar em %s (%s)",
+                            len(batch), self.reject_path, exc)
+            return
+        with self._lock:
+            self.rejected += len(batch)
+        logger.error("%d leituras gravadas em %s após %d tentativas: %s",
+                     len(batch), self.reject_path, self.retries + 1, self.last_error)
+
+    def _finish(self):
+        if self._dirty and self.fsync_interval is not None:
+            self._sync_quietly()
+        try:
+            self.repository.close()
+        except Exception as exc:
+            self._record_error(exc)
+
+    def _fsync_due(self) -> Optional[float]:
+        if not self._dirty or self.fsync_interval is None:
+            return None
+        return max(0.0, self.fsync_interval - (time.monotonic() - self._last_fsync))
+
+    def _sync_quietly(self):
+        try:
+            self._fsync()
+        except Exception as exc:
+            self._dirty = False
+            self._record_error(exc)
+
+    def _record_error(self, exc: Exception):
+        with self._lock:
+            self.errors += 1
+            self.last_error = str(exc)
+
+    def _fsync(self):
+        self.repository.sync()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        with self._lock:
+            self.fsyncs += 1
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
+import argparse
 import sys
 import os
 import random
+import signal
 from pathlib import Path
 
 if sys.version_info < (3, 11):
     print("Erro: Python 3.11+ é necessário.")
     sys.exit(1)
 
+parser = argparse.ArgumentParser(description="OBSERVADOR")
+parser.add_argument("--workers", type=int, default=int(os.environ.get('OBSERVADOR_WORKERS', 0)),
+                    help="processos de trabalho (0 = servidor de desenvolvimento do Flask)")
+parser.add_argument("--max-requests", type=int, default=None,
+                    help="recicla cada processo após este número de requisições (0 = nunca)")
+args = parser.parse_args()
+
 port = 9020
 os.environ['OBSERVADOR_PORT'] = str(port)
 print(f"OBSERVADOR iniciando na porta {port}")
@@ -27,10 +36,27 @@ if not errors_file.exists():
     errors_file.touch()
 
 try:
-    from web.app import create_app
+    from web.app import create_app, open_services, close_services
     
-    app = create_app()
-    app.run(host='0.0.0.0', port=port, debug=False)
+    if args.workers > 0:
+        from web.server import DEFAULT_MAX_REQUESTS, PreforkServer
+        
+        if not hasattr(os, 'fork'):
+            print("Erro: --workers requer um sistema com fork().")
+            sys.exit(1)
+        max_requests = args.max_requests if args.max_requests is not None else DEFAULT_MAX_REQUESTS
+        reload_interval = float(os.environ.get('OBSERVADOR_RELOAD_INTERVAL', 0))
+        print(f"{args.workers} processos de trabalho (SIGHUP recarrega, reciclagem a cada {max_requests} requisições)")
+        PreforkServer(lambda: create_app(open_stores=False), '0.0.0.0', port, args.workers,
+                      max_requests=max_requests,
+                      on_worker_start=open_services, on_worker_exit=close_services,
+                      watch=(lambda app: app.config['RELOADER'].poll()) if reload_interval > 0 else None,
+                      watch_interval=reload_interval or 1.0).serve()
+    else:
+        app = create_app()
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: app.config['RELOADER'].reload_in_background())
+        app.run(host='0.0.0.0', port=port, debug=False)
 except KeyboardInterrupt:
     sys.exit(0)
 except Exception as e:
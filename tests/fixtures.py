@@ -0,0 +1,16 @@
+import json
+
+SYMBOLS = ["S01", "S02", "S03", "S04"]
+
+
+def record(number, **fields):
+    reading = {
+        "timestamp": 1000 + number,
+        "question": f"pergunta {number}",
+        "symbols": [SYMBOLS[number % 4], SYMBOLS[(number + 1) % 4], "S09"],
+        "topic": "trabalho" if number % 3 == 0 else "relação",
+        "relation": "tensão" if number % 2 else "harmonia",
+        "attempt": number % 3
+    }
+    reading.update(fields)
+    return json.dumps(reading, ensure_ascii=False) + "\n"
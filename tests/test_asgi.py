@@ -0,0 +1,82 @@
+import asyncio
+import time
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web.asgi import AsgiBridge, build_environ
+
+
+def slow_stream_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/event-stream")])
+    body = environ["wsgi.input"].read()
+
+    def generate():
+        yield b"event: seal\n\n"
+        time.sleep(0.3)
+        yield b"event: done\ndata: " + body + b"\n\n"
+    return generate()
+
+
+class TestAsgiBridge(unittest.TestCase):
+    def run_request(self, app, scope, body=b""):
+        messages = []
+        ticks = []
+        received = [{"type": "http.request", "body": body[:3], "more_body": True},
+                    {"type": "http.request", "body": body[3:], "more_body": False}]
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            messages.append((time.monotonic(), message))
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            task = asyncio.ensure_future(ticker())
+            started = time.monotonic()
+            await app(scope, receive, send)
+            task.cancel()
+            return started
+
+        started = asyncio.run(main())
+        return started, messages, ticks
+
+    def test_streams_chunks_without_blocking_the_loop(self):
+        app = AsgiBridge(slow_stream_app, workers=2)
+        scope = {"type": "http", "method": "POST", "path": "/api/consult/stream", "query_string": b"",
+                 "headers": [(b"content-type", b"text/plain")]}
+        started, messages, ticks = self.run_request(app, scope, b"pergunta")
+        start, first, last, end = [message for _, message in messages]
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        self.assertEqual(first["body"], b"event: seal\n\n")
+        self.assertEqual(last["body"], b"event: done\ndata: pergunta\n\n")
+        self.assertFalse(end["more_body"])
+        self.assertLess(messages[1][0] - started, 0.2)
+        self.assertGreater(messages[2][0] - messages[1][0], 0.25)
+        self.assertGreater(len([t for t in ticks if messages[1][0] < t < messages[2][0]]), 10)
+        app.executor.shutdown()
+
+    def test_environ_from_scope(self):
+        environ = build_environ({
+            "type": "http", "method": "GET", "path": "/registro/ação", "query_string": b"limit=5",
+            "headers": [(b"cookie", b"a=1"), (b"cookie", b"b=2"), (b"accept", b"text/html"),
+                        (b"accept", b"application/json"), (b"content-type", b"application/json")],
+            "server": ("127.0.0.1", 9020), "client": ("10.0.0.1", 5000)
+        }, b"")
+        self.assertEqual(environ["PATH_INFO"].encode('latin-1').decode('utf-8'), "/registro/ação")
+        self.assertEqual(environ["QUERY_STRING"], "limit=5")
+        self.assertEqual(environ["HTTP_COOKIE"], "a=1; b=2")
+        self.assertEqual(environ["HTTP_ACCEPT"], "text/html,application/json")
+        self.assertEqual(environ["CONTENT_TYPE"], "application/json")
+        self.assertEqual(environ["SERVER_PORT"], "9020")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from pathlib import Path
+import gzip
+import re
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web.assets import StaticAssets, fingerprint
+from web.app import create_app
+
+CSS = b"body { color: #ccc; }\n" * 200
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmp.name) / "static"
+        (self.source / "css").mkdir(parents=True)
+        (self.source / "css" / "style.css").write_bytes(CSS)
+        (self.source / "logo.png").write_bytes(b"\x89PNG")
+        self.target = Path(self.tmp.name) / "dist"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprints_and_precompresses(self):
+        assets = StaticAssets(self.source, self.target).build()
+        published = assets.url_path("css/style.css")
+        self.assertEqual(published, fingerprint("css/style.css", CSS))
+        self.assertRegex(published, r"^css/style\.[0-9a-f]{12}\.css$")
+        self.assertEqual((self.target / published).read_bytes(), CSS)
+        self.assertEqual(gzip.decompress((self.target / f"{published}.gz").read_bytes()), CSS)
+        self.assertFalse((self.target / (assets.url_path("logo.png") + ".gz")).exists())
+
+        path, encoding = assets.variant(published, {"gzip"})
+        self.assertEqual((path.name, encoding), (Path(published).name + ".gz", "gzip"))
+        path, encoding = assets.variant(published, set())
+        self.assertEqual((path.name, encoding), (Path(published).name, None))
+
+    def test_content_change_publishes_new_name(self):
+        first = StaticAssets(self.source, self.target).build()
+        (self.source / "css" / "style.css").write_bytes(CSS + b"a { color: red; }\n")
+        second = StaticAssets(self.source, self.target).build()
+        self.assertNotEqual(first.url_path("css/style.css"), second.url_path("css/style.css"))
+        self.assertNotEqual(first.digest, second.digest)
+        self.assertTrue((self.target / first.url_path("css/style.css")).exists())
+
+
+class TestAssetRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.app = create_app(open_stores=False)
+        cls.app.config['ASSETS'] = StaticAssets(Path(cls.app.static_folder), cls.tmp.name).build()
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_pages_link_fingerprinted_assets(self):
+        html = self.client.get('/').get_data(as_text=True)
+        urls = re.findall(r'(?:href|src)="(/assets/[^"]+)"', html)
+        self.assertEqual(len(urls), 2)
+        self.assertNotIn("/static/", html)
+
+        original = (Path(self.app.static_folder) / "css" / "style.css").read_bytes()
+        css_url = next(url for url in urls if url.endswith(".css"))
+        compressed = self.client.get(css_url, headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(compressed.status_code, 200)
+        self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+        self.assertEqual(compressed.mimetype, "text/css")
+        self.assertIn("immutable", compressed.headers["Cache-Control"])
+        self.assertIn("Accept-Encoding", compressed.headers["Vary"])
+        self.assertEqual(gzip.decompress(compressed.data), original)
+
+        plain = self.client.get(css_url, headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(plain.data, original)
+
+    def test_unpublished_paths_are_not_served(self):
+        self.assertEqual(self.client.get('/assets/css/style.css').status_code, 404)
+        self.assertEqual(self.client.get('/assets/../app.py').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
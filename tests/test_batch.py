@@ -0,0 +1,51 @@
+import unittest
+from pathlib import Path
+import sys
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine import batch
+from engine.batch import HAS_NUMPY
+from engine.deck import Deck
+from engine.rng import make_seed
+from engine.state import State
+
+
+class TestDrawMany(unittest.TestCase):
+    def setUp(self):
+        deck_path = Path(__file__).parent.parent / "data" / "deck.json"
+        self.deck = Deck.load_from_json(str(deck_path))
+        self.questions = ["Devo mudar de emprego?", "uma promessa antiga", "Devo mudar de emprego?"]
+        self.states = [State("a"), State("b"), State("c")]
+        self.states[1].motif_counts = {"voto": 4}
+        self.states[2].last_draw = ["eco", "voto", "ferro"]
+        self.states[2].remember_question("devo mudar de emprego?")
+        self.seeds = [make_seed(s.session_seed_base, q, 1) for s, q in zip(self.states, self.questions)]
+    
+    def test_python_fallback(self):
+        with mock.patch.object(batch, "HAS_NUMPY", False):
+            draws = self.deck.draw_many(self.states, self.seeds, self.questions)
+            self.assertEqual(draws, self.deck.draw_many(self.states, self.seeds, self.questions))
+        self.assertIsInstance(draws, list)
+        self.assertEqual(len(draws), 3)
+        for row in draws:
+            self.assertIsInstance(row, list)
+            self.assertEqual(len(set(row)), 3)
+            self.assertTrue(all(type(index) is int for index in row))
+        self.assertEqual(self.deck.symbols[draws[2][0]].id, "eco")
+    
+    @unittest.skipUnless(HAS_NUMPY, "NumPy não instalado")
+    def test_numpy_matches_fallback(self):
+        import numpy as np
+        vectorized = self.deck.draw_many(self.states, self.seeds, self.questions)
+        fallback = self.deck.draw_many(self.states, self.seeds, self.questions, use_numpy=False)
+        for draws in (vectorized, fallback):
+            self.assertIsInstance(draws, np.ndarray)
+            self.assertEqual(draws.shape, (3, 3))
+            self.assertEqual(draws.dtype, np.int64)
+        np.testing.assert_array_equal(vectorized, fallback)
+        self.assertEqual(self.deck.symbols[vectorized[2, 0]].id, "eco")
+
+
+if __name__ == '__main__':
+    unittest.main()
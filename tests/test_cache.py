@@ -0,0 +1,65 @@
+import unittest
+from pathlib import Path
+import sys
+import json
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.cache import ReadingCache, reading_key
+from engine.deck import Deck
+from engine.interpret import Interpreter
+from engine.rng import SeededRNG
+from engine.state import State
+
+
+class TestReadingCache(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        cache = ReadingCache(max_bytes=70)
+        cache.put("a", {"text": "x" * 20})
+        cache.put("b", {"text": "y" * 20})
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", {"text": "z" * 20})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"text": "x" * 20})
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertLessEqual(stats["bytes"], 70)
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = ReadingCache(max_bytes=10)
+        cache.put("a", {"text": "x" * 20})
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_key_depends_on_state_and_rng(self):
+        state = State("base")
+        key = reading_key(state, ["a", "b", "c"], SeededRNG(1), "pergunta")
+        self.assertEqual(key, reading_key(state, ["a", "b", "c"], SeededRNG(1), "pergunta"))
+        self.assertNotEqual(key, reading_key(state, ["a", "b", "c"], SeededRNG(2), "pergunta"))
+        state.debt = 10
+        self.assertNotEqual(key, reading_key(state, ["a", "b", "c"], SeededRNG(1), "pergunta"))
+
+
+class TestCachedInterpreter(unittest.TestCase):
+    def test_hit_returns_same_reading(self):
+        data_path = Path(__file__).parent.parent / "data"
+        with open(data_path / "lore.json", 'r', encoding='utf-8') as f:
+            lore = json.load(f)
+        deck = Deck.load_from_json(str(data_path / "deck.json"))
+        cache = ReadingCache()
+        cached = Interpreter(str(data_path / "templates.json"), deck=deck, cache=cache)
+        plain = Interpreter(str(data_path / "templates.json"), deck=deck)
+
+        state = State("cache")
+        symbols = tuple(deck.symbols[:3])
+        expected = plain.interpret(state, symbols, None, lore, SeededRNG(7), question="Devo mudar?")
+        first = cached.interpret(state, symbols, None, lore, SeededRNG(7), question="Devo mudar?")
+        second = cached.interpret(state, symbols, None, lore, SeededRNG(7), question="Devo mudar?")
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
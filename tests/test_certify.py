@@ -0,0 +1,64 @@
+import unittest
+from pathlib import Path
+import sys
+import json
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.certify import certify, fingerprint, load_certification
+from engine.deck import Deck
+from engine.interpret import Interpreter
+from engine.rng import SeededRNG
+from engine.state import State
+from engine.templating import compile_templates
+
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+
+class TestCertification(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_PATH / "templates.json", 'r', encoding='utf-8') as f:
+            cls.templates = json.load(f)
+        with open(DATA_PATH / "lore.json", 'r', encoding='utf-8') as f:
+            cls.lore = json.load(f)
+        cls.compiled = compile_templates(cls.templates)
+        cls.deck = Deck.load_from_json(str(DATA_PATH / "deck.json"))
+
+    def test_shipped_table_is_current(self):
+        with open(DATA_PATH / "certification.json", 'r', encoding='utf-8') as f:
+            shipped = json.load(f)
+        self.assertEqual(shipped["fingerprint"], fingerprint(self.templates, self.deck.symbols))
+        self.assertEqual(shipped, certify(self.templates, self.compiled, self.deck.symbols))
+
+    def test_uncertified_options_are_dropped(self):
+        certified = load_certification(str(DATA_PATH / "certification.json"), self.templates,
+                                       self.compiled, self.deck.symbols).apply(self.compiled)
+        for templates in certified.trend.values():
+            for template in templates:
+                self.assertIn("então", template.source)
+        self.assertNotIn("uma semana", certified.time_references)
+        self.assertNotIn("faça uma lista", certified.passos_observaveis)
+        self.assertEqual(len(self.compiled.time_references), 5)
+
+    def test_stale_table_is_recomputed(self):
+        templates = dict(self.templates, time_references=["uma semana", "hoje"])
+        compiled = compile_templates(templates)
+        certification = load_certification(str(DATA_PATH / "certification.json"), templates, compiled, self.deck.symbols)
+        self.assertEqual(certification.apply(compiled).time_references, ["hoje"])
+
+    def test_certified_readings_pass_first_attempt(self):
+        interpreter = Interpreter(str(DATA_PATH / "templates.json"), deck=self.deck)
+        covered = [s for s in self.deck.symbols
+                   if s.correspondencias.get("elemento") in self.compiled.trend
+                   and s.id not in ("ferro",)]
+        for seed in range(30):
+            state = State("cert")
+            state.consult_count = seed
+            symbols = tuple(covered[(seed + offset * 7) % len(covered)] for offset in range(3))
+            result = interpreter.interpret(state, symbols, None, self.lore, SeededRNG(seed), question="Devo mudar?")
+            self.assertEqual(result["attempt"], 0, result["objective_checks"]["violations"])
+
+
+if __name__ == '__main__':
+    unittest.main()
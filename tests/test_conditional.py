@@ -0,0 +1,74 @@
+import unittest
+from pathlib import Path
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.repository import JsonlRepository
+from tests.fixtures import record
+from web.app import create_app
+
+
+class CountingRepository(JsonlRepository):
+    pages = 0
+
+    def page(self, *args, **kwargs):
+        self.pages += 1
+        return super().page(*args, **kwargs)
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repository = CountingRepository(Path(self.tmp.name) / "readings.jsonl")
+        self.repository.write([record(n) for n in range(3)])
+        self.app = create_app(open_stores=False)
+        self.app.config['REPOSITORY'] = self.repository
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.repository.close()
+        self.tmp.cleanup()
+
+    def test_register_revalidates_without_reading_the_log(self):
+        for path in ('/register', '/api/register?limit=2', '/api/analytics?by=topic'):
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            self.assertIn("no-cache", first.headers["Cache-Control"])
+            etag = first.headers["ETag"]
+            pages = self.repository.pages
+            again = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.data, b"")
+            self.assertEqual(again.headers["ETag"], etag)
+            self.assertEqual(self.repository.pages, pages)
+            since = self.client.get(path, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+            self.assertEqual(since.status_code, 304)
+
+    def test_new_reading_changes_register_etag(self):
+        etag = self.client.get('/register').headers["ETag"]
+        self.repository.write([record(3)])
+        response = self.client.get('/register', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertIn("pergunta 3", response.get_data(as_text=True))
+
+    def test_query_changes_register_etag(self):
+        first = self.client.get('/api/register?limit=1').headers["ETag"]
+        second = self.client.get('/api/register?limit=2').headers["ETag"]
+        self.assertNotEqual(first, second)
+
+    def test_static_routes_use_content_etags(self):
+        for path in ('/sitemap.xml', '/robots.txt'):
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            again = self.client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(again.status_code, 304)
+            other_host = self.client.get(path, base_url="http://outro.exemplo",
+                                         headers={"If-None-Match": first.headers["ETag"]})
+            self.assertEqual(other_host.status_code, 200)
+            self.assertIn("outro.exemplo", other_host.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
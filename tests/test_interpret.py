@@ -0,0 +1,74 @@
+import unittest
+from pathlib import Path
+import sys
+import json
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.deck import Deck
+from engine.interpret import Interpreter, sections_for_violations
+from engine.nlg import ObjectiveLinter
+from engine.rng import SeededRNG
+from engine.state import State
+from engine.templating import DEFAULTS
+
+
+class TestInterpreter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data_path = Path(__file__).parent.parent / "data"
+        with open(data_path / "lore.json", 'r', encoding='utf-8') as f:
+            cls.lore = json.load(f)
+        cls.deck = Deck.load_from_json(str(data_path / "deck.json"), taboos=cls.lore["taboos"])
+        cls.interpreter = Interpreter(str(data_path / "templates.json"), deck=cls.deck)
+    
+    def interpret(self, seed: int, question: str = "Devo mudar de emprego?"):
+        state = State("test_base")
+        state.consult_count = seed
+        symbols = self.deck.draw_three(state, SeededRNG(seed), question)
+        return self.interpreter.interpret(state, symbols, None, self.lore, SeededRNG(seed), question=question)
+    
+    def test_sections_for_violations(self):
+        self.assertEqual(sections_for_violations(["has_condition", "preco_is_concrete"]),
+                         frozenset({"condition", "preco"}))
+    
+    def test_returned_ato_preco_are_the_linted_ones(self):
+        for seed in range(30):
+            result = self.interpret(seed)
+            self.assertIn(f"ATO: {result['ato']}", result["coda"])
+            self.assertIn(f"PREÇO: {result['preco']}", result["coda"])
+            checks = ObjectiveLinter().lint(result["reading"], result["ato"], result["preco"])
+            self.assertEqual(checks["ok"], result["objective_checks"]["ok"])
+            if result["attempt"] == 0:
+                self.assertEqual(result["sections_regenerated"], 0)
+            else:
+                self.assertGreater(result["sections_regenerated"], 0)
+
+    def test_trend_fallback_keeps_rng_stream(self):
+        data_path = Path(__file__).parent.parent / "data"
+        templates = json.loads((data_path / "templates.json").read_text(encoding='utf-8'))
+        explicit = json.loads(json.dumps(templates))
+        for elemento in ("água", "ferro"):
+            self.assertNotIn(elemento, templates["trend_sentence_templates"])
+            explicit["trend_sentence_templates"][elemento] = DEFAULTS["trend_sentence_templates"]
+        with tempfile.TemporaryDirectory() as tmp:
+            interpreters = []
+            for name, variant in (("fallback", templates), ("explicit", explicit)):
+                (Path(tmp) / name).mkdir()
+                path = Path(tmp) / name / "templates.json"
+                path.write_text(json.dumps(variant, ensure_ascii=False), encoding='utf-8')
+                interpreters.append(Interpreter(str(path), deck=self.deck))
+            fallbacks = 0
+            for seed in range(40):
+                state = State("fallback")
+                symbols = self.deck.draw_three(state, SeededRNG(seed), "Devo mudar de emprego?")
+                fallbacks += symbols[0].correspondencias.get("elemento") in ("água", "ferro")
+                readings = [interpreter.interpret(State("fallback"), symbols, None, self.lore, SeededRNG(seed))
+                            for interpreter in interpreters]
+                self.assertEqual(readings[0]["reading"], readings[1]["reading"])
+                self.assertEqual(readings[0]["coda"], readings[1]["coda"])
+            self.assertGreater(fallbacks, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from pathlib import Path
+import sys
+import json
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.matcher import Automaton
+from engine.deck import Deck
+from engine.taboos import check_taboos
+from engine.topic_extractor import TopicExtractor
+
+
+class TestMatcher(unittest.TestCase):
+    def setUp(self):
+        data_path = Path(__file__).parent.parent / "data"
+        with open(data_path / "lore.json", 'r', encoding='utf-8') as f:
+            self.lore = json.load(f)
+        self.deck = Deck.load_from_json(str(data_path / "deck.json"), taboos=self.lore["taboos"])
+    
+    def test_automaton_finds_overlapping_patterns(self):
+        automaton = Automaton(["he", "she", "his", "hers"])
+        found = {automaton.patterns[i] for i in automaton.find_all("ushers")}
+        self.assertEqual(found, {"he", "she", "hers"})
+    
+    def test_scan_matches_taboo_lookup(self):
+        for question in ["Quero ganhar na loteria", "Como hackear um sistema", "Devo mudar de emprego?"]:
+            expected, _ = check_taboos(question, self.lore)
+            taboo, _ = check_taboos(question, self.lore, self.deck.scan(question))
+            self.assertEqual(expected and expected.id, taboo and taboo.id)
+    
+    def test_scan_tags_symbols_and_domains(self):
+        question = "Fiz uma PROMESSA e temo a traição"
+        matches = self.deck.scan(question)
+        voto = next(i for i, s in enumerate(self.deck.symbols) if s.id == "voto")
+        self.assertEqual(matches.symbol_hits[voto], (1, 1))
+        topics = TopicExtractor(self.deck).extract_topics(question, matches)
+        self.assertIn("voto", [domain for domain, _ in topics])
+
+
+if __name__ == '__main__':
+    unittest.main()
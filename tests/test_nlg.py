@@ -0,0 +1,53 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.nlg import ObjectiveLinter, CoherenceChecker, LintMatch
+
+
+READING = "\n".join([
+    "[LEITURA]",
+    "Tese: o presente pede foco.",
+    "Evidência do passado: sinais repetidos",
+    "Presente: você age, mas hesita.",
+    "Observe: o mesmo ponto volta.",
+    "Regra: se a clareza cresce, então a tendência se firma.",
+    "Limite: não confunda tendência com certeza.",
+])
+
+
+class TestObjectiveLinter(unittest.TestCase):
+    def setUp(self):
+        self.linter = ObjectiveLinter()
+
+    def test_valid_reading(self):
+        report = self.linter.report(READING, "Hoje, anote 3 evidências.", "Por 48h, renuncie a perguntar de novo.")
+        self.assertTrue(report.ok)
+        self.assertEqual(report.evidence_lines, {2, 4})
+        self.assertIn(LintMatch("has_thesis", READING.lower().find("tese:"), "tese:"), report.matches["reading"])
+        self.assertEqual(report.to_dict(), self.linter.lint(READING, "Hoje, anote 3 evidências.",
+                                                            "Por 48h, renuncie a perguntar de novo."))
+
+    def test_violations(self):
+        report = self.linter.report("[LEITURA]\nPresente: nada.", "Faça algo.", "Um preço espiritual.")
+        self.assertFalse(report.ok)
+        for violation in ["has_thesis", "evidence_count_ok", "has_limit", "ato_has_deadline",
+                          "ato_has_criterion", "preco_has_deadline", "preco_is_concrete"]:
+            self.assertIn(violation, report.violations)
+
+    def test_evidence_must_start_line(self):
+        report = self.linter.report("a Evidência\n  Evidência b\nevidência c", "", "")
+        self.assertEqual(report.evidence_lines, {1})
+
+
+class TestCoherenceChecker(unittest.TestCase):
+    def test_contradiction(self):
+        checker = CoherenceChecker()
+        self.assertFalse(checker._check_contradiction("Sempre avance, nunca recue."))
+        self.assertTrue(checker._check_contradiction("Sempre avance; no entanto, nunca recue."))
+        self.assertTrue(checker._check_contradiction("Siga em frente."))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from pathlib import Path
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.register import ReadingIndex
+from engine.repository import JsonlRepository
+from engine.writer import ReadingWriter
+from tests.fixtures import record
+
+
+class TestReadingIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "readings.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, numbers):
+        repository = JsonlRepository(self.path)
+        writer = ReadingWriter(repository, fsync="never")
+        writer.submit([record(n) for n in numbers])
+        writer.close()
+        return repository.index
+
+    def test_pages_from_tail(self):
+        index = self.write(range(45))
+        page = index.page(limit=20)
+        self.assertEqual(page.total, 45)
+        self.assertEqual([r["id"] for r in page.readings], list(range(44, 24, -1)))
+        self.assertEqual(page.next_before, 25)
+        last = index.page(before=5, limit=20)
+        self.assertEqual([r["question"] for r in last.readings],
+                         [f"pergunta {n}" for n in range(4, -1, -1)])
+        self.assertIsNone(last.next_before)
+
+    def test_reconcile_indexes_unindexed_tail(self):
+        self.path.write_text(record(0) + "\n" + record(1) + '{"partial"', encoding="utf-8")
+        index = ReadingIndex(self.path)
+        self.assertEqual(index.reconcile(), 2)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(': 1}\n' + record(2))
+        self.assertEqual(index.reconcile(), 2)
+        self.assertEqual([r.get("question") for r in index.read(0, 4)],
+                         ["pergunta 0", "pergunta 1", None, "pergunta 2"])
+
+    def test_rebuild_after_truncation(self):
+        index = self.write(range(5))
+        self.path.write_text(record(9), encoding="utf-8")
+        self.assertEqual(index.reconcile(), 1)
+        self.assertEqual(index.page().readings[0]["question"], "pergunta 9")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from pathlib import Path
+import json
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.reload import EngineReloader
+from engine.repository import JsonlRepository
+from engine.service import EVENT_RESULT, ConsultationService
+from engine.snapshot import DATA_FILES, load_engine, signing_key
+from engine.state import State
+from engine.writer import ReadingWriter
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+
+class TestEngineReloader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = Path(self.tmp.name) / "data"
+        shutil.copytree(DATA_PATH, self.data)
+        self.snapshots = Path(self.tmp.name) / "engine"
+        self.swapped = []
+        self.reloader = EngineReloader(self.load(), self.load, paths=[self.data / name for name in DATA_FILES],
+                                       on_swap=self.swapped.append)
+
+    def tearDown(self):
+        self.reloader.close()
+        self.tmp.cleanup()
+
+    def load(self):
+        return load_engine(self.data, self.snapshots, key=signing_key("teste"))
+
+    def edit(self, name, change):
+        path = self.data / name
+        data = json.loads(path.read_text(encoding='utf-8'))
+        change(data)
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+    def test_swaps_to_new_version(self):
+        old = self.reloader.engine
+        self.assertFalse(self.reloader.poll())
+        self.assertFalse(self.reloader.reload())
+
+        self.edit("lore.json", lambda lore: lore.setdefault("effects", {}).update(interference_threshold=61))
+        self.assertTrue(self.reloader.poll())
+        self.assertTrue(self.reloader.reload())
+        new = self.reloader.engine
+        self.assertNotEqual(new.version, old.version)
+        self.assertEqual(new.lore["effects"]["interference_threshold"], 61)
+        self.assertEqual(self.swapped, [new])
+        self.assertEqual(self.reloader.stats()["generation"], 1)
+
+    def test_invalid_data_keeps_current_engine(self):
+        old = self.reloader.engine
+        self.edit("templates.json", lambda templates: templates.update(limit_templates=["Limite {inexistente}"]))
+        with self.assertLogs("engine.reload", level="ERROR") as logs:
+            self.assertFalse(self.reloader.reload())
+        self.assertIn(old.version, logs.output[0])
+        self.assertIs(self.reloader.engine, old)
+        self.assertEqual(self.swapped, [])
+        stats = self.reloader.stats()
+        self.assertEqual((stats["version"], stats["failures"]), (old.version, 1))
+        self.assertIn("TemplateError", stats["last_error"])
+
+    def test_in_flight_reading_finishes_on_old_engine(self):
+        readings_path = Path(self.tmp.name) / "readings.jsonl"
+        writer = ReadingWriter(JsonlRepository(readings_path), fsync="never")
+        services = []
+
+        def swap(engine):
+            services.append(ConsultationService(engine.deck, engine.interpreter, engine.lore, writer,
+                                                engine_version=engine.version))
+
+        swap(self.reloader.engine)
+        self.reloader.on_swap = swap
+        old_version = self.reloader.engine.version
+
+        state = State("reload", services[0].deck.vocabulary)
+        events = services[0].consult_stream(state, "Como está o meu trabalho?")
+        next(events)
+        self.edit("lore.json", lambda lore: lore.update(reload_test=True))
+        self.assertTrue(self.reloader.reload())
+        for event, result in events:
+            pass
+        self.assertEqual(event, EVENT_RESULT)
+        services[-1].consult(State("reload", services[-1].deck.vocabulary), "Como está o meu trabalho?")
+        writer.close()
+
+        with open(readings_path, 'r', encoding='utf-8') as f:
+            versions = [json.loads(line)["engine_version"] for line in f]
+        self.assertEqual(versions, [old_version, self.reloader.engine.version])
+
+
+if __name__ == '__main__':
+    unittest.main()
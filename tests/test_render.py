@@ -0,0 +1,56 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web.app import create_app
+from web.routes import render_reading_to_html
+
+READING = {
+    "seal": "[SELO]\nO Véu",
+    "liturgy": "[LITURGIA]\nLeis: L1",
+    "reading": "[LEITURA]\nTese: <script>alert(1)</script>",
+    "coda": "[CODA]\nATO: x",
+    "ato": "Em 24h, anote sobre <img src=x onerror=alert(1)>.",
+    "preco": "Uma hora & meia",
+    "interference_line": "",
+    "correspondencias": {
+        "passado": {"nome": "Espelho", "glifo": "◐", "elemento": "Água", "planeta": "Lua", "qualidade": "fixa"}
+    }
+}
+
+
+class TestReadingFragment(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app(open_stores=False)
+
+    def test_escapes_question_derived_text(self):
+        with self.app.test_request_context():
+            html = str(render_reading_to_html(READING))
+        self.assertNotIn("<script>", html)
+        self.assertNotIn("<img", html)
+        self.assertIn("Tese: &lt;script&gt;alert(1)&lt;/script&gt;", html)
+        self.assertIn("PREÇO: Uma hora &amp; meia", html)
+        self.assertIn('<div class="seal ">[SELO]<br>O Véu</div>', html)
+        self.assertIn("<tr><td>Passado</td><td>◐ Espelho</td><td>Água</td><td>Lua</td><td>fixa</td></tr>", html)
+        self.assertNotIn("Presente", html)
+        self.assertNotIn("interference-line", html)
+
+    def test_fragments_are_cached_by_fingerprint(self):
+        cache = self.app.config['FRAGMENT_CACHE']
+        cache.clear()
+        hits = cache.stats()["hits"]
+        with self.app.test_request_context():
+            first = render_reading_to_html(READING, True, "abc")
+            second = render_reading_to_html(READING, True, "abc")
+            calm = render_reading_to_html(READING, False, "abc")
+        self.assertEqual(first, second)
+        self.assertIn('class="reading-container entropy-high"', first)
+        self.assertNotIn("entropy-high", calm)
+        self.assertEqual(cache.stats()["hits"], hits + 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from pathlib import Path
+import sqlite3
+import sys
+import tempfile
+import threading
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.repository import JsonlRepository, ReadingFilter, ReadingRepository, SqliteRepository, import_readings
+from engine.writer import ReadingWriter
+from tests.fixtures import record
+
+
+class TestReadingRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jsonl_path = Path(self.tmp.name) / "readings.jsonl"
+        self.jsonl = JsonlRepository(self.jsonl_path)
+        writer = ReadingWriter(self.jsonl, fsync="never", max_batch=7)
+        writer.submit([record(n) for n in range(60)])
+        writer.close()
+        self.sqlite = SqliteRepository(Path(self.tmp.name) / "readings.db")
+        self.imported = import_readings(self.jsonl, self.sqlite, batch_size=16)
+
+    def tearDown(self):
+        self.sqlite.close()
+        self.tmp.cleanup()
+
+    def test_incomplete_repository_fails_on_construction(self):
+        class WithoutLastModified(ReadingRepository):
+            def write(self, lines):
+                return 0
+
+            def count(self):
+                return 0
+
+            def iter_readings(self, filters=None, before=None, newest_first=True):
+                return iter(())
+
+        with self.assertRaises(TypeError):
+            WithoutLastModified()
+
+    def test_import(self):
+        self.assertEqual(self.imported, 60)
+        self.assertEqual(self.sqlite.count(), 60)
+        with self.assertRaises(ValueError):
+            import_readings(self.jsonl, self.sqlite)
+
+    def test_backends_agree_on_filtered_pages(self):
+        filters = [
+            ReadingFilter(),
+            ReadingFilter(symbol="S02"),
+            ReadingFilter(topic="trabalho", relation="tensão"),
+            ReadingFilter(since=1010, until=1040, min_attempt=1),
+            ReadingFilter(symbol="S99")
+        ]
+        for reading_filter in filters:
+            for before in (None, 45):
+                expected = self.jsonl.page(before, 5, reading_filter)
+                actual = self.sqlite.page(before, 5, reading_filter)
+                self.assertEqual(actual, expected)
+
+        page = self.sqlite.page(None, 5, ReadingFilter(symbol="S02"))
+        self.assertTrue(all("S02" in r["symbols"] for r in page.readings))
+        cursor = page.next_before
+        following = self.sqlite.page(cursor, 5, ReadingFilter(symbol="S02"))
+        self.assertLess(following.readings[0]["id"], cursor)
+
+    def test_backends_agree_on_counts(self):
+        for field in ("symbol", "topic", "relation", "attempt"):
+            self.assertEqual(self.sqlite.counts(field), self.jsonl.counts(field))
+        by_symbol = dict(self.sqlite.counts("symbol", ReadingFilter(until=1020)))
+        self.assertEqual(by_symbol["S09"], 20)
+        self.assertEqual(by_symbol["S01"], 10)
+        with self.assertRaises(ValueError):
+            self.sqlite.counts("question")
+
+    def test_sqlite_writer_continues_ids(self):
+        writer = ReadingWriter(self.sqlite, fsync="always")
+        writer.submit([record(60), record(61)])
+        writer.close()
+        page = self.sqlite.page(limit=2)
+        self.assertEqual([r["id"] for r in page.readings], [61, 60])
+        self.assertEqual(page.readings[0]["question"], "pergunta 61")
+
+    def test_sqlite_writers_in_two_processes_share_ids(self):
+        other = SqliteRepository(self.sqlite.path)
+        try:
+            self.sqlite.open()
+            other.open()
+            self.sqlite.write([record(60)])
+            other.write([record(61), record(62)])
+            self.sqlite.write([record(63)])
+        finally:
+            other.close()
+        self.assertEqual(self.sqlite.count(), 64)
+        page = self.sqlite.page(limit=4)
+        self.assertEqual([r["question"] for r in page.readings],
+                         ["pergunta 63", "pergunta 62", "pergunta 61", "pergunta 60"])
+        self.assertEqual(dict(self.sqlite.counts("symbol"))["S09"], 64)
+
+    def test_sqlite_close_closes_every_reader(self):
+        ready = threading.Barrier(4)
+        closed = threading.Event()
+        still_open = []
+
+        def read():
+            self.assertEqual(self.sqlite.count(), 60)
+            connection = self.sqlite._local.connection
+            ready.wait()
+            closed.wait()
+            try:
+                connection.execute("SELECT 1")
+                still_open.append(connection)
+            except sqlite3.ProgrammingError:
+                pass
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        ready.wait()
+        self.sqlite.close()
+        closed.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(still_open, [])
+        self.assertEqual(self.sqlite.count(), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
 import unittest
 from pathlib import Path
+import os
+import subprocess
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from engine.rng import make_seed, SeededRNG
+from engine.rng import make_seed, SeededRNG, canonical_json, stable_digest, stable_hash
 from engine.state import State
 
 
@@ -26,13 +28,39 @@ class TestReproducibility(unittest.TestCase):
         
         self.assertEqual(val1, val2)
     
+    def test_stable_hash(self):
+        self.assertEqual(stable_hash("base", "pergunta", 1), stable_hash("base", "pergunta", 1))
+        self.assertNotEqual(stable_hash("ab", "c"), stable_hash("a", "bc"))
+        self.assertEqual(canonical_json({"b": 1, "a": "ç"}), '{"a":"ç","b":1}')
+        self.assertEqual(stable_digest({"b": 1, "a": 2}), stable_digest({"a": 2, "b": 1}))
+    
+    def test_reading_independent_of_hash_seed(self):
+        script = (
+            "import json; from engine.deck import Deck; from engine.interpret import Interpreter; "
+            "from engine.rng import SeededRNG, stable_digest; from engine.state import State; "
+            "lore = json.load(open('data/lore.json', encoding='utf-8')); "
+            "deck = Deck.load_from_json('data/deck.json'); "
+            "interpreter = Interpreter('data/templates.json', deck=deck); "
+            "state = State('base'); state.consult_count = 3; "
+            "reading = interpreter.interpret(state, tuple(deck.symbols[4:7]), None, lore, SeededRNG(11), question='Devo mudar?'); "
+            "print(stable_digest(reading))"
+        )
+        root = Path(__file__).parent.parent
+        digests = set()
+        for hash_seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+            output = subprocess.run([sys.executable, "-c", script], cwd=root, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            digests.add(output.strip())
+        self.assertEqual(len(digests), 1)
+    
     def test_repeat_question_increases_entropy(self):
         state = State("test_base")
         initial_entropy = state.entropy
         initial_debt = state.debt
         
         question = "Teste"
-        state.last_questions.append(question)
+        state.remember_question(question)
         state.apply_repeat_penalty()
         
         self.assertGreater(state.entropy, initial_entropy)
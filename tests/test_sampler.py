@@ -0,0 +1,52 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.sampler import FenwickSampler, SAMPLER_V2
+from engine.deck import Deck
+from engine.rng import SeededRNG
+from engine.state import State
+
+
+class TestFenwickSampler(unittest.TestCase):
+    def test_find_matches_prefix_sums(self):
+        weights = [0.5, 1.0, 0.0, 2.0, 0.3]
+        session = FenwickSampler(weights).session()
+        self.assertEqual(session.find(0.0), 0)
+        self.assertEqual(session.find(0.6), 1)
+        self.assertEqual(session.find(1.5), 3)
+        self.assertEqual(session.find(3.6), 4)
+    
+    def test_session_updates_do_not_touch_base(self):
+        sampler = FenwickSampler([1.0, 1.0, 1.0])
+        session = sampler.session()
+        session.remove(1)
+        session.set_weight(2, 4.0)
+        self.assertAlmostEqual(session.total, 5.0)
+        self.assertEqual(session.find(1.5), 2)
+        self.assertAlmostEqual(sampler.session().total, 3.0)
+    
+    def test_take_without_replacement(self):
+        session = FenwickSampler([1.0] * 4).session()
+        taken = session.take(SeededRNG(7), 10)
+        self.assertEqual(sorted(taken), [0, 1, 2, 3])
+
+
+class TestDeckSamplerV2(unittest.TestCase):
+    def test_v2_draws_distinct_symbols(self):
+        deck_path = Path(__file__).parent.parent / "data" / "deck.json"
+        deck = Deck.load_from_json(str(deck_path), sampler=SAMPLER_V2)
+        state = State("test_base")
+        state.motif_counts = {"voto": 3}
+        for seed in range(20):
+            symbols = deck.draw_three(state, SeededRNG(seed), "uma promessa")
+            self.assertEqual(len({s.id for s in symbols}), 3)
+    
+    def test_unknown_sampler_rejected(self):
+        with self.assertRaises(ValueError):
+            Deck([], sampler="v9")
+
+
+if __name__ == '__main__':
+    unittest.main()
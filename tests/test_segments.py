@@ -0,0 +1,118 @@
+import unittest
+from pathlib import Path
+import os
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.repository import JsonlRepository, ReadingFilter
+from engine.writer import ReadingWriter
+from tests.fixtures import record
+
+PADDING = {"reading_text": {"reading": "texto " * 20}}
+
+
+class TestSegmentedLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, directory, numbers, **options):
+        repository = JsonlRepository(self.root / directory / "readings.jsonl", **options)
+        (self.root / directory).mkdir(exist_ok=True)
+        writer = ReadingWriter(repository, fsync="never", max_batch=10)
+        for number in numbers:
+            writer.submit([record(number, **PADDING)])
+            writer.flush()
+        writer.close()
+        return repository
+
+    def test_segments_roll_compress_and_read_through(self):
+        segmented = self.write("segmented", range(120), segment_bytes=4000, segment_seconds=0)
+        plain = self.write("plain", range(120), segment_bytes=0, segment_seconds=0)
+
+        segments = segmented.segments.segments()
+        self.assertGreater(len(segments), 3)
+        self.assertTrue(all(entry["codec"] for entry in segments))
+        self.assertEqual([e["first_id"] for e in segments[1:]],
+                         [e["first_id"] + e["count"] for e in segments[:-1]])
+        self.assertLess(segmented.disk_usage()["bytes"], segmented.disk_usage()["raw_bytes"])
+        self.assertEqual(segmented.count(), 120)
+
+        for before in (None, 100, segments[1]["first_id"] + 3, 7):
+            self.assertEqual(segmented.page(before, 15), plain.page(before, 15))
+        reading_filter = ReadingFilter(topic="trabalho", since=1010, until=1090)
+        self.assertEqual(segmented.page(None, 10, reading_filter), plain.page(None, 10, reading_filter))
+        self.assertEqual(segmented.counts("symbol"), plain.counts("symbol"))
+        self.assertEqual([r["id"] for r in segmented.iter_readings(newest_first=False)], list(range(120)))
+
+    def test_range_reads_skip_segments(self):
+        repository = self.write("segmented", range(120), segment_bytes=4000, segment_seconds=0)
+        segments = repository.segments.segments()
+        target = segments[2]
+        touched = []
+        lines = repository.segments.lines
+        repository.segments.lines = lambda entry: touched.append(entry["file"]) or lines(entry)
+        readings = list(repository.iter_readings(ReadingFilter(since=target["first_ts"], until=target["last_ts"] + 1)))
+        self.assertEqual(touched, [target["file"]])
+        self.assertEqual(len(readings), target["count"])
+
+    def test_roll_by_age_and_recover_pending(self):
+        path = self.root / "readings.jsonl"
+        path.write_text(record(0, **PADDING) + record(1, **PADDING), encoding="utf-8")
+        repository = JsonlRepository(path, segment_bytes=0, segment_seconds=60)
+        repository.open()
+        repository.write([record(2, **PADDING)])
+        self.assertEqual(repository.segments.total(), 2)
+        repository.close()
+        self.assertEqual(repository.segments.segments()[0]["codec"], "gzip")
+
+        raw = self.root / "readings-pending.jsonl"
+        raw.write_text(record(3, **PADDING), encoding="utf-8")
+        pending = repository.segments.add(raw, 2, 1)
+        path.unlink()
+        reopened = JsonlRepository(path)
+        reopened.open()
+        reopened.close()
+        self.assertIsNone(pending["codec"])
+        self.assertEqual(reopened.segments.segments()[1]["codec"], "gzip")
+        self.assertEqual([r["question"] for r in reopened.page().readings],
+                         ["pergunta 3", "pergunta 1", "pergunta 0"])
+
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requer fork()")
+    def test_concurrent_processes_share_the_log(self):
+        path = self.root / "readings.jsonl"
+        pids = []
+        for worker in range(4):
+            pid = os.fork()
+            if pid == 0:
+                code = 1
+                try:
+                    repository = JsonlRepository(path, segment_bytes=6000, segment_seconds=0)
+                    writer = ReadingWriter(repository, fsync="never", max_batch=3)
+                    for number in range(worker * 50, worker * 50 + 50):
+                        writer.submit([record(number, **PADDING)])
+                    writer.close()
+                    code = 0
+                finally:
+                    os._exit(code)
+            pids.append(pid)
+        for pid in pids:
+            self.assertEqual(os.waitpid(pid, 0)[1], 0)
+
+        repository = JsonlRepository(path)
+        repository.open()
+        repository.close()
+        self.assertEqual(repository.count(), 200)
+        readings = list(repository.iter_readings(newest_first=False))
+        self.assertEqual([r["id"] for r in readings], list(range(200)))
+        self.assertEqual(sorted(r["timestamp"] for r in readings), [1000 + n for n in range(200)])
+        self.assertGreater(len(repository.segments.segments()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from pathlib import Path
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import urllib.request
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web.server import PreforkServer
+
+
+def pid_app(environ, start_response):
+    if environ["PATH_INFO"] == "/lento":
+        time.sleep(3)
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requer fork()")
+class TestPreforkServer(unittest.TestCase):
+    def start(self, max_requests):
+        self.port = free_port()
+        self.master = os.fork()
+        if self.master == 0:
+            try:
+                PreforkServer(lambda: pid_app, "127.0.0.1", self.port, workers=2,
+                              max_requests=max_requests).serve()
+            finally:
+                os._exit(0)
+        self.get()
+
+    def tearDown(self):
+        os.kill(self.master, signal.SIGTERM)
+        _, status = os.waitpid(self.master, 0)
+        self.assertEqual(status, 0)
+
+    def get(self, path="/"):
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=5) as response:
+                    return int(response.read())
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def test_workers_are_forked_and_recycled(self):
+        self.start(max_requests=3)
+        pids = [self.get() for _ in range(20)]
+        self.assertNotIn(self.master, pids)
+        self.assertGreater(len(set(pids)), 2)
+
+    def test_sighup_replaces_workers(self):
+        self.start(max_requests=0)
+        before = {self.get() for _ in range(6)}
+        self.assertLessEqual(len(before), 2)
+        os.kill(self.master, signal.SIGHUP)
+        time.sleep(1.5)
+        after = {self.get() for _ in range(6)}
+        self.assertFalse(before & after)
+
+    @unittest.skipUnless(os.path.isdir("/proc"), "requer /proc")
+    def test_reload_refills_pool_while_old_workers_drain(self):
+        self.start(max_requests=0)
+        slow = [threading.Thread(target=self.get, args=("/lento",)) for _ in range(2)]
+        for thread in slow:
+            thread.start()
+        time.sleep(0.5)
+        os.kill(self.master, signal.SIGHUP)
+        time.sleep(1.5)
+        self.assertEqual(len(self.children()), 4)
+        for thread in slow:
+            thread.join()
+        time.sleep(1.5)
+        self.assertEqual(len(self.children()), 2)
+
+    def children(self):
+        pids = []
+        for entry in os.listdir("/proc"):
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[1]) == self.master and fields[0] != "Z":
+                pids.append(int(entry))
+        return pids
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from pathlib import Path
+import sys
+import json
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.deck import Deck
+from engine.interpret import Interpreter
+from engine.service import ConsultationService, EVENT_RESULT, KIND_EMPTY, KIND_READING, KIND_TABOO
+from engine.state import State
+from engine.repository import JsonlRepository
+from engine.writer import ReadingWriter
+
+
+class TestConsultationService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data_path = Path(__file__).parent.parent / "data"
+        with open(data_path / "lore.json", 'r', encoding='utf-8') as f:
+            cls.lore = json.load(f)
+        cls.deck = Deck.load_from_json(str(data_path / "deck.json"), taboos=cls.lore["taboos"])
+        cls.interpreter = Interpreter(str(data_path / "templates.json"), deck=cls.deck)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.readings_path = Path(self.tmp.name) / "readings.jsonl"
+        self.writer = ReadingWriter(JsonlRepository(self.readings_path), fsync="never")
+        self.service = ConsultationService(self.deck, self.interpreter, self.lore, self.writer)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def read_records(self):
+        self.writer.flush()
+        with open(self.readings_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_consult_persists_reading(self):
+        state = State("service")
+        result = self.service.consult(state, "Devo mudar de emprego?")
+        self.assertEqual(result.kind, KIND_READING)
+        self.assertEqual(state.consult_count, 1)
+        self.assertEqual(state.last_draw, [s.id for s in result.symbols])
+        records = self.read_records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["seed"], result.seed)
+        self.assertEqual(records[0]["state_snapshot"]["consult_count"], 1)
+
+    def test_taboo_is_not_persisted(self):
+        state = State("service")
+        result = self.service.consult(state, "Quero ganhar na loteria")
+        self.assertEqual(result.kind, KIND_TABOO)
+        self.assertGreater(state.debt, 0)
+        self.writer.flush()
+        self.assertFalse(self.readings_path.exists())
+
+    def test_batch_matches_sequential_consults(self):
+        questions = ["Devo mudar de emprego?", "", "Quero ganhar na loteria", "Como cuidar da relação?"]
+        sequential_state = State("batch")
+        sequential = [self.service.consult(sequential_state, q) for q in questions]
+        sequential_records = self.read_records()
+
+        batch_state = State("batch")
+        batch = self.service.consult_batch(batch_state, questions)
+
+        self.assertEqual([r.kind for r in batch], [KIND_READING, KIND_EMPTY, KIND_TABOO, KIND_READING])
+        self.assertEqual([r.reading for r in batch], [r.reading for r in sequential])
+        self.assertEqual(batch_state.to_dict(), sequential_state.to_dict())
+        records = self.read_records()[len(sequential_records):]
+        self.assertEqual([r["state_snapshot"] for r in records], [r["state_snapshot"] for r in sequential_records])
+        self.assertEqual(records[0]["state_snapshot"]["consult_count"], 1)
+        self.assertEqual(records[1]["state_snapshot"]["consult_count"], 2)
+
+    def test_stream_emits_sections_in_order(self):
+        expected_state = State("stream")
+        expected = self.service.consult(expected_state, "Devo mudar de emprego?")
+        state = State("stream")
+        events = list(self.service.consult_stream(state, "Devo mudar de emprego?"))
+        names = [name for name, _ in events]
+        self.assertEqual(names[:2], ["seal", "liturgy"])
+        self.assertEqual(names[-2:], ["coda", EVENT_RESULT])
+        lines = [data for name, data in events if name == "line"]
+        self.assertEqual("\n".join(lines), expected.reading["reading"])
+        result = events[-1][1]
+        self.assertEqual(result.reading, expected.reading)
+        self.assertEqual(state.to_dict(), expected_state.to_dict())
+        self.assertEqual(len(self.read_records()), 2)
+
+        taboo = list(self.service.consult_stream(State("stream"), "Quero ganhar na loteria"))
+        self.assertEqual([(name, data.kind) for name, data in taboo], [(EVENT_RESULT, KIND_TABOO)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from pathlib import Path
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web.sessions import MemorySessionStore, RedisError, RedisSessionStore, SessionStore, SqliteSessionStore
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.reply(args))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.data = {}
+        self.commands = []
+
+    def reply(self, args):
+        command = args[0].decode().upper()
+        self.commands.append(command)
+        if command == "SELECT":
+            return b"+OK\r\n"
+        if command == "SET":
+            self.data[args[1]] = (args[2], time.time() + int(args[4]))
+            return b"+OK\r\n"
+        if command == "GET":
+            value, expires = self.data.get(args[1], (None, 0))
+            if value is None or expires < time.time():
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "DEL":
+            return b":%d\r\n" % (self.data.pop(args[1], None) is not None)
+        return b"-ERR unknown command\r\n"
+
+
+class TestSessionStores(unittest.TestCase):
+    def test_incomplete_store_fails_on_construction(self):
+        class WithoutDelete(SessionStore):
+            def load(self, session_id):
+                return None
+
+            def save(self, session_id, payload):
+                pass
+
+        with self.assertRaises(TypeError):
+            WithoutDelete()
+
+    def test_memory_store_is_lru(self):
+        store = MemorySessionStore(max_entries=2)
+        store.save("a", b"1")
+        store.save("b", b"2")
+        store.load("a")
+        store.save("c", b"3")
+        self.assertIsNone(store.load("b"))
+        self.assertEqual(store.load("a"), b"1")
+        store.delete("a")
+        self.assertIsNone(store.load("a"))
+
+    def test_sqlite_store_persists_and_expires(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sessions.db"
+            store = SqliteSessionStore(path)
+            store.save("sid", b"\x01state")
+            store.close()
+            reopened = SqliteSessionStore(path)
+            self.assertEqual(reopened.load("sid"), b"\x01state")
+            expired = SqliteSessionStore(path, ttl=-1)
+            expired.save("old", b"")
+            self.assertIsNone(expired.load("old"))
+            reopened.close()
+            expired.close()
+
+    def test_sqlite_close_closes_every_thread_connection(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SqliteSessionStore(Path(tmp) / "sessions.db")
+            ready = threading.Barrier(4)
+            closed = threading.Event()
+            still_open = []
+
+            def use(session_id):
+                store.save(session_id, b"x")
+                connection = store._local.connection
+                ready.wait()
+                closed.wait()
+                try:
+                    connection.execute("SELECT 1")
+                    still_open.append(session_id)
+                except sqlite3.ProgrammingError:
+                    pass
+
+            threads = [threading.Thread(target=use, args=(f"sid{i}",)) for i in range(3)]
+            for thread in threads:
+                thread.start()
+            ready.wait()
+            store.close()
+            closed.set()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(still_open, [])
+            self.assertEqual(store.load("sid1"), b"x")
+            store.close()
+
+    def test_redis_store_against_fake_server(self):
+        server = FakeRedisServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            port = server.server_address[1]
+            store = RedisSessionStore(f"redis://127.0.0.1:{port}/2", ttl=60)
+            payload = b"\x01\r\n\x00" + "relação".encode('utf-8')
+            store.save("sid", payload)
+            self.assertEqual(store.load("sid"), payload)
+            self.assertEqual(server.commands[:3], ["SELECT", "SET", "GET"])
+            store.close()
+            store.delete("sid")
+            self.assertIsNone(store.load("sid"))
+            with self.assertRaises(RedisError):
+                store._execute("FLUSHALL")
+            store.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
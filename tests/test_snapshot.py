@@ -0,0 +1,148 @@
+import unittest
+from pathlib import Path
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine import snapshot
+from engine.rng import SeededRNG
+from engine.snapshot import (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, load_engine, read_snapshot, signing_key,
+                             snapshot_path, source_digest)
+from engine.state import State
+from engine.templating import TemplateError
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+KEY = signing_key("teste")
+
+
+class Exploit:
+    def __init__(self, marker: str):
+        self.marker = marker
+
+    def __reduce__(self):
+        return os.mkdir, (self.marker,)
+
+
+class TestEngineSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = Path(self.tmp.name) / "data"
+        shutil.copytree(DATA_PATH, self.data)
+        self.snapshots = Path(self.tmp.name) / "engine"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def draw(self, engine):
+        state = State("snapshot", engine.deck.vocabulary)
+        symbols = engine.deck.draw_three(state, SeededRNG(7), "Devo mudar de emprego?")
+        return [symbol.id for symbol in symbols]
+
+    def test_snapshot_is_written_and_reused(self):
+        compiled = load_engine(self.data, self.snapshots, key=KEY)
+        path = snapshot_path(self.snapshots, compiled.digest)
+        self.assertTrue(path.exists())
+
+        calls = []
+        original = snapshot.compile_engine
+        snapshot.compile_engine = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+        try:
+            loaded = load_engine(self.data, self.snapshots, key=KEY)
+        finally:
+            snapshot.compile_engine = original
+        self.assertEqual(calls, [])
+        self.assertEqual(loaded.digest, compiled.digest)
+        self.assertEqual(loaded.lore, compiled.lore)
+        self.assertEqual(self.draw(loaded), self.draw(compiled))
+        self.assertIs(loaded.interpreter.deck, loaded.deck)
+        self.assertIsNone(loaded.interpreter.cache)
+
+    def test_data_change_invalidates_snapshot(self):
+        first = load_engine(self.data, self.snapshots, key=KEY)
+        lore = json.loads((self.data / "lore.json").read_text(encoding='utf-8'))
+        lore["snapshot_test"] = True
+        (self.data / "lore.json").write_text(json.dumps(lore, ensure_ascii=False), encoding='utf-8')
+        second = load_engine(self.data, self.snapshots, key=KEY)
+        self.assertNotEqual(first.digest, second.digest)
+        self.assertTrue(second.lore["snapshot_test"])
+        self.assertEqual([p.name for p in self.snapshots.glob("engine-*.bin")],
+                         [snapshot_path(self.snapshots, second.digest).name])
+        self.assertNotEqual(source_digest(self.data, "v2"), second.digest)
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        digest = source_digest(self.data)
+        self.snapshots.mkdir()
+        snapshot_path(self.snapshots, digest).write_bytes(b"lixo")
+        engine = load_engine(self.data, self.snapshots, key=KEY)
+        self.assertEqual(engine.digest, digest)
+        self.assertEqual(read_snapshot(snapshot_path(self.snapshots, digest), KEY).digest, digest)
+
+    def test_unsigned_snapshot_is_never_unpickled(self):
+        engine = load_engine(self.data, self.snapshots, key=KEY)
+        path = snapshot_path(self.snapshots, engine.digest)
+        marker = Path(self.tmp.name) / "executado"
+        evil = pickle.dumps(Exploit(str(marker)))
+        path.write_bytes(SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) + bytes(32) + evil)
+        with self.assertRaises(ValueError):
+            read_snapshot(path, KEY)
+        self.assertEqual(load_engine(self.data, self.snapshots, key=KEY).digest, engine.digest)
+        self.assertFalse(marker.exists())
+
+    def test_snapshot_signed_with_other_key_is_rejected(self):
+        key = signing_key("segredo")
+        engine = load_engine(self.data, self.snapshots, key=key)
+        path = snapshot_path(self.snapshots, engine.digest)
+        self.assertEqual(read_snapshot(path, signing_key("segredo")).digest, engine.digest)
+        with self.assertRaises(ValueError):
+            read_snapshot(path, signing_key("outro"))
+        with self.assertRaises(ValueError):
+            read_snapshot(path, KEY)
+
+    def test_generated_key_is_shared_through_its_file(self):
+        key_path = Path(self.tmp.name) / "chave"
+        key = signing_key(key_path=key_path)
+        self.assertEqual(len(key), 32)
+        self.assertEqual(key_path.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(signing_key(key_path=key_path), key)
+        self.assertEqual([p.name for p in key_path.parent.iterdir() if p.name.startswith("chave")], ["chave"])
+        first = load_engine(self.data, self.snapshots, key=key)
+        calls = []
+        original = snapshot.compile_engine
+        snapshot.compile_engine = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+        try:
+            self.assertEqual(load_engine(self.data, self.snapshots, key=signing_key(key_path=key_path)).digest,
+                             first.digest)
+        finally:
+            snapshot.compile_engine = original
+        self.assertEqual(calls, [])
+
+    def test_without_key_compiles_in_memory(self):
+        with self.assertLogs("engine.snapshot", "WARNING"):
+            key = signing_key(key_path=Path(self.tmp.name) / "inexistente" / "chave")
+        self.assertIsNone(key)
+        engine = load_engine(self.data, self.snapshots, key=key)
+        self.assertEqual(engine.digest, source_digest(self.data))
+        self.assertFalse(self.snapshots.exists())
+
+    def test_samplers_keep_their_own_snapshots(self):
+        first = load_engine(self.data, self.snapshots, "v1", KEY)
+        second = load_engine(self.data, self.snapshots, "v2", KEY)
+        self.assertTrue(snapshot_path(self.snapshots, first.digest, "v1").exists())
+        self.assertTrue(snapshot_path(self.snapshots, second.digest, "v2").exists())
+        self.assertEqual(second.sampler, "v2")
+
+    def test_invalid_templates_fail_to_compile(self):
+        templates = json.loads((self.data / "templates.json").read_text(encoding='utf-8'))
+        templates["limit_templates"] = ["Limite {inexistente}"]
+        (self.data / "templates.json").write_text(json.dumps(templates, ensure_ascii=False), encoding='utf-8')
+        with self.assertRaises(TemplateError):
+            load_engine(self.data, self.snapshots, key=KEY)
+        self.assertFalse(self.snapshots.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import random
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.deck import Deck
+from engine.state import State, Vocabulary
+
+LEGACY_PAYLOAD = bytes.fromhex(
+    "01c0be0cba9d132b37000000000300000006006c656761646f000000020001000400666f72610300010000000200"
+    "020001000100010000000100000001000201000200")
+
+
+class TestCompactState(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data_path = Path(__file__).parent.parent / "data"
+        cls.deck = Deck.load_from_json(str(data_path / "deck.json"))
+        cls.vocabulary = cls.deck.vocabulary
+
+    def make_state(self):
+        state = State("compact", self.vocabulary)
+        symbols = self.deck.symbols
+        state.update_memory([symbols[3].id, symbols[1].id, symbols[3].id], [symbols[2].dominios[0], "fora-do-baralho"])
+        state.update_memory([symbols[1].id, "antigo"], symbols[0].dominios)
+        state.remember_question("devo mudar de emprego?")
+        state.last_draw = [symbols[3].id, symbols[1].id, "antigo"]
+        state.entropy, state.debt, state.consult_count = 40, 15, 7
+        state.last_answer_hash = "abc123"
+        return state
+
+    def test_bytes_round_trip(self):
+        state = self.make_state()
+        restored = State.from_bytes(state.to_bytes(), self.vocabulary)
+        self.assertEqual(restored.to_dict(), state.to_dict())
+        self.assertEqual(list(restored.motif_counts), list(state.motif_counts))
+        self.assertTrue(restored.check_repeat_question("Devo mudar de  emprego?"))
+
+    def test_dict_round_trip_and_legacy_questions(self):
+        state = self.make_state()
+        self.assertEqual(State.from_dict(state.to_dict(), self.vocabulary).to_dict(), state.to_dict())
+        legacy = State.from_dict({"session_seed_base": "x", "last_questions": ["devo mudar de emprego?"]},
+                                 self.vocabulary)
+        self.assertTrue(legacy.check_repeat_question("Devo mudar de emprego?"))
+        self.assertEqual(legacy.question_hashes, tuple(legacy.to_dict()["question_hashes"]))
+
+    def test_question_hashes_are_read_only(self):
+        state = self.make_state()
+        with self.assertRaises(AttributeError):
+            state.question_hashes = ()
+        with self.assertRaises(AttributeError):
+            state.question_hashes.append(0)
+        with self.assertRaises(AttributeError):
+            state.last_questions
+
+    def test_echo_prefers_first_seen_on_ties(self):
+        state = State("echo", self.vocabulary)
+        first, second = self.deck.symbols[5].id, self.deck.symbols[2].id
+        state.update_memory([first, second, second, first], [])
+        self.assertEqual(state.get_echo_symbol(), first)
+        state.update_memory([first], [])
+        state.update_memory([second, second], [])
+        self.assertEqual(state.get_echo_symbol(), second)
+
+    def test_incremental_echo_matches_full_scan(self):
+        rng = random.Random(17)
+        ids = [symbol.id for symbol in self.deck.symbols[:6]] + ["antigo", "perdido"]
+        state = State("echo", self.vocabulary)
+        for step in range(300):
+            state.update_memory(rng.sample(ids, 3), [])
+            counts = state.motif_counts
+            max_count = max(counts.values())
+            expected = next(s for s, c in counts.items() if c == max_count) if max_count >= 2 else None
+            self.assertEqual(state.get_echo_symbol(), expected)
+            if step % 50 == 0:
+                state = State.from_bytes(state.to_bytes(), self.vocabulary)
+                self.assertEqual(state.get_echo_symbol(), expected)
+                state = State.from_dict(state.to_dict(), self.vocabulary)
+                self.assertEqual(state.get_echo_symbol(), expected)
+
+    def test_vocabulary_mismatch_keeps_memory(self):
+        state = self.make_state()
+        other = Vocabulary(["x", "y"], ["z"])
+        restored = State.from_bytes(state.to_bytes(), other)
+        self.assertEqual(restored.to_dict(), state.to_dict())
+
+    def test_grown_vocabulary_remaps_by_name(self):
+        state = State("cresce", self.vocabulary)
+        first, second = self.deck.symbols[1].id, self.deck.symbols[4].id
+        state.update_memory([first, second, first], self.deck.symbols[1].dominios)
+        state.last_draw = [first, second]
+        grown = Vocabulary(("novo",) + self.vocabulary.symbols, ("novo",) + self.vocabulary.domains)
+        restored = State.from_bytes(state.to_bytes(), grown)
+        self.assertEqual(restored.motif_counts, {first: 2, second: 1})
+        self.assertEqual(restored.theme_counts, state.theme_counts)
+        self.assertEqual(restored.get_echo_symbol(), first)
+        self.assertEqual(restored.last_draw, [first, second])
+        self.assertEqual(restored.motif_count("novo"), 0)
+        self.assertEqual(restored._motifs.ordinal(first), grown.symbol_index[first])
+
+    def test_reads_format_1_payloads(self):
+        vocabulary = Vocabulary(["a", "b"], ["d"])
+        restored = State.from_bytes(LEGACY_PAYLOAD, vocabulary)
+        self.assertEqual(restored.consult_count, 3)
+        self.assertEqual(restored.motif_counts, {"b": 2, "a": 1, "fora": 1})
+        self.assertEqual(restored.theme_counts, {"d": 1})
+        self.assertEqual(restored.last_draw, ["b", "fora"])
+        other = State.from_bytes(LEGACY_PAYLOAD, Vocabulary(["c", "a", "b"], ["d"]))
+        self.assertEqual(other.motif_counts, {"fora": 1})
+        self.assertEqual(other.last_draw, [])
+
+    def test_rejects_unknown_version_and_truncation(self):
+        data = self.make_state().to_bytes()
+        with self.assertRaises(ValueError):
+            State.from_bytes(b"\x09" + data[1:], self.vocabulary)
+        with self.assertRaises(ValueError):
+            State.from_bytes(data[:-3], self.vocabulary)
+
+    def test_state_has_no_instance_dict(self):
+        self.assertFalse(hasattr(State("slots", self.vocabulary), "__dict__"))
+
+
+if __name__ == '__main__':
+    unittest.main()
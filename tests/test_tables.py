@@ -0,0 +1,62 @@
+import unittest
+from pathlib import Path
+import pickle
+import sys
+import tempfile
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.deck import Deck, Symbol
+from engine.snapshot import load_engine, signing_key
+from engine.tables import COLD_FIELDS, HOT_FIELDS, SymbolTable, SymbolView, write_tables
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+
+class TestSymbolTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.deck = Deck.load_from_json(str(DATA_PATH / "deck.json"))
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "engine.tables"
+        write_tables(self.path, self.deck.symbols, {"static_weights": self.deck.static_weights,
+                                                    "sampler_tree": self.deck.sampler.tree})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_views_match_symbols(self):
+        table = SymbolTable(self.path)
+        self.assertEqual(len(table.symbols), len(self.deck.symbols))
+        for view, symbol in zip(table.symbols, self.deck.symbols):
+            for name in HOT_FIELDS + COLD_FIELDS:
+                self.assertEqual(getattr(view, name), getattr(symbol, name))
+        self.assertEqual(list(table.columns["static_weights"]), self.deck.static_weights)
+        self.assertEqual(list(table.columns["sampler_tree"]), self.deck.sampler.tree)
+
+    def test_view_pickles_as_symbol(self):
+        view = SymbolTable(self.path).symbols[3]
+        copy = pickle.loads(pickle.dumps(view))
+        self.assertIsInstance(copy, Symbol)
+        self.assertEqual(copy, self.deck.symbols[3])
+
+    def test_truncated_table_is_rejected(self):
+        data = self.path.read_bytes()
+        self.path.write_bytes(data[:-10])
+        with self.assertRaises(ValueError):
+            SymbolTable(self.path)
+        self.path.write_bytes(b"x" + data[1:])
+        with self.assertRaises(ValueError):
+            SymbolTable(self.path)
+
+    def test_snapshot_engine_uses_shared_tables(self):
+        engine = load_engine(DATA_PATH, Path(self.tmp.name) / "engine", key=signing_key("teste"))
+        self.assertIsInstance(engine.deck.symbols[0], SymbolView)
+        self.assertIsInstance(engine.deck.static_weights, memoryview)
+        self.assertIs(engine.interpreter.deck, engine.deck)
+        self.assertEqual([s.id for s in engine.deck.symbols], [s.id for s in self.deck.symbols])
+
+
+if __name__ == '__main__':
+    unittest.main()
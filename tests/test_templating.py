@@ -0,0 +1,30 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.templating import Template, TemplateError, compile_templates, load_templates
+
+
+class TestTemplating(unittest.TestCase):
+    def test_render_resolves_aliases(self):
+        template = Template("Regra: {presente_verbo} e {passado_qualidade}.", {"present_verbo", "past_quality"})
+        self.assertEqual(template.fields, frozenset({"present_verbo", "past_quality"}))
+        rendered = template.render({"present_verbo": "corta", "past_quality": "fogo"})
+        self.assertEqual(rendered, "Regra: corta e fogo.")
+    
+    def test_unknown_placeholder_fails_at_compile_time(self):
+        with self.assertRaises(TemplateError) as ctx:
+            compile_templates({"tension_templates": ["Tensão: {sinal_inexistente}."]})
+        self.assertIn("tension_templates[0]", str(ctx.exception))
+    
+    def test_shipped_templates_compile(self):
+        templates_path = Path(__file__).parent.parent / "data" / "templates.json"
+        compiled = load_templates(str(templates_path))
+        self.assertTrue(compiled.ato_generic)
+        for template in compiled.ato_generic:
+            self.assertNotIn("acao", template.fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from pathlib import Path
+import sys
+import tempfile
+import threading
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.repository import JsonlRepository
+from engine.writer import ReadingWriter, parse_fsync_policy
+
+
+class TestReadingWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "readings.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_fsync_policy(self):
+        self.assertEqual(parse_fsync_policy("always"), 0.0)
+        self.assertIsNone(parse_fsync_policy("never"))
+        self.assertEqual(parse_fsync_policy("250"), 0.25)
+        with self.assertRaises(ValueError):
+            parse_fsync_policy("sometimes")
+
+    def test_concurrent_lines_are_not_interleaved(self):
+        writer = ReadingWriter(JsonlRepository(self.path), fsync="never", max_queue=8)
+        line = "x" * 10000
+
+        def produce(tag):
+            for i in range(50):
+                writer.submit([f"{tag}:{i}:{line}\n"])
+
+        threads = [threading.Thread(target=produce, args=(tag,)) for tag in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(len(lines), 200)
+        self.assertTrue(all(l.endswith(line) and l.count(":") == 2 for l in lines))
+        stats = writer.stats()
+        self.assertEqual(stats["written"], 200)
+        self.assertLessEqual(stats["batches"], 200)
+        self.assertLessEqual(stats["max_depth"], 8)
+
+    def test_submitted_lines_stay_in_one_batch(self):
+        repository = JsonlRepository(self.path)
+        writes = []
+        original = repository.write
+        repository.write = lambda batch: writes.append(list(batch)) or original(batch)
+        writer = ReadingWriter(repository, fsync="never", max_batch=2)
+
+        def produce(tag):
+            for i in range(20):
+                writer.submit([f"{tag}:{i}:{n}\n" for n in range(3)])
+
+        threads = [threading.Thread(target=produce, args=(tag,)) for tag in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(len(lines), 240)
+        for start in range(0, len(lines), 3):
+            self.assertEqual({l.rsplit(":", 1)[0] for l in lines[start:start + 3]}, {lines[start].rsplit(":", 1)[0]})
+        self.assertTrue(all(len(batch) % 3 == 0 for batch in writes))
+        self.assertEqual(writer.stats()["submitted"], 240)
+
+    def test_always_fsyncs_each_batch(self):
+        writer = ReadingWriter(JsonlRepository(self.path), fsync="always")
+        writer.submit(["a\n", "b\n"])
+        writer.flush()
+        self.assertEqual(self.path.read_text(), "a\nb\n")
+        self.assertGreaterEqual(writer.stats()["fsyncs"], 1)
+        writer.close()
+        with self.assertRaises(RuntimeError):
+            writer.submit(["c\n"])
+
+    def test_failed_batch_is_retried_before_new_work(self):
+        repository = FlakyRepository(self.path, failures=2)
+        writer = ReadingWriter(repository, fsync="never", retry_delay=0)
+        writer.submit(["a\n", "b\n"])
+        writer.flush()
+        writer.submit(["c\n"])
+        writer.close()
+        self.assertEqual(self.path.read_text(), "a\nb\nc\n")
+        stats = writer.stats()
+        self.assertEqual((stats["written"], stats["retried"], stats["rejected"]), (3, 2, 0))
+        self.assertEqual(stats["errors"], 2)
+
+    def test_batch_is_rejected_after_retries(self):
+        repository = FlakyRepository(self.path, failures=100)
+        writer = ReadingWriter(repository, fsync="never", retries=2, retry_delay=0)
+        with self.assertLogs("engine.writer", level="ERROR"):
+            writer.submit(["a\n", "b\n"])
+            writer.close()
+        self.assertEqual(Path(writer.reject_path).read_text(), "a\nb\n")
+        self.assertEqual(writer.reject_path, str(self.path) + ".rejected")
+        stats = writer.stats()
+        self.assertEqual((stats["written"], stats["retried"], stats["rejected"]), (0, 2, 2))
+
+
+class FlakyRepository(JsonlRepository):
+    def __init__(self, path, failures: int):
+        super().__init__(path)
+        self.failures = failures
+
+    def write(self, lines):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disco indisponível")
+        return super().write(lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
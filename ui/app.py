@@ -1,11 +1,15 @@
-import json
+import atexit
 import os
 from pathlib import Path
 from textual.app import App
 from .screens import HomeScreen
 from engine.state import State
-from engine.deck import Deck
-from engine.interpret import Interpreter
+from engine.sampler import SAMPLER_V1
+from engine.snapshot import KEY_PATH, load_engine, signing_key
+from engine.service import ConsultationService
+from engine.repository import STORE_JSONL, open_repository
+from engine.segments import DEFAULT_SEGMENT_BYTES, DEFAULT_SEGMENT_SECONDS
+from engine.writer import ReadingWriter, DEFAULT_FSYNC, parse_fsync_policy
 
 
 class OracleApp(App):
@@ -23,6 +27,8 @@ class OracleApp(App):
         self.lore = {}
         self.deck = None
         self.interpreter = None
+        self.service = None
+        self.repository = None
         self.data_path = Path(__file__).parent.parent / "data"
         self.storage_path = Path(__file__).parent.parent / "storage"
     
@@ -31,12 +37,19 @@ class OracleApp(App):
         self.push_screen(HomeScreen())
     
     def load_data(self):
-        lore_path = self.data_path / "lore.json"
-        deck_path = self.data_path / "deck.json"
-        templates_path = self.data_path / "templates.json"
-        
-        with open(lore_path, 'r', encoding='utf-8') as f:
-            self.lore = json.load(f)
-        
-        self.deck = Deck.load_from_json(str(deck_path))
-        self.interpreter = Interpreter(str(templates_path))
\ No newline at end of file
+        engine = load_engine(self.data_path, self.storage_path / "engine",
+                             sampler=os.environ.get('OBSERVADOR_SAMPLER', SAMPLER_V1),
+                             key=signing_key(os.environ.get('OBSERVADOR_SNAPSHOT_KEY'),
+                                             os.environ.get('OBSERVADOR_SNAPSHOT_KEY_FILE', KEY_PATH)))
+        self.lore = engine.lore
+        self.deck = engine.deck
+        self.interpreter = engine.interpreter
+        self.state = State(self.state.session_seed_base, self.deck.vocabulary)
+        fsync = os.environ.get('OBSERVADOR_FSYNC', DEFAULT_FSYNC)
+        self.repository = open_repository(
+            os.environ.get('OBSERVADOR_STORE', STORE_JSONL), self.storage_path, parse_fsync_policy(fsync),
+            segment_bytes=int(os.environ.get('OBSERVADOR_SEGMENT_BYTES', DEFAULT_SEGMENT_BYTES)),
+            segment_seconds=float(os.environ.get('OBSERVADOR_SEGMENT_SECONDS', DEFAULT_SEGMENT_SECONDS)))
+        writer = ReadingWriter(self.repository, fsync=fsync).start()
+        atexit.register(writer.close)
+        self.service = ConsultationService(self.deck, self.interpreter, self.lore, writer)
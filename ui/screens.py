@@ -1,6 +1,3 @@
-import json
-import time
-from pathlib import Path
 from textual.screen import Screen
 from textual.containers import Container, Vertical, Horizontal
 from textual.widgets import Static, Input, Button, ListView, ListItem, Label
@@ -8,8 +5,7 @@ from textual.binding import Binding
 from rich.text import Text
 from rich.panel import Panel
 from rich.console import Group
-from engine.rng import make_seed, SeededRNG
-from engine.taboos import check_taboos
+from engine.service import KIND_CRISIS, KIND_TABOO
 from .widgets import FooterWidget, ReadingDisplay
 
 
@@ -81,78 +77,25 @@ class ConsultScreen(Screen):
         result_display = self.query_one("#result_display", Static)
         result_display.update(Text("Consultando...", style="yellow"))
         
-        app = self.app
-        state = app.state
-        lore = app.lore
-        deck = app.deck
-        interpreter = app.interpreter
+        result = self.app.service.consult(self.app.state, question)
         
-        taboo, taboo_data = check_taboos(question, lore)
-        
-        if taboo and taboo.id == "T6":
+        if result.kind == KIND_CRISIS:
             result_display.update(Panel(
-                Text("Eu não selo portas finais.\n\nProcure ajuda agora. Se houver risco imediato, ligue para serviços de emergência locais.", style="bold red"),
+                Text(f"{result.response}\n\n{result.alternative}", style="bold red"),
                 title="Interrupção",
                 border_style="red"
             ))
             return
         
-        if taboo:
-            state.apply_taboo_penalty(taboo.debt_delta, taboo.entropy_delta)
+        if result.kind == KIND_TABOO:
             result_display.update(Panel(
-                Text(f"{taboo.response}\n\n{taboo.alternative}", style="yellow"),
+                Text(f"{result.response}\n\n{result.alternative}", style="yellow"),
                 title="Tabu Detectado",
                 border_style="yellow"
             ))
             return
         
-        is_repeat = state.check_repeat_question(question)
-        if is_repeat:
-            state.apply_repeat_penalty()
-        
-        if "sim ou não" in question.lower() or "certeza" in question.lower():
-            state.apply_certainty_penalty()
-        
-        state.consult_count += 1
-        state.last_questions.append(question)
-        if len(state.last_questions) > 5:
-            state.last_questions.pop(0)
-        
-        seed = make_seed(state.session_seed_base, question, state.consult_count)
-        rng = SeededRNG(seed)
-        
-        symbols = deck.draw_three(state, rng, question)
-        state.last_draw = [s.id for s in symbols]
-        
-        domains = []
-        for symbol in symbols:
-            domains.extend(symbol.dominios)
-        state.update_memory([s.id for s in symbols], domains)
-        
-        reading_data = interpreter.interpret(state, symbols, taboo, lore, rng)
-        
-        state.last_answer_hash = str(hash(str(reading_data)))
-        
-        result_display.mount(ReadingDisplay(reading_data))
-        
-        storage_path = Path(__file__).parent.parent / "storage" / "readings.jsonl"
-        with open(storage_path, 'a', encoding='utf-8') as f:
-            record = {
-                "timestamp": time.time(),
-                "question": question,
-                "seed": seed,
-                "symbols": [s.id for s in symbols],
-                "state_snapshot": state.to_dict(),
-                "reading_text": {
-                    "seal": reading_data["seal"],
-                    "liturgy": reading_data["liturgy"],
-                    "reading": reading_data["reading"],
-                    "coda": reading_data["coda"]
-                },
-                "ato": reading_data["ato"],
-                "preco": reading_data["preco"]
-            }
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        result_display.mount(ReadingDisplay(result.reading))
     
     def action_back(self):
         self.app.pop_screen()
@@ -173,22 +116,14 @@ class RegisterScreen(Screen):
         self.load_readings()
     
     def load_readings(self):
-        storage_path = Path(__file__).parent.parent / "storage" / "readings.jsonl"
         readings_list = self.query_one("#readings_list", ListView)
+        page = self.app.repository.page()
         
-        if not storage_path.exists():
+        if not page.readings:
             readings_list.append(ListItem(Label("Nenhuma leitura registrada.")))
             return
         
-        readings = []
-        with open(storage_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    readings.append(json.loads(line))
-        
-        readings.reverse()
-        
-        for reading in readings[:20]:
+        for reading in page.readings:
             question = reading.get("question", "Sem pergunta")
             timestamp = reading.get("timestamp", 0)
             from datetime import datetime
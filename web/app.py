@@ -1,12 +1,25 @@
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
 from pathlib import Path
-import json
-from engine.state import State
-from engine.deck import Deck
-from engine.interpret import Interpreter
+import atexit
+import os
+import time
+from engine.sampler import SAMPLER_V1
+from engine.snapshot import DATA_FILES, load_engine, signing_key
+from engine.reload import EngineReloader
+from engine.cache import FragmentCache, ReadingCache, DEFAULT_MAX_BYTES
+from engine.service import ConsultationService
+from engine.repository import STORE_JSONL, open_repository
+from engine.rng import stable_digest
+from engine.segments import DEFAULT_SEGMENT_BYTES, DEFAULT_SEGMENT_SECONDS
+from engine.writer import ReadingWriter, DEFAULT_FSYNC, parse_fsync_policy
+from .assets import StaticAssets
+from .sessions import DEFAULT_REDIS_URL, DEFAULT_SESSIONS, DEFAULT_TTL, open_session_store
 
+DEFAULT_FRAGMENT_BYTES = 4 * 1024 * 1024
 
-def create_app():
+
+def create_app(open_stores: bool = True):
     web_path = Path(__file__).parent
     app = Flask(__name__, 
                 template_folder=str(web_path / 'templates'),
@@ -15,23 +28,99 @@ def create_app():
     
     base_path = web_path.parent
     data_path = base_path / "data"
+    compiled_path = Path(os.environ.get('OBSERVADOR_COMPILED_DIR', base_path / "storage"))
     
-    lore_path = data_path / "lore.json"
-    deck_path = data_path / "deck.json"
-    templates_path = data_path / "templates.json"
-    
-    with open(lore_path, 'r', encoding='utf-8') as f:
-        lore = json.load(f)
-    
-    deck = Deck.load_from_json(str(deck_path))
-    interpreter = Interpreter(str(templates_path), deck=deck)
-    
-    app.config['LORE'] = lore
-    app.config['DECK'] = deck
-    app.config['INTERPRETER'] = interpreter
+    sampler = os.environ.get('OBSERVADOR_SAMPLER', SAMPLER_V1)
+    key = signing_key(os.environ.get('OBSERVADOR_SNAPSHOT_KEY'),
+                      os.environ.get('OBSERVADOR_SNAPSHOT_KEY_FILE', base_path / ".snapshot-key"))
+    load = lambda: load_engine(data_path, compiled_path / "engine", sampler=sampler, key=key)
+    engine = load()
+    cache_bytes = int(os.environ.get('OBSERVADOR_READING_CACHE_BYTES', DEFAULT_MAX_BYTES))
+    app.config['READING_CACHE'] = ReadingCache(cache_bytes) if cache_bytes > 0 else None
+    install_engine(app, engine)
+    app.config['RELOADER'] = EngineReloader(engine, load, paths=[data_path / name for name in DATA_FILES],
+                                            on_swap=lambda new_engine: install_engine(app, new_engine))
+    app.config['RELOAD_INTERVAL'] = float(os.environ.get('OBSERVADOR_RELOAD_INTERVAL', 0))
+    fragment_bytes = int(os.environ.get('OBSERVADOR_FRAGMENT_CACHE_BYTES', DEFAULT_FRAGMENT_BYTES))
+    app.config['FRAGMENT_CACHE'] = FragmentCache(fragment_bytes) if fragment_bytes > 0 else None
     app.config['BASE_PATH'] = base_path
+    app.config['TEMPLATES_DIGEST'] = templates_digest(web_path / 'templates')
+    app.config['STARTED_AT'] = time.time()
+    app.config['ASSETS'] = build_assets(app, web_path)
+    if open_stores:
+        open_services(app)
+        if app.config['RELOAD_INTERVAL'] > 0:
+            app.config['RELOADER'].watch(app.config['RELOAD_INTERVAL'])
+        atexit.register(close_services, app)
     
     from . import routes
     app.register_blueprint(routes.bp)
+    precompile_templates(app, compiled_path / "jinja")
     
     return app
+
+
+def install_engine(app, engine):
+    engine.interpreter.cache = app.config['READING_CACHE']
+    writer = app.config.get('WRITER')
+    if writer is not None:
+        app.config['SERVICE'] = ConsultationService(engine.deck, engine.interpreter, engine.lore, writer,
+                                                    engine_version=engine.version)
+    app.config['ENGINE'] = engine
+    app.config['LORE'] = engine.lore
+    app.config['DECK'] = engine.deck
+    app.config['INTERPRETER'] = engine.interpreter
+
+
+def precompile_templates(app, cache_path: Path):
+    try:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(cache_path))
+    except OSError as e:
+        app.logger.warning("Cache de bytecode Jinja indisponível em %s: %s", cache_path, e)
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+
+def build_assets(app, web_path: Path):
+    target = Path(os.environ.get('OBSERVADOR_ASSETS_DIR', web_path / 'dist'))
+    try:
+        return StaticAssets(web_path / 'static', target).build()
+    except OSError as e:
+        app.logger.warning("Assets não publicados em %s, usando /static: %s", target, e)
+        return None
+
+
+def templates_digest(path: Path) -> str:
+    files = sorted(path.rglob('*.html'))
+    return stable_digest([str(f.relative_to(path)) for f in files], *(f.read_bytes() for f in files))
+
+
+def open_services(app):
+    storage_path = app.config['BASE_PATH'] / "storage"
+    fsync = os.environ.get('OBSERVADOR_FSYNC', DEFAULT_FSYNC)
+    repository = open_repository(os.environ.get('OBSERVADOR_STORE', STORE_JSONL),
+                                 storage_path, parse_fsync_policy(fsync),
+                                 segment_bytes=int(os.environ.get('OBSERVADOR_SEGMENT_BYTES', DEFAULT_SEGMENT_BYTES)),
+                                 segment_seconds=float(os.environ.get('OBSERVADOR_SEGMENT_SECONDS',
+                                                                      DEFAULT_SEGMENT_SECONDS)))
+    writer = ReadingWriter(repository, fsync=fsync).start()
+    app.config['REPOSITORY'] = repository
+    app.config['WRITER'] = writer
+    install_engine(app, app.config['ENGINE'])
+    app.config['SESSIONS'] = open_session_store(
+        os.environ.get('OBSERVADOR_SESSIONS', DEFAULT_SESSIONS), storage_path,
+        ttl=float(os.environ.get('OBSERVADOR_SESSION_TTL', DEFAULT_TTL)),
+        redis_url=os.environ.get('OBSERVADOR_REDIS_URL', DEFAULT_REDIS_URL))
+
+
+def close_services(app):
+    reloader = app.config.get('RELOADER')
+    if reloader is not None:
+        reloader.close()
+    writer = app.config.pop('WRITER', None)
+    if writer is not None:
+        writer.close()
+    sessions = app.config.pop('SESSIONS', None)
+    if sessions is not None:
+        sessions.close()
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from .app import close_services, create_app
+
+DEFAULT_EXECUTOR_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_MAX_PENDING = 256
+
+_END = object()
+
+
+def build_environ(scope: Dict, body: bytes) -> Dict:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode('utf-8').decode('latin-1'),
+        "PATH_INFO": scope["path"].encode('utf-8').decode('latin-1'),
+        "QUERY_STRING": scope.get("query_string", b"").decode('latin-1'),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/" + scope.get("http_version", "1.1"),
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode('latin-1').upper().replace("-", "_")
+        value = raw_value.decode('latin-1')
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = "HTTP_" + name
+            # Cabeçalhos repetidos viram uma lista separada por vírgula, exceto Cookie, que usa "; ".
+            separator = "; " if key == "HTTP_COOKIE" else ","
+            environ[key] = environ[key] + separator + value if key in environ else value
+    return environ
+
+
+class AsgiBridge:
+    def __init__(self, wsgi_app: Callable, workers: int = DEFAULT_EXECUTOR_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, on_shutdown: Optional[Callable] = None):
+        self.wsgi_app = wsgi_app
+        self.max_pending = max_pending
+        self.on_shutdown = on_shutdown
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asgi-worker")
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Tipo de conexão ASGI não suportado: {scope['type']}")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            await self._handle(scope, receive, send)
+
+    async def _handle(self, scope: Dict, receive: Callable, send: Callable):
+        loop = asyncio.get_running_loop()
+        body = await self._read_body(receive)
+        environ = build_environ(scope, body)
+        response: List[Tuple[str, List[Tuple[str, str]]]] = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [(status, headers)]
+
+        iterable = await loop.run_in_executor(self.executor, self.wsgi_app, environ, start_response)
+        try:
+            iterator = iter(iterable)
+            chunk = await loop.run_in_executor(self.executor, next, iterator, _END)
+            status, headers = response[0]
+            await send({
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+            })
+            while chunk is not _END:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await loop.run_in_executor(self.executor, next, iterator, _END)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.on_shutdown is not None:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, self.on_shutdown)
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app() -> AsgiBridge:
+    app = create_app()
+    return AsgiBridge(app, workers=int(os.environ.get('OBSERVADOR_ASGI_WORKERS', DEFAULT_EXECUTOR_WORKERS)),
+                      max_pending=int(os.environ.get('OBSERVADOR_ASGI_MAX_PENDING', DEFAULT_MAX_PENDING)),
+                      on_shutdown=lambda: close_services(app))
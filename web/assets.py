@@ -0,0 +1,109 @@
+import gzip
+import mimetypes
+import os
+import sys
+from pathlib import Path
+from typing import Container, Dict, Optional, Tuple
+from engine.rng import stable_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".xml", ".html"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+HASH_SIZE = 6
+
+
+def fingerprint(relative: str, data: bytes) -> str:
+    path = Path(relative)
+    return path.with_name(f"{path.stem}.{stable_digest(data, digest_size=HASH_SIZE)}{path.suffix}").as_posix()
+
+
+def write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def compressors():
+    encoders = [("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.insert(0, ("br", ".br", lambda data: brotli.compress(data, quality=11)))
+    return encoders
+
+
+class StaticAssets:
+    def __init__(self, source, target):
+        self.source = Path(source)
+        self.target = Path(target)
+        self.paths: Dict[str, str] = {}
+        self.encodings: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        self.digest = stable_digest(self.paths)
+
+    def build(self) -> "StaticAssets":
+        paths = {}
+        encodings = {}
+        for path in sorted(self.source.rglob('*')):
+            if path.is_file():
+                relative = path.relative_to(self.source).as_posix()
+                published = fingerprint(relative, path.read_bytes())
+                paths[relative] = published
+                encodings[published] = self._publish(published, path)
+        self.paths = paths
+        self.encodings = encodings
+        self.digest = stable_digest(paths)
+        return self
+
+    def _publish(self, published: str, source: Path) -> Tuple[Tuple[str, str], ...]:
+        target = self.target / published
+        data = None
+        available = []
+        if Path(published).suffix in COMPRESSIBLE_SUFFIXES:
+            for encoding, suffix, compress in compressors():
+                variant = Path(f"{target}{suffix}")
+                if not variant.exists():
+                    data = source.read_bytes() if data is None else data
+                    compressed = compress(data)
+                    if len(compressed) >= len(data):
+                        continue
+                    write_atomic(variant, compressed)
+                available.append((encoding, suffix))
+        if not target.exists():
+            write_atomic(target, source.read_bytes() if data is None else data)
+        return tuple(available)
+
+    def url_path(self, relative: str) -> Optional[str]:
+        return self.paths.get(relative)
+
+    def serves(self, published: str) -> bool:
+        return published in self.encodings
+
+    def variant(self, published: str, accepted: Container[str]) -> Tuple[Path, Optional[str]]:
+        for encoding, suffix in self.encodings.get(published, ()):
+            if encoding in accepted:
+                return self.target / f"{published}{suffix}", encoding
+        return self.target / published, None
+
+    @staticmethod
+    def mimetype(published: str) -> str:
+        return mimetypes.guess_type(published)[0] or "application/octet-stream"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    web_path = Path(__file__).parent
+    source = Path(argv[0]) if argv else web_path / "static"
+    target = Path(argv[1]) if len(argv) > 1 else web_path / "dist"
+    assets = StaticAssets(source, target).build()
+    for relative, published in assets.paths.items():
+        variants = ", ".join(encoding for encoding, _ in assets.encodings[published]) or "sem compressão"
+        print(f"{relative} -> {published} ({variants})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,70 +1,149 @@
-from flask import Blueprint, render_template, request, session, jsonify, current_app
+from flask import (Blueprint, Response, abort, render_template, request, session, jsonify, current_app, g,
+                   make_response, send_file, url_for)
+from markupsafe import Markup
 from pathlib import Path
 import json
-import time
+import secrets
 from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from engine.register import DEFAULT_PAGE_SIZE
+from engine.repository import COUNT_FIELDS, ReadingFilter
+from engine.rng import stable_digest
 from engine.state import State
-from engine.rng import make_seed, SeededRNG
-from engine.taboos import check_taboos
+from engine.service import EMPTY_QUESTION, EVENT_RESULT, KIND_CRISIS, KIND_EMPTY, KIND_TABOO
+from .assets import IMMUTABLE_MAX_AGE
 
 bp = Blueprint('observador', __name__)
 
+MAX_BATCH_QUESTIONS = 50
+MAX_PAGE_SIZE = 100
+MAX_TEXT_VARIANTS = 64
+
+_text_responses: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+
+def load_state(payload: bytes, vocabulary) -> State:
+    if payload[:1] == b"{":
+        return State.from_dict(json.loads(payload), vocabulary)
+    return State.from_bytes(payload, vocabulary)
+
+
+def consultation_service():
+    if 'service' not in g:
+        g.service = current_app.config['SERVICE']
+    return g.service
+
 
 def get_state():
-    if 'session_seed_base' not in session:
-        import secrets
-        session['session_seed_base'] = secrets.token_hex(16)
-        session['state'] = State(session['session_seed_base']).to_dict()
-    
-    state = State.from_dict(session['state'])
-    return state
+    store = current_app.config['SESSIONS']
+    vocabulary = consultation_service().deck.vocabulary
+    session_id = session.get('sid')
+    payload = store.load(session_id) if session_id else None
+    if payload is not None:
+        try:
+            return load_state(payload, vocabulary)
+        except ValueError:
+            current_app.logger.warning("Estado de sessão ilegível descartado: %s", session_id)
+    legacy_state = session.get('state')
+    session.clear()
+    session['sid'] = secrets.token_urlsafe(24)
+    if legacy_state:
+        return State.from_dict(legacy_state, vocabulary)
+    return State(secrets.token_hex(16), vocabulary)
 
 
 def save_state(state):
-    session['state'] = state.to_dict()
+    current_app.config['SESSIONS'].save(session['sid'], state.to_bytes())
 
 
-def render_reading_to_html(reading_data, entropy_high=False):
-    correspondencias = reading_data.get('correspondencias', {})
-    
-    container_class = 'reading-container'
-    if entropy_high:
-        container_class += ' entropy-high'
-    
-    html = f'<div class="{container_class}">'
-    
-    if correspondencias:
-        html += '<div class="correspondences-table">'
-        html += '<table><thead><tr><th>Posição</th><th>Símbolo</th><th>Elemento</th><th>Planeta</th><th>Qualidade</th></tr></thead><tbody>'
-        for pos, key in [("Passado", "passado"), ("Presente", "presente"), ("Tendência", "tendencia")]:
-            if key in correspondencias:
-                sym = correspondencias[key]
-                html += f'<tr><td>{pos}</td><td>{sym.get("glifo", "")} {sym.get("nome", "")}</td><td>{sym.get("elemento", "")}</td><td>{sym.get("planeta", "")}</td><td>{sym.get("qualidade", "")}</td></tr>'
-        html += '</tbody></table></div>'
-    
-    seal = reading_data.get('seal', '').replace('\n', '<br>')
-    liturgy = reading_data.get('liturgy', '').replace('\n', '<br>')
-    reading = reading_data.get('reading', '').replace('\n', '<br>')
-    coda = reading_data.get('coda', '').replace('\n', '<br>')
-    interference_line = reading_data.get('interference_line', '')
-    
-    glitch_class = 'glitch' if entropy_high else ''
-    
-    html += f'<div class="seal {glitch_class}">{seal}</div>'
-    html += f'<div class="liturgy {glitch_class}">{liturgy}</div>'
-    
-    if interference_line:
-        html += f'<div class="interference-line">{interference_line}</div>'
-    
-    html += f'<div class="reading-text {glitch_class}">{reading}</div>'
-    html += f'<div class="coda {glitch_class}">{coda}</div>'
-    
-    ato = reading_data.get('ato', '')
-    preco = reading_data.get('preco', '')
-    html += f'<div class="summary"><div class="ato">ATO: {ato}</div><div class="preco">PREÇO: {preco}</div></div>'
-    
-    html += '</div>'
-    return html
+def not_modified(etag: str, last_modified: Optional[float] = None):
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        fresh = since is not None and last_modified is not None and since.timestamp() >= int(last_modified)
+    if fresh:
+        return with_validators(Response(status=304), etag, last_modified)
+    return None
+
+
+def with_validators(response, etag: str, last_modified: Optional[float] = None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = int(last_modified)
+    response.cache_control.no_cache = True
+    return response
+
+
+def register_validators() -> Tuple[str, float]:
+    repository = current_app.config['REPOSITORY']
+    assets = current_app.config.get('ASSETS')
+    etag = stable_digest(current_app.config['TEMPLATES_DIGEST'], assets.digest if assets else None,
+                         type(repository).__name__, repository.count(), request.url)
+    return etag, max(repository.last_modified(), current_app.config['STARTED_AT'])
+
+
+def cached_text(name: str, build: Callable[[str], str]) -> Tuple[str, str]:
+    key = (name, request.url_root)
+    entry = _text_responses.get(key)
+    if entry is None:
+        body = build(request.url_root.rstrip('/'))
+        if len(_text_responses) >= MAX_TEXT_VARIANTS:
+            _text_responses.clear()
+        entry = _text_responses[key] = (body, stable_digest(body))
+    return entry
+
+
+def text_response(name: str, build: Callable[[str], str], mimetype: str):
+    body, etag = cached_text(name, build)
+    started_at = current_app.config['STARTED_AT']
+    return not_modified(etag, started_at) or with_validators(Response(body, mimetype=mimetype), etag, started_at)
+
+
+def render_reading_to_html(reading_data, entropy_high=False, fingerprint=None):
+    fragments = current_app.config.get('FRAGMENT_CACHE')
+    if fragments is None:
+        return reading_macro()(reading_data, entropy_high)
+    key = f"{fingerprint or stable_digest(reading_data)}:{int(bool(entropy_high))}"
+    html = fragments.get(key)
+    if html is None:
+        html = reading_macro()(reading_data, entropy_high)
+        fragments.put(key, str(html))
+    return Markup(html)
+
+
+@bp.app_template_filter('nl2br')
+def nl2br(text):
+    return Markup('<br>').join(str(text).split('\n'))
+
+
+def reading_macro():
+    return current_app.jinja_env.get_template('macros/reading.html').module.reading
+
+
+@bp.app_template_global()
+def asset_url(filename):
+    assets = current_app.config.get('ASSETS')
+    published = assets.url_path(filename) if assets else None
+    if published is None:
+        return url_for('static', filename=filename)
+    return url_for('observador.asset', filename=published)
+
+
+@bp.route('/assets/<path:filename>')
+def asset(filename):
+    assets = current_app.config.get('ASSETS')
+    if assets is None or not assets.serves(filename):
+        abort(404)
+    accepted = {encoding for encoding, quality in request.accept_encodings if quality > 0}
+    path, encoding = assets.variant(filename, accepted)
+    response = send_file(path, mimetype=assets.mimetype(filename), max_age=IMMUTABLE_MAX_AGE)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 
 @bp.route('/')
@@ -79,114 +158,130 @@ def consult():
     
     question = request.form.get('question', '').strip()
     if not question:
-        return render_template('consult.html', error="Pergunta vazia.")
+        return render_template('consult.html', error=EMPTY_QUESTION)
     
     state = get_state()
-    lore = current_app.config['LORE']
-    deck = current_app.config['DECK']
-    interpreter = current_app.config['INTERPRETER']
-    base_path = current_app.config['BASE_PATH']
-    
-    taboo, taboo_data = check_taboos(question, lore)
+    service = consultation_service()
+    result = service.consult(state, question)
+    save_state(state)
     
-    if taboo and taboo.id == "T6":
-        save_state(state)
+    if result.kind == KIND_CRISIS:
         return render_template('consult.html', 
-                             taboo_response="Eu não selo portas finais.",
-                             taboo_alternative="Procure ajuda agora. Se houver risco imediato, ligue para serviços de emergência locais.",
+                             taboo_response=result.response,
+                             taboo_alternative=result.alternative,
                              is_crisis=True)
     
-    if taboo:
-        state.apply_taboo_penalty(taboo.debt_delta, taboo.entropy_delta)
-        save_state(state)
+    if result.kind == KIND_TABOO:
         return render_template('consult.html',
-                             taboo_response=taboo.response,
-                             taboo_alternative=taboo.alternative)
+                             taboo_response=result.response,
+                             taboo_alternative=result.alternative)
     
-    is_repeat = state.check_repeat_question(question)
-    if is_repeat:
-        state.apply_repeat_penalty()
-    
-    if "sim ou não" in question.lower() or "certeza" in question.lower():
-        state.apply_certainty_penalty()
-    
-    state.consult_count += 1
-    state.last_questions.append(question)
-    if len(state.last_questions) > 5:
-        state.last_questions.pop(0)
-    
-    seed = make_seed(state.session_seed_base, question, state.consult_count)
-    rng = SeededRNG(seed)
-    
-    symbols = deck.draw_three(state, rng, question)
-    state.last_draw = [s.id for s in symbols]
-    
-    domains = []
-    for symbol in symbols:
-        domains.extend(symbol.dominios)
-    state.update_memory([s.id for s in symbols], domains)
-    
-    reading_data = interpreter.interpret(state, symbols, taboo, lore, rng, question=question)
-    
-    state.last_answer_hash = str(hash(str(reading_data)))
-    
-    entropy_high = state.entropy > lore.get('effects', {}).get('interference_threshold', 60)
-    reading_html = render_reading_to_html(reading_data, entropy_high)
-    
-    save_state(state)
-    
-    storage_path = base_path / "storage" / "readings.jsonl"
-    with open(storage_path, 'a', encoding='utf-8') as f:
-        record = {
-            "timestamp": time.time(),
-            "question": question,
-            "seed": seed,
-            "symbols": [s.id for s in symbols],
-            "state_snapshot": state.to_dict(),
-            "reading_text": {
-                "seal": reading_data["seal"],
-                "liturgy": reading_data["liturgy"],
-                "reading": reading_data["reading"],
-                "coda": reading_data["coda"]
-            },
-            "ato": reading_data["ato"],
-            "preco": reading_data["preco"],
-            "relation": reading_data.get("relation", ""),
-            "topic": reading_data.get("topic", ""),
-            "objective_checks": reading_data.get("objective_checks", {}),
-            "attempt": reading_data.get("attempt", 0),
-            "selected_evidence": reading_data.get("selected_evidence", {}),
-            "interference_line": reading_data.get("interference_line", "")
-        }
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    reading_html = render_reading_to_html(result.reading, result.entropy_high, state.last_answer_hash)
     
     return render_template('consult.html', 
                          reading_html=reading_html,
                          entropy=state.entropy,
                          debt=state.debt,
-                         entropy_high=entropy_high)
+                         entropy_high=result.entropy_high)
 
 
 @bp.route('/register')
 def register():
-    base_path = current_app.config['BASE_PATH']
-    storage_path = base_path / "storage" / "readings.jsonl"
+    etag, last_modified = register_validators()
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
     
-    readings = []
-    if storage_path.exists():
-        with open(storage_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    readings.append(json.loads(line))
+    page = register_page()
     
-    readings.reverse()
-    
-    for reading in readings:
+    for reading in page.readings:
         timestamp = reading.get("timestamp", 0)
         dt = datetime.fromtimestamp(timestamp)
         reading['formatted_time'] = dt.strftime('%Y-%m-%d %H:%M')
     
-    return render_template('register.html', readings=readings[:20])
+    filter_args = {key: value for key, value in request.args.items() if key in ReadingFilter._fields}
+    html = render_template('register.html', readings=page.readings, next_before=page.next_before,
+                           filter_args=filter_args)
+    return with_validators(make_response(html), etag, last_modified)
+
+
+@bp.route('/api/register')
+def api_register():
+    etag, last_modified = register_validators()
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    
+    page = register_page()
+    return with_validators(jsonify({
+        "readings": page.readings,
+        "total": page.total,
+        "before": page.before,
+        "next_before": page.next_before
+    }), etag, last_modified)
+
+
+@bp.route('/api/analytics')
+def api_analytics():
+    field = request.args.get('by', 'symbol')
+    if field not in COUNT_FIELDS:
+        return jsonify({"error": f"Use 'by' com um destes campos: {', '.join(COUNT_FIELDS)}."}), 400
+    etag, last_modified = register_validators()
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+    
+    counts = current_app.config['REPOSITORY'].counts(field, register_filter())
+    return with_validators(jsonify({
+        "by": field,
+        "counts": [{"value": value, "count": count} for value, count in counts]
+    }), etag, last_modified)
+
+
+def register_filter():
+    args = request.args
+    return ReadingFilter(
+        symbol=args.get('symbol') or None,
+        topic=args.get('topic') or None,
+        relation=args.get('relation') or None,
+        since=args.get('since', type=float),
+        until=args.get('until', type=float),
+        min_attempt=args.get('min_attempt', type=int)
+    )
+
+
+def register_page():
+    before = request.args.get('before', type=int)
+    page = request.args.get('page', type=int)
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    filters = register_filter()
+    repository = current_app.config['REPOSITORY']
+    if before is None and page is not None and not filters.active:
+        before = repository.count() - (max(page, 1) - 1) * limit
+    return repository.page(before, limit, filters)
+
+
+def consult_payload(result, state):
+    if result.kind == KIND_EMPTY:
+        return {"error": result.response}
+    if result.kind == KIND_CRISIS:
+        return {
+            "crisis": True,
+            "response": result.response,
+            "alternative": result.alternative
+        }
+    if result.kind == KIND_TABOO:
+        return {
+            "taboo": True,
+            "response": result.response,
+            "alternative": result.alternative
+        }
+    return {
+        "reading": result.reading,
+        "entropy": state.entropy,
+        "debt": state.debt,
+        "entropy_high": result.entropy_high
+    }
 
 
 @bp.route('/api/consult', methods=['POST'])
@@ -195,101 +290,95 @@ def api_consult():
     question = data.get('question', '').strip() if data else ''
     
     if not question:
-        return jsonify({"error": "Pergunta vazia."}), 400
+        return jsonify({"error": EMPTY_QUESTION}), 400
     
     state = get_state()
-    lore = current_app.config['LORE']
-    deck = current_app.config['DECK']
-    interpreter = current_app.config['INTERPRETER']
-    base_path = current_app.config['BASE_PATH']
-    
-    taboo, _ = check_taboos(question, lore)
-    
-    if taboo and taboo.id == "T6":
-        save_state(state)
-        return jsonify({
-            "crisis": True,
-            "response": "Eu não selo portas finais.",
-            "alternative": "Procure ajuda agora. Se houver risco imediato, ligue para serviços de emergência locais."
-        })
-    
-    if taboo:
-        state.apply_taboo_penalty(taboo.debt_delta, taboo.entropy_delta)
-        save_state(state)
-        return jsonify({
-            "taboo": True,
-            "response": taboo.response,
-            "alternative": taboo.alternative
-        })
-    
-    is_repeat = state.check_repeat_question(question)
-    if is_repeat:
-        state.apply_repeat_penalty()
-    
-    if "sim ou não" in question.lower() or "certeza" in question.lower():
-        state.apply_certainty_penalty()
-    
-    state.consult_count += 1
-    state.last_questions.append(question)
-    if len(state.last_questions) > 5:
-        state.last_questions.pop(0)
-    
-    seed = make_seed(state.session_seed_base, question, state.consult_count)
-    rng = SeededRNG(seed)
-    
-    symbols = deck.draw_three(state, rng, question)
-    state.last_draw = [s.id for s in symbols]
+    service = consultation_service()
+    result = service.consult(state, question)
+    save_state(state)
     
-    domains = []
-    for symbol in symbols:
-        domains.extend(symbol.dominios)
-    state.update_memory([s.id for s in symbols], domains)
+    return jsonify(consult_payload(result, state))
+
+
+def sse_event(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+@bp.route('/api/consult/stream')
+def api_consult_stream():
+    question = request.args.get('question', '').strip()
+    if not question:
+        return jsonify({"error": EMPTY_QUESTION}), 400
     
-    reading_data = interpreter.interpret(state, symbols, taboo, lore, rng, question=question)
-    state.last_answer_hash = str(hash(str(reading_data)))
+    state = get_state()
+    sessions = current_app.config['SESSIONS']
+    session_id = session['sid']
+    events = consultation_service().consult_stream(state, question)
+    
+    def generate():
+        for event, data in events:
+            if event == EVENT_RESULT:
+                sessions.save(session_id, state.to_bytes())
+                yield sse_event("done", consult_payload(data, state))
+            else:
+                yield sse_event(event, data)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@bp.route('/api/consult/batch', methods=['POST'])
+def api_consult_batch():
+    data = request.get_json(silent=True)
+    questions = data.get('questions') if isinstance(data, dict) else None
     
-    entropy_high = state.entropy > lore.get('effects', {}).get('interference_threshold', 60)
+    if not isinstance(questions, list) or not questions or not all(isinstance(q, str) for q in questions):
+        return jsonify({"error": "Envie uma lista 'questions' com ao menos uma pergunta."}), 400
+    if len(questions) > MAX_BATCH_QUESTIONS:
+        return jsonify({"error": f"No máximo {MAX_BATCH_QUESTIONS} perguntas por lote."}), 400
     
+    state = get_state()
+    service = consultation_service()
+    results = service.consult_batch(state, questions)
     save_state(state)
     
-    storage_path = base_path / "storage" / "readings.jsonl"
-    with open(storage_path, 'a', encoding='utf-8') as f:
-        record = {
-            "timestamp": time.time(),
-            "question": question,
-            "seed": seed,
-            "symbols": [s.id for s in symbols],
-            "state_snapshot": state.to_dict(),
-            "reading_text": {
-                "seal": reading_data["seal"],
-                "liturgy": reading_data["liturgy"],
-                "reading": reading_data["reading"],
-                "coda": reading_data["coda"]
-            },
-            "ato": reading_data["ato"],
-            "preco": reading_data["preco"],
-            "relation": reading_data.get("relation", ""),
-            "topic": reading_data.get("topic", ""),
-            "objective_checks": reading_data.get("objective_checks", {}),
-            "attempt": reading_data.get("attempt", 0),
-            "selected_evidence": reading_data.get("selected_evidence", {}),
-            "interference_line": reading_data.get("interference_line", "")
-        }
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    payloads = []
+    for result in results:
+        payload = consult_payload(result, state)
+        payload.pop("entropy", None)
+        payload.pop("debt", None)
+        payload["question"] = result.question
+        payloads.append(payload)
     
     return jsonify({
-        "reading": reading_data,
+        "results": payloads,
         "entropy": state.entropy,
-        "debt": state.debt,
-        "entropy_high": entropy_high
+        "debt": state.debt
+    })
+
+
+@bp.route('/api/metrics')
+def api_metrics():
+    reading_cache = current_app.config.get('READING_CACHE')
+    fragment_cache = current_app.config.get('FRAGMENT_CACHE')
+    writer = current_app.config.get('WRITER')
+    repository = current_app.config.get('REPOSITORY')
+    reloader = current_app.config.get('RELOADER')
+    return jsonify({
+        "engine": reloader.stats() if reloader else None,
+        "reading_cache": reading_cache.stats() if reading_cache else None,
+        "fragment_cache": fragment_cache.stats() if fragment_cache else None,
+        "writer": writer.stats() if writer else None,
+        "store": repository.disk_usage() if repository else None
     })
 
 
 @bp.route('/sitemap.xml')
 def sitemap():
-    from flask import url_for
-    base_url = request.url_root.rstrip('/')
-    
+    return text_response('sitemap', sitemap_xml, 'application/xml')
+
+
+def sitemap_xml(base_url: str) -> str:
     urls = [
         {
             'loc': base_url + url_for('observador.home'),
@@ -319,20 +408,19 @@ def sitemap():
         sitemap_xml += '  </url>\n'
     
     sitemap_xml += '</urlset>'
-    
-    from flask import Response
-    return Response(sitemap_xml, mimetype='application/xml')
+    return sitemap_xml
 
 
 @bp.route('/robots.txt')
 def robots():
-    base_url = request.url_root.rstrip('/')
-    robots_txt = f"""User-agent: *
+    return text_response('robots', robots_txt, 'text/plain')
+
+
+def robots_txt(base_url: str) -> str:
+    return f"""User-agent: *
 Allow: /
 Disallow: /api/
 Disallow: /storage/
 
 Sitemap: {base_url}/sitemap.xml
 """
-    from flask import Response
-    return Response(robots_txt, mimetype='text/plain')
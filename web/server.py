@@ -0,0 +1,212 @@
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+DEFAULT_MAX_REQUESTS = 5000
+MAX_REQUESTS_JITTER = 0.1
+GRACEFUL_TIMEOUT = 30.0
+POLL_INTERVAL = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WorkerServer(WSGIServer):
+    def __init__(self, listener: socket.socket, app):
+        super().__init__(listener.getsockname()[:2], QuietRequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        host, port = listener.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+        self.setup_environ()
+        self.set_app(app)
+        self.handled = 0
+
+    def process_request(self, request, client_address):
+        try:
+            super().process_request(request, client_address)
+        finally:
+            self.handled += 1
+
+
+class PreforkServer:
+    def __init__(self, load_app: Callable, host: str, port: int, workers: int,
+                 max_requests: int = DEFAULT_MAX_REQUESTS,
+                 on_worker_start: Optional[Callable] = None,
+                 on_worker_exit: Optional[Callable] = None,
+                 watch: Optional[Callable] = None, watch_interval: float = POLL_INTERVAL):
+        self.load_app = load_app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.on_worker_start = on_worker_start
+        self.on_worker_exit = on_worker_exit
+        self.watch = watch
+        self.watch_interval = watch_interval
+        self.listener: Optional[socket.socket] = None
+        self.app = None
+        self.generation = 0
+        self._children: Dict[int, int] = {}
+        self._draining: Dict[int, float] = {}
+        self._stopping = False
+        self._reload = False
+
+    def serve(self):
+        self.listener = socket.create_server((self.host, self.port), backlog=1024)
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.app = self._prepare()
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        next_watch = time.monotonic() + self.watch_interval
+        try:
+            while not self._stopping:
+                if self.watch is not None and time.monotonic() >= next_watch:
+                    next_watch = time.monotonic() + self.watch_interval
+                    if self.watch(self.app):
+                        self._reload = True
+                if self._reload:
+                    self._reload = False
+                    self._rolling_reload()
+                self._reap()
+                self._kill_overdue()
+                while len(self._current()) < self.workers and not self._stopping:
+                    self._spawn()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._stop_children(list(self._children))
+            self.listener.close()
+
+    def _prepare(self):
+        app = self.load_app()
+        gc.collect()
+        gc.freeze()
+        return app
+
+    def _rolling_reload(self):
+        try:
+            gc.unfreeze()
+            app = self._prepare()
+        except Exception as e:
+            logger.error("Recarga falhou, mantendo a versão atual: %s", e)
+            gc.freeze()
+            return
+        self.app = app
+        self.generation += 1
+        self._retire([pid for pid, generation in self._children.items() if generation < self.generation])
+
+    def _current(self):
+        return [pid for pid, generation in self._children.items() if generation == self.generation]
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self._children[pid] = self.generation
+
+    def _run_worker(self):
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        if self.on_worker_start is not None:
+            self.on_worker_start(self.app)
+        server = WorkerServer(self.listener, self.app)
+        limit = self.max_requests
+        if limit:
+            limit += random.randint(0, int(limit * MAX_REQUESTS_JITTER))
+        try:
+            while not stopping and (not limit or server.handled < limit):
+                ready, _, _ = select.select([server.socket], [], [], POLL_INTERVAL)
+                if ready and not stopping:
+                    server._handle_request_noblock()
+        finally:
+            if self.on_worker_exit is not None:
+                self.on_worker_exit(self.app)
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            self._children.pop(pid, None)
+            self._draining.pop(pid, None)
+
+    def _retire(self, pids):
+        # Os antigos terminam as requisições em andamento enquanto o laço principal já repõe o pool.
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        for pid in pids:
+            if pid in self._draining:
+                continue
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+            self._draining[pid] = deadline
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self._draining.items()):
+            if now >= deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                del self._draining[pid]
+
+    def _stop_children(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._children.pop(pid, None)
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+                    self._children.pop(pid, None)
+            if pending:
+                time.sleep(0.05)
+        for pid in pending:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._children.pop(pid, None)
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def _request_reload(self, signum, frame):
+        self._reload = True
+
@@ -0,0 +1,229 @@
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+SESSIONS_MEMORY = "memory"
+SESSIONS_SQLITE = "sqlite"
+SESSIONS_REDIS = "redis"
+DEFAULT_SESSIONS = SESSIONS_SQLITE
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_REDIS_URL = "redis://127.0.0.1:6379/0"
+PURGE_EVERY = 1000
+
+
+class SessionStore(ABC):
+    name = ""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, payload: bytes):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    name = SESSIONS_MEMORY
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            payload, expires = entry
+            if expires < time.time():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+        return payload
+
+    def save(self, session_id: str, payload: bytes):
+        with self._lock:
+            self._entries[session_id] = (payload, time.time() + self.ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class SqliteSessionStore(SessionStore):
+    name = SESSIONS_SQLITE
+
+    def __init__(self, path, ttl: float = DEFAULT_TTL):
+        self.path = str(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._saves = 0
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires >= ?", (session_id, time.time())).fetchone()
+        if row is None:
+            return None
+        return row[0].encode('utf-8') if isinstance(row[0], str) else row[0]
+
+    def save(self, session_id: str, payload: bytes):
+        connection = self._connection()
+        now = time.time()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                               (session_id, payload, now + self.ttl))
+            self._saves += 1
+            if self._saves % PURGE_EVERY == 0:
+                connection.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, session_id: str):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            connection.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        # Uma conexão por thread; close() fecha todas, e a thread que voltar a usar a store abre outra.
+        if connection is None or connection not in self._connections:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS sessions "
+                               "(id TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL)")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.add(connection)
+        return connection
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile('rb')
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", str(db))
+
+    def execute(self, *args: str):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode('utf-8') if isinstance(arg, str) else arg
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Conexão com o Redis encerrada")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode('utf-8')
+        if kind == b"-":
+            raise RedisError(body.decode('utf-8'))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Resposta RESP inesperada: {line!r}")
+
+
+class RedisSessionStore(SessionStore):
+    name = SESSIONS_REDIS
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, ttl: float = DEFAULT_TTL, prefix: str = "observador:session:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        return self._execute("GET", self.prefix + session_id)
+
+    def save(self, session_id: str, payload: bytes):
+        self._execute("SET", self.prefix + session_id, payload, "EX", str(self.ttl))
+
+    def delete(self, session_id: str):
+        self._execute("DEL", self.prefix + session_id)
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _execute(self, *args: str):
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            try:
+                if connection is None:
+                    connection = RedisConnection(self.host, self.port, self.db, self.password)
+                    self._local.connection = connection
+                return connection.execute(*args)
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+
+
+def open_session_store(kind: str, storage_path, ttl: float = DEFAULT_TTL,
+                       redis_url: str = DEFAULT_REDIS_URL,
+                       max_entries: int = DEFAULT_MAX_ENTRIES) -> SessionStore:
+    if kind == SESSIONS_MEMORY:
+        return MemorySessionStore(max_entries, ttl)
+    if kind == SESSIONS_SQLITE:
+        return SqliteSessionStore(Path(storage_path) / "sessions.db", ttl)
+    if kind == SESSIONS_REDIS:
+        return RedisSessionStore(redis_url, ttl)
+    raise ValueError(f"Armazenamento de sessões desconhecido: {kind}")